@@ -1,11 +1,31 @@
 # app.py - Updated screen endpoint
-from flask import Flask, render_template, jsonify, request, Response
-from screener import screen_multiple_stocks, generate_advanced_signal
+from flask import Flask, render_template, jsonify, request, Response, g
+from screener import (screen_multiple_stocks, iter_screen_results, sort_screen_results,
+                      screen_cross_section, screen_multi_timeframe, generate_advanced_signal, get_stock_data,
+                      get_stocks_data, SCREEN_PERIODS)
 import pandas as pd
-from backtester import backtest_strategy, load_csv_data
+from backtester import (backtest_strategy, backtest_result_to_json, backtest_result_columns, load_csv_data,
+                        load_csv_chunked)
+from sweep import run_parameter_sweep
+from walkforward import run_walk_forward
+from portfolio import backtest_portfolio
+from screen_pool import screen_parallel
+from prescreen import prescreener, load_screen_config, PRESCREEN_ENABLED, PRESCREEN_CONFIG, PRESCREEN_TIMEFRAMES
 from strategy import current_strategy
+from indicators import merge_indicator_params
+from data_cache import ohlcv_cache
+from signal_cache import signal_cache
+from jobs import job_queue
+from history_store import history_store
+from results_store import store_screen_results, load_screen_results
+from serialization import dumps, json_response, negotiate, wants_arrow, columns_to_table, arrow_response
+from instrumentation import (perf_metrics, request_profiler, debug, info, start_request, finish_request,
+                             server_timing_header, TIMING_HEADERS, PROFILING_ENABLED)
+import os
 import json
+import sqlite3
 import io
+import time
 
 app = Flask(__name__)
 
@@ -16,37 +36,179 @@ DEFAULT_STOCKS = [
     'BHARTIARTL', 'KOTAKBANK', 'LT', 'AXISBANK', 'ITC'
 ]
 
+# Background pre-screening (not in the debug reloader's watcher process)
+if PRESCREEN_ENABLED and not (__name__ == '__main__' and os.environ.get('WERKZEUG_RUN_MAIN') != 'true'):
+    current_strategy.sync()
+    prescreener.configure(load_screen_config(PRESCREEN_CONFIG) if PRESCREEN_CONFIG else [{
+        'stocks': DEFAULT_STOCKS,
+        'timeframes': PRESCREEN_TIMEFRAMES,
+        'indicators': current_strategy.selected_indicators,
+        'params': current_strategy.indicator_params
+    }])
+    prescreener.start()
+
+@app.before_request
+def start_instrumentation():
+    """Time every request; ?profile=1 (or profile=pyinstrument) captures a profile when enabled"""
+    g.started = time.perf_counter()
+    g.timing_token = start_request()
+    try:
+        # Strategy changes made through another worker process
+        current_strategy.sync()
+    except sqlite3.Error as e:
+        print(f"Shared strategy unavailable: {e}")
+    g.profile = None
+    engine = request.args.get('profile')
+    if PROFILING_ENABLED and engine:
+        try:
+            g.profile = request_profiler.start('pyinstrument' if engine == 'pyinstrument' else 'cprofile')
+        except ValueError as e:
+            # Another profiler is already running in this process
+            print(f"Profiling unavailable: {e}")
+
+
+@app.after_request
+def finish_instrumentation(response):
+    """Record request latency, attach Server-Timing / profile id headers"""
+    if getattr(g, 'timing_token', None) is None:
+        return response
+    total = time.perf_counter() - g.started
+    timings = finish_request(g.timing_token)
+    g.timing_token = None
+    perf_metrics.record(f"request {request.endpoint}", total)
+    perf_metrics.increment('requests')
+    if response.status_code >= 500:
+        perf_metrics.increment('request_errors')
+    
+    if g.profile is not None:
+        response.headers['X-Profile-Id'] = str(request_profiler.stop(g.profile, request.path))
+    if TIMING_HEADERS or request.args.get('timing') == '1':
+        # Streamed bodies run after this point, their header only covers the setup
+        response.headers['Server-Timing'] = server_timing_header(timings, total)
+    return response
+
+
 @app.route('/')
 def home():
     """Render main dashboard"""
     return render_template('index.html')
 
+def request_indicator_params(data):
+    """
+    Indicator periods/thresholds for a screen request: the body's
+    'indicator_params' (merged over the defaults) or the current strategy's
+    
+    Raises:
+        ValueError: Unknown indicator or parameter name
+    """
+    if data.get('indicator_params'):
+        return merge_indicator_params(data['indicator_params'])
+    return current_strategy.indicator_params
+
+
+def parse_bool(value):
+    """
+    Boolean request field: JSON true/false, or 'true'/'false', '1'/'0', 'yes'/'no' from form fields
+    
+    Raises:
+        ValueError: Anything else
+    """
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, int) and value in (0, 1):
+        return bool(value)
+    if isinstance(value, str) and value.strip().lower() in ('true', '1', 'yes', 'false', '0', 'no'):
+        return value.strip().lower() in ('true', '1', 'yes')
+    raise ValueError(f"Expected true or false, got {value!r}")
+
+
 @app.route('/api/screen', methods=['POST'])
 def screen_stocks():
     """
     Screen stocks with selected indicators and timeframe
+    
+    mode: 'per_symbol' (default), 'cross_section', which screens the whole
+    watchlist as one symbol x bar matrix (faster for large universes), or
+    'parallel', the same with indicators computed on a process pool
+    
+    timeframes: optional list (e.g. ["5m", "15m", "1h", "1d"]) to score every
+    timeframe from one fetch per symbol; the response then carries the
+    per-symbol timeframe agreement 'matrix' and per-timeframe 'results'
+    
+    When a pre-screen covers the request (same timeframe, indicators and
+    params, all stocks in its watchlist) its latest results are returned
+    with a 'snapshot' block giving their candle and age; "fresh": true
+    always screens on demand
+    
+    Results carry a 'result_id' for /api/export-csv. Send
+    Accept: application/vnd.apache.arrow.stream (or ?format=arrow) for the
+    results table (the timeframe 'matrix' for multi-timeframe screens) as
+    Arrow IPC, the other fields in its 'summary' schema metadata
     """
     try:
         data = request.get_json()
         stocks = data.get('stocks', DEFAULT_STOCKS)
         selected_indicators = data.get('indicators', {})
         timeframe = data.get('timeframe', '1d')  # NEW
+        indicator_params = request_indicator_params(data)
+        mode = data.get('mode', 'per_symbol')
         
-        print(f"\nAPI Request received:")
-        print(f"Stocks: {stocks}")
-        print(f"Timeframe: {timeframe}")
-        print(f"Selected Indicators: {selected_indicators}")
+        info(f"\nAPI Request received:")
+        info(f"Stocks: {len(stocks)}")
+        debug(f"   {', '.join(stocks)}")
+        info(f"Timeframe: {timeframe}")
+        info(f"Selected Indicators: {selected_indicators}")
         
-        results = screen_multiple_stocks(stocks, selected_indicators, timeframe)
+        if not data.get('fresh') and not data.get('timeframes'):
+            snapshot = prescreener.lookup(stocks, timeframe, selected_indicators, indicator_params)
+            if snapshot is not None:
+                perf_metrics.increment('prescreen_hits')
+                results = snapshot.pop('results')
+                with perf_metrics.stage('serialization'):
+                    return negotiate(request, {
+                        'success': True,
+                        'results': results,
+                        'result_id': snapshot.pop('result_id'),
+                        'timestamp': str(pd.Timestamp.now()),
+                        'indicators_used': selected_indicators,
+                        'indicator_params': indicator_params,
+                        'timeframe': timeframe,
+                        'snapshot': snapshot
+                    }, 'results')
         
-        return jsonify({
-            'success': True,
-            'results': results,
-            'timestamp': str(pd.Timestamp.now()),
-            'indicators_used': selected_indicators,
-            'timeframe': timeframe
-        })
+        if data.get('timeframes'):
+            screen = screen_multi_timeframe(stocks, selected_indicators, data['timeframes'],
+                                            indicator_params=indicator_params, period=data.get('period'))
+            with perf_metrics.stage('serialization'):
+                return negotiate(request, dict(screen, success=True, timestamp=str(pd.Timestamp.now()),
+                                               indicators_used=selected_indicators,
+                                               indicator_params=indicator_params), 'matrix')
+        
+        if mode == 'cross_section':
+            frames = get_stocks_data(stocks, period=SCREEN_PERIODS.get(timeframe, '6mo'), interval=timeframe)
+            results = screen_cross_section(frames, selected_indicators, indicator_params).to_dict('records')
+        elif mode == 'parallel':
+            frames = get_stocks_data(stocks, period=SCREEN_PERIODS.get(timeframe, '6mo'), interval=timeframe)
+            results = screen_parallel(frames, selected_indicators, indicator_params).to_dict('records')
+        elif mode == 'per_symbol':
+            results = screen_multiple_stocks(stocks, selected_indicators, timeframe,
+                                             indicator_params=indicator_params)
+        else:
+            return jsonify({'success': False, 'error': "mode must be 'per_symbol', 'cross_section' or 'parallel'"}), 400
+        
+        with perf_metrics.stage('serialization'):
+            return negotiate(request, {
+                'success': True,
+                'results': results,
+                'result_id': store_screen_results(results),
+                'timestamp': str(pd.Timestamp.now()),
+                'indicators_used': selected_indicators,
+                'indicator_params': indicator_params,
+                'timeframe': timeframe
+            }, 'results')
     
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         print(f"Error: {str(e)}")
         import traceback
@@ -58,14 +220,87 @@ def screen_stocks():
 
     
 
+@app.route('/api/screen/stream', methods=['POST'])
+def screen_stocks_stream():
+    """
+    Screen stocks, streaming each result as newline-delimited JSON
+
+    One {"type": "result"} line per symbol as soon as it is computed, then a
+    {"type": "summary"} line with the sorted results (same fields as
+    /api/screen). Errors mid-stream arrive as {"type": "error"}.
+    """
+    data = request.get_json() or {}
+    stocks = data.get('stocks', DEFAULT_STOCKS)
+    selected_indicators = data.get('indicators', {})
+    timeframe = data.get('timeframe', '1d')
+    try:
+        indicator_params = request_indicator_params(data)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    info(f"\nStreaming screen request: {len(stocks)} stocks, timeframe {timeframe}")
+
+    def generate():
+        slots = [None] * len(stocks)
+        done = 0
+        try:
+            for index, symbol, result in iter_screen_results(stocks, selected_indicators, timeframe,
+                                                             indicator_params=indicator_params):
+                done += 1
+                slots[index] = result
+                yield dumps({
+                    'type': 'result',
+                    'index': index,
+                    'symbol': symbol,
+                    'result': result,
+                    'done': done,
+                    'total': len(stocks)
+                }) + b'\n'
+
+            results = sort_screen_results([result for result in slots if result])
+            yield dumps({
+                'type': 'summary',
+                'success': True,
+                'results': results,
+                'result_id': store_screen_results(results),
+                'timestamp': str(pd.Timestamp.now()),
+                'indicators_used': selected_indicators,
+                'indicator_params': indicator_params,
+                'timeframe': timeframe
+            }) + b'\n'
+
+        except Exception as e:
+            print(f"Error: {str(e)}")
+            yield dumps({'type': 'error', 'success': False, 'error': str(e)}) + b'\n'
+
+    return Response(
+        generate(),
+        mimetype='application/x-ndjson',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'  # Don't let a reverse proxy hold the lines back
+        }
+    )
+
+
 @app.route('/api/export-csv', methods=['POST'])
-def export_csv():
+@app.route('/api/export-csv/<result_id>', methods=['GET'])
+def export_csv(result_id=None):
     """
     Export screening results to CSV
+    
+    By the 'result_id' of a screen response (URL or body), straight from the
+    server-side copy; a body with the 'results' themselves still works
     """
     try:
-        data = request.get_json()
-        results = data.get('results', [])
+        data = request.get_json(silent=True) or {}
+        result_id = result_id or data.get('result_id')
+        if result_id:
+            results = load_screen_results(result_id)
+            if results is None:
+                return jsonify({'success': False, 'error': 'Unknown or expired result id'}), 404
+        else:
+            results = data.get('results', [])
         
         if not results:
             return jsonify({
@@ -76,27 +311,18 @@ def export_csv():
         # Convert results to pandas DataFrame
         df = pd.DataFrame(results)
         
-        # Select and reorder columns for CSV
-        columns_to_export = [
-            'symbol', 'signal', 'confidence', 'price', 
-            'buy_percentage', 'sell_percentage',
-            'buy_signals', 'sell_signals', 'neutral_signals',
-            'risk_score', 'rsi', 'macd', 'adx', 
-            'cci', 'willr', 'mfi', 'volume_ratio'
-        ]
+        # Select, reorder and rename columns for CSV (readable headers)
+        columns_to_export = {
+            'symbol': 'Stock', 'signal': 'Signal', 'confidence': 'Confidence', 'price': 'Price (₹)',
+            'buy_percentage': 'Buy %', 'sell_percentage': 'Sell %',
+            'buy_signals': 'Buy Signals', 'sell_signals': 'Sell Signals', 'neutral_signals': 'Neutral Signals',
+            'risk_score': 'Risk Score', 'rsi': 'RSI', 'macd': 'MACD', 'adx': 'ADX',
+            'cci': 'CCI', 'willr': 'Williams %R', 'mfi': 'MFI', 'volume_ratio': 'Volume Ratio'
+        }
         
         # Keep only columns that exist
-        columns_to_export = [col for col in columns_to_export if col in df.columns]
-        df_export = df[columns_to_export]
-        
-        # Rename columns for better readability
-        df_export.columns = [
-            'Stock', 'Signal', 'Confidence', 'Price (₹)',
-            'Buy %', 'Sell %',
-            'Buy Signals', 'Sell Signals', 'Neutral Signals',
-            'Risk Score', 'RSI', 'MACD', 'ADX',
-            'CCI', 'Williams %R', 'MFI', 'Volume Ratio'
-        ]
+        columns_to_export = {col: name for col, name in columns_to_export.items() if col in df.columns}
+        df_export = df[list(columns_to_export)].rename(columns=columns_to_export)
         
         # Convert to CSV
         csv_buffer = io.StringIO()
@@ -127,11 +353,16 @@ def update_strategy():
     """
     Update global strategy configuration
     Used by all modes (screener, backtester)
+    
+    Body: indicators (which to use) and optional params, per-indicator
+    periods/thresholds e.g. {"rsi": {"timeperiod": 10, "oversold": 25}}
     """
     try:
         data = request.get_json()
         indicators = data.get('indicators', {})
         
+        if 'params' in data:
+            current_strategy.set_indicator_params(data['params'])
         current_strategy.set_indicators(indicators)
         
         return jsonify({
@@ -139,71 +370,428 @@ def update_strategy():
             'strategy': current_strategy.to_dict()
         })
     
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+@app.route('/api/cache-stats', methods=['GET'])
+def cache_stats():
+    """
+    OHLCV and screen result cache hit/miss counters and usage
+    """
+    return jsonify({
+        'success': True,
+        'cache': ohlcv_cache.stats(),
+        'signal_cache': signal_cache.stats()
+    })
+
+
+@app.route('/api/prescreen', methods=['GET'])
+def prescreen_status():
+    """
+    Configured pre-screens with the candle, time and age of their latest results
+    
+    'runner' is the process holding the pre-screen lease, the only one that screens.
+    """
+    return jsonify(dict(prescreener.status(), success=True))
+
+
+@app.route('/api/prescreen/run', methods=['POST'])
+def prescreen_run():
+    """
+    Re-run every pre-screen now, without waiting for the next candle close
+    
+    Runs in the worker that gets the request, whether it holds the lease or not,
+    and publishes the results to every worker.
+    """
+    ran = prescreener.run_due(force=True)
+    return jsonify(dict(prescreener.status(), success=True, ran=ran))
+
+
+@app.route('/api/metrics', methods=['GET'])
+def metrics_endpoint():
+    """
+    Stage timers (fetch, indicators, vote, simulation, serialization, per
+    endpoint), counters, cache stats and background job counts
+    
+    Timers, counters, memory cache stats and profiles are those of the
+    worker process that answers ('pid'); under gunicorn each worker keeps
+    its own. ?reset=1 clears the timers and counters after reading them.
+    """
+    jobs = job_queue.list()
+    payload = {
+        'success': True,
+        'pid': os.getpid(),
+        'metrics': perf_metrics.snapshot(),
+        'cache': ohlcv_cache.stats(),
+        'signal_cache': signal_cache.stats(),
+        'jobs': {status: sum(job['status'] == status for job in jobs)
+                 for status in ['queued', 'running', 'done', 'failed', 'cancelled']},
+        'profiles': request_profiler.list()
+    }
+    if request.args.get('reset') == '1':
+        perf_metrics.reset()
+    return jsonify(payload)
+
+
+@app.route('/api/metrics/profiles/<int:profile_id>', methods=['GET'])
+def profile_report(profile_id):
+    """
+    Text report of a request captured with ?profile=1 (PROFILING_ENABLED=1)
+    
+    Reports stay in the worker process that served the profiled request.
+    """
+    entry = request_profiler.get(profile_id)
+    if entry is None:
+        return jsonify({'success': False, 'error': 'Unknown or expired profile'}), 404
+    return Response(entry['report'], mimetype='text/plain')
+
+
+@app.route('/api/history', methods=['GET'])
+def list_history():
+    """
+    Symbols and intervals available in the local history store
+    """
+    return jsonify({'success': True, 'history': history_store.available()})
+
+
+def read_backtest_request():
+    """
+    Parse a backtest request body
+    
+    Either JSON, or multipart/form-data with the JSON fields in a 'request'
+    form field and the CSV in a 'csv_file' upload (parsed in chunks, so large
+    files are never held as one string).
+    
+    Returns:
+        (data dict, uploaded file or None)
+    """
+    if request.files or request.form:
+        return json.loads(request.form.get('request') or '{}'), request.files.get('csv_file')
+    return request.get_json() or {}, None
+
+
+def load_backtest_data(data, upload=None):
+    """
+    Load the OHLCV frame for a backtest request (uploaded CSV, local history
+    store or auto-fetch)
+    
+    source='store' reads the memory-mapped history of stock/interval,
+    optionally sliced with start/end dates.
+    
+    Returns:
+        (DataFrame, None) or (None, error message)
+    """
+    if upload is not None:
+        return load_csv_chunked(upload.stream)
+    
+    csv_data = data.get('csv_data', None)
+    stock_symbol = data.get('stock', 'RELIANCE')
+    period = data.get('period', '6mo')
+    interval = data.get('interval', '1d')
+    
+    info(f"\nBacktest Request:")
+    info(f"   Stock: {stock_symbol}")
+    info(f"   Period: {period}")
+    info(f"   Interval: {interval}")
+    
+    if csv_data:
+        # User uploaded CSV
+        return load_csv_data(csv_data)
+    
+    if data.get('source') == 'store':
+        df = history_store.load(stock_symbol, interval, data.get('start'), data.get('end'))
+        if df is None:
+            return None, f'No local history for {stock_symbol} {interval}. Import it with history_store.py first.'
+        if len(df) < 60:
+            return None, f'Not enough data points ({len(df)}). Need at least 60 candles for indicators. Widen the date range.'
+        info(f"   Local history: {len(df)} rows from {df.index[0]} to {df.index[-1]}")
+        return df, None
+    
+    # Auto-fetch data - IMPORTANT: Pass interval parameter
+    df = get_stock_data(stock_symbol, period=period, interval=interval)
+
+    if df is not None:
+        debug(f"\nData fetched successfully:")
+        debug(f"   Rows: {len(df)}")
+        debug(f"   Columns: {list(df.columns)}")
+        debug(f"   First date: {df.index[0]}")
+        debug(f"   Last date: {df.index[-1]}")
+        debug(f"   First 3 rows:")
+        debug(df.head(3))
+
+    if df is None or df.empty:
+        return None, f'Could not fetch data for {stock_symbol}. Try a different stock or timeframe.'
+    
+    if len(df) < 60:
+        return None, f'Not enough data points ({len(df)}). Need at least 60 candles for indicators. Try a longer period.'
+    
+    return df, None
+
+
 @app.route('/api/backtest', methods=['POST'])
 def backtest():
     """
     Run backtest with timeframe selection and validation
+    
+    Optional equity_curve: {mode: last|downsample|window|all, points, start, end}
+    (defaults to the last 50 points)
+    
+    Large CSVs can be sent as a multipart 'csv_file' upload (see
+    read_backtest_request), the response then includes upload stats
+    (rows, chunks, peak memory).
+    
+    Accept: application/vnd.apache.arrow.stream (or ?format=arrow) returns
+    the trades (?table=equity_curve for the curve) as Arrow IPC with the
+    metrics in its 'summary' schema metadata.
     """
     try:
-        data = request.get_json()
-        
-        # Get parameters
-        csv_data = data.get('csv_data', None)
-        stock_symbol = data.get('stock', 'RELIANCE')
-        period = data.get('period', '6mo')
-        interval = data.get('interval', '1d')
+        data, upload = read_backtest_request()
         params = data.get('params', {})
         
-        print(f"\nBacktest Request:")
-        print(f"   Stock: {stock_symbol}")
-        print(f"   Period: {period}")
-        print(f"   Interval: {interval}")
+        df, error = load_backtest_data(data, upload)
+        if error:
+            return jsonify({'success': False, 'error': error}), 400
+        
+        result = backtest_strategy(df, current_strategy.selected_indicators, params,
+                                   indicator_params=current_strategy.indicator_params)
         
-        if csv_data:
-            # User uploaded CSV
-            from backtester import load_csv_data
-            df, error = load_csv_data(csv_data)
+        if wants_arrow(request) and result.get('success'):
+            table = request.args.get('table', 'trades')
+            summary, tables = backtest_result_columns(result, data.get('equity_curve'))
+            if table not in tables:
+                return jsonify({'success': False, 'error': f"table must be one of: {', '.join(tables)}"}), 400
+            if 'ingest' in df.attrs:
+                summary['upload'] = df.attrs['ingest']
+            with perf_metrics.stage('serialization'):
+                return arrow_response(columns_to_table(tables[table], summary))
+        
+        results = backtest_result_to_json(result, data.get('equity_curve'))
+        if 'ingest' in df.attrs:
+            results['upload'] = df.attrs['ingest']
+        with perf_metrics.stage('serialization'):
+            return json_response(results)
+    
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        import traceback
+        print(f"Backtest error: {str(e)}")
+        traceback.print_exc()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+def run_backtest_job(data, selected_indicators, progress, df=None, indicator_params=None):
+    """Body of a background backtest job, same steps as /api/backtest"""
+    if df is None:
+        progress(0, 0, 'loading')
+        df, error = load_backtest_data(data)
+        if error:
+            raise ValueError(error)
+    
+    progress(0, len(df), 'simulating')
+    results = backtest_strategy(
+        df, selected_indicators, data.get('params', {}),
+        progress=lambda done, total: progress(done, total),
+        indicator_params=indicator_params
+    )
+    results = backtest_result_to_json(results, data.get('equity_curve'))
+    if 'ingest' in df.attrs:
+        results['upload'] = df.attrs['ingest']
+    return results
+
+
+@app.route('/api/backtest/jobs', methods=['POST'])
+def submit_backtest_job():
+    """
+    Queue a backtest to run in the background
+    
+    Body: same as /api/backtest. Poll /api/backtest/jobs/<id> for progress and
+    fetch /api/backtest/jobs/<id>/result once its status is done.
+    """
+    try:
+        data, upload = read_backtest_request()
+        
+        # Uploads are parsed now, the request stream is gone once we return
+        df = None
+        if upload is not None:
+            df, error = load_backtest_data(data, upload)
             if error:
                 return jsonify({'success': False, 'error': error}), 400
-        else:
-            # Auto-fetch data - IMPORTANT: Pass interval parameter
-            from screener import get_stock_data
-            df = get_stock_data(stock_symbol, period=period, interval=interval)
-
-            # In app.py, after fetching data, add:
-            if df is not None:
-                print(f"\nData fetched successfully:")
-                print(f"   Rows: {len(df)}")
-                print(f"   Columns: {list(df.columns)}")
-                print(f"   First date: {df.index[0]}")
-                print(f"   Last date: {df.index[-1]}")
-                print(f"   First 3 rows:")
-                print(df.head(3))
-
-            
-            if df is None or df.empty:
-                return jsonify({
-                    'success': False, 
-                    'error': f'Could not fetch data for {stock_symbol}. Try a different stock or timeframe.'
-                }), 400
-            
-            if len(df) < 60:
-                return jsonify({
-                    'success': False,
-                    'error': f'Not enough data points ({len(df)}). Need at least 60 candles for indicators. Try a longer period.'
-                }), 400
-
-        
-        results = backtest_strategy(df, current_strategy.selected_indicators, params)
-        return jsonify(results)
+        
+        # Snapshot the strategy now, later /api/update-strategy calls don't affect queued jobs
+        job_id = job_queue.submit(run_backtest_job, data, dict(current_strategy.selected_indicators), df=df,
+                                  indicator_params=current_strategy.indicator_params)
+        return jsonify({'success': True, 'job_id': job_id, 'status': job_queue.status(job_id)}), 202
     
+    except Exception as e:
+        print(f"Job submit error: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@app.route('/api/backtest/jobs', methods=['GET'])
+def list_backtest_jobs():
+    """
+    Status of every retained job
+    """
+    return jsonify({'success': True, 'jobs': job_queue.list()})
+
+
+@app.route('/api/backtest/jobs/<job_id>', methods=['GET'])
+def backtest_job_status(job_id):
+    """
+    Job status and progress (bars simulated / total)
+    """
+    status = job_queue.status(job_id)
+    if status is None:
+        return jsonify({'success': False, 'error': 'Unknown or expired job'}), 404
+    return jsonify({'success': True, 'job': status})
+
+
+@app.route('/api/backtest/jobs/<job_id>/result', methods=['GET'])
+def backtest_job_result(job_id):
+    """
+    Result of a finished job (same payload and formats as /api/backtest)
+    """
+    status = job_queue.status(job_id)
+    if status is None:
+        return jsonify({'success': False, 'error': 'Unknown or expired job'}), 404
+    if status['status'] == 'failed':
+        return jsonify({'success': False, 'error': status['error'], 'job': status}), 500
+    if status['status'] != 'done':
+        return jsonify({'success': False, 'error': f"Job is {status['status']}", 'job': status}), 409
+    return negotiate(request, job_queue.result(job_id), request.args.get('table', 'trades'))
+
+
+@app.route('/api/backtest/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_backtest_job(job_id):
+    """
+    Cancel a queued or running job
+    """
+    if not job_queue.cancel(job_id):
+        return jsonify({'success': False, 'error': 'Job not found or already finished'}), 404
+    return jsonify({'success': True, 'job': job_queue.status(job_id)})
+
+
+@app.route('/api/backtest/sweep', methods=['POST'])
+def backtest_sweep():
+    """
+    Grid-search backtest parameters and indicator subsets
+    
+    Body: same data fields as /api/backtest, plus
+        ranges: {stop_loss|take_profit|risk_per_trade|slippage: [values] or {start, stop, step}}
+        indicator_sets: 'all', a list of indicator dicts/name lists, or omitted for the current strategy
+        rank_by, top, workers
+    """
+    try:
+        data, upload = read_backtest_request()
+        
+        df, error = load_backtest_data(data, upload)
+        if error:
+            return jsonify({'success': False, 'error': error}), 400
+        
+        results = run_parameter_sweep(
+            df,
+            data.get('ranges', {}),
+            data.get('indicator_sets') or [current_strategy.selected_indicators],
+            base_params=data.get('params', {}),
+            rank_by=data.get('rank_by', 'total_return'),
+            top=data.get('top'),
+            workers=data.get('workers'),
+            indicator_params=current_strategy.indicator_params
+        )
+        return json_response(results, 200 if results['success'] else 400)
+    
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         import traceback
-        print(f"Backtest error: {str(e)}")
+        print(f"Sweep error: {str(e)}")
+        traceback.print_exc()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+
+@app.route('/api/backtest/walk-forward', methods=['POST'])
+def backtest_walk_forward():
+    """
+    Walk-forward optimization: tune on rolling in-sample windows, test on the next
+    
+    Body: same as /api/backtest/sweep, plus
+        in_sample, out_of_sample: window lengths in bars
+        anchored: grow the in-sample window from the first bar instead of rolling it
+        equity_curve: stitched out-of-sample curve selection (see /api/backtest)
+    """
+    try:
+        data, upload = read_backtest_request()
+        
+        df, error = load_backtest_data(data, upload)
+        if error:
+            return jsonify({'success': False, 'error': error}), 400
+        
+        results = run_walk_forward(
+            df,
+            data.get('ranges', {}),
+            data.get('indicator_sets') or [current_strategy.selected_indicators],
+            data.get('in_sample', 500),
+            data.get('out_of_sample', 100),
+            anchored=parse_bool(data.get('anchored', False)),
+            base_params=data.get('params', {}),
+            rank_by=data.get('rank_by', 'total_return'),
+            workers=data.get('workers'),
+            indicator_params=current_strategy.indicator_params,
+            curve=data.get('equity_curve')
+        )
+        return json_response(results, 200 if results['success'] else 400)
+    
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        import traceback
+        print(f"Walk-forward error: {str(e)}")
+        traceback.print_exc()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@app.route('/api/backtest/portfolio', methods=['POST'])
+def backtest_portfolio_endpoint():
+    """
+    Backtest a watchlist against one shared capital pool
+    
+    Body: stocks, period, interval, params (same as /api/backtest plus max_positions)
+    """
+    try:
+        data = request.get_json()
+        stocks = data.get('stocks', DEFAULT_STOCKS)
+        period = data.get('period', '6mo')
+        interval = data.get('interval', '1d')
+        params = dict(data.get('params', {}))
+        params.setdefault('interval', interval)   # Annualize on the bars actually fetched
+        
+        info(f"\nPortfolio Backtest Request:")
+        info(f"   Stocks: {len(stocks)}")
+        debug(f"   {', '.join(stocks)}")
+        info(f"   Period: {period} | Interval: {interval}")
+        
+        frames = get_stocks_data(stocks, period=period, interval=interval)
+        frames = {symbol: df for symbol, df in frames.items() if df is not None and len(df) >= 60}
+        if not frames:
+            return jsonify({
+                'success': False,
+                'error': 'Not enough data for any symbol. Need at least 60 candles per symbol.'
+            }), 400
+        
+        results = backtest_portfolio(frames, current_strategy.selected_indicators, params,
+                                     current_strategy.indicator_params)
+        return json_response(results)
+    
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        import traceback
+        print(f"Portfolio backtest error: {str(e)}")
         traceback.print_exc()
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -1,8 +1,14 @@
 # backtester.py - Complete with LONG and SHORT positions
 import pandas as pd
 import numpy as np
-from screener import calculate_advanced_indicators
+from screener import calculate_indicator_series, count_indicator_votes
+from indicators import required_series
+from metrics import performance_summary, periods_per_year, round_metrics
+from simulator import simulate_trades, TRADE_COLUMNS
+from instrumentation import perf_metrics, log_enabled, info
 import io
+import time
+import tracemalloc
 
 
 def load_csv_data(csv_file):
@@ -40,7 +46,7 @@ def load_csv_data(csv_file):
         if len(df) == 0:
             return None, "CSV contains no valid data"
         
-        print(f"CSV loaded: {len(df)} rows from {df.index[0]} to {df.index[-1]}")
+        info(f"CSV loaded: {len(df)} rows from {df.index[0]} to {df.index[-1]}")
         
         return df, None
         
@@ -49,374 +55,259 @@ def load_csv_data(csv_file):
 
 
 
-def backtest_strategy(data, selected_indicators, params=None):
-    if params is None:
-        params = {}
-    
-    initial_capital = float(params.get('initial_capital', 100000))
-    risk_per_trade = float(params.get('risk_per_trade', 2.0))
-    stop_loss_ticks = float(params.get('stop_loss', 20))
-    take_profit_ticks = float(params.get('take_profit', 40))
-    tick_size = float(params.get('tick_size', 0.05))
-    commission = float(params.get('commission', 20.0))
-    slippage_ticks = float(params.get('slippage', 1.0))
-    interval = params.get('interval', '1d')
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+CSV_CHUNK_ROWS = 200000
+CSV_NA_VALUES = ['', '-', 'null', 'NaN', 'nan', 'N/A']
+
+
+def load_csv_chunked(source, chunk_rows=CSV_CHUNK_ROWS):
+    """
+    Load OHLC data from a CSV file or stream, a chunk at a time
     
-    capital = initial_capital
-    position = None  # None, 'LONG', or 'SHORT'
-    entry_price = 0
-    entry_date = None
-    stop_loss_price = 0
-    take_profit_price = 0
-    position_size = 0
-    trades = []
-    equity_curve = []
+    Same columns and cleaning as load_csv_data, but prices are parsed straight
+    to float64 and each column is assembled once into a single array, so a
+    large upload never exists as one big string or an object-dtype frame.
     
-    print(f"\nStarting backtest...")
-    print(f"Data points: {len(data)} | Interval: {interval}")
+    Args:
+        source: Path or binary/text file-like object (e.g. an uploaded file stream)
+        chunk_rows: Rows parsed per chunk
     
-    if len(data) < 60:
-        return {'success': False, 'error': 'Need at least 60 candles'}
+    Returns:
+        (DataFrame, None) or (None, error message). The frame's attrs['ingest']
+        holds rows, chunks, dropped rows, seconds and peak traced memory.
+    """
+    started = time.perf_counter()
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
     
-    for i in range(60, len(data)):
-        current_date = data.index[i]
-        current_high = data['High'].iloc[i]
-        current_low = data['Low'].iloc[i]
-        current_close = data['Close'].iloc[i]
-        
-        historical_slice = data.iloc[:i+1]
-        ind = calculate_advanced_indicators(historical_slice)
+    try:
+        reader = pd.read_csv(
+            source, chunksize=chunk_rows, na_values=CSV_NA_VALUES,
+            dtype={col: np.float64 for col in PRICE_COLUMNS}
+        )
         
-        if ind is None:
-            continue
+        dates, columns = [], {col: [] for col in PRICE_COLUMNS}
+        has_volume = True
+        tz = None
+        chunks = dropped = 0
         
-        # ===== CHECK SL/TP FOR LONG POSITION =====
-        if position == 'LONG':
-            # Stop Loss hit (price went down)
-            if current_low <= stop_loss_price:
-                exit_price = stop_loss_price
-                profit_amount = (exit_price - entry_price) * position_size - (commission * 2)
-                capital += profit_amount
-                
-                trades.append({
-                    'entry_time': str(entry_date),
-                    'position': 'long',
-                    'entry': round(entry_price, 2),
-                    'sl': round(stop_loss_price, 2),
-                    'tp': round(take_profit_price, 2),
-                    'exit_time': str(current_date),
-                    'exit': round(exit_price, 2),
-                    'reason': 'SL',
-                    'pnl': round(profit_amount, 2),
-                    'cumulative_pnl': round(capital - initial_capital, 2)
-                })
-                
-                position = None
-                continue
+        for chunk in reader:
+            if chunks == 0:
+                # Required columns are checked on the first chunk, before reading the rest
+                required_cols = ['Date', 'Open', 'High', 'Low', 'Close']
+                missing_cols = [col for col in required_cols if col not in chunk.columns]
+                if missing_cols:
+                    return None, f"CSV must have columns: {', '.join(required_cols)}. Missing: {', '.join(missing_cols)}"
+                has_volume = 'Volume' in chunk.columns
+            chunks += 1
             
-            # Take Profit hit (price went up)
-            if current_high >= take_profit_price:
-                exit_price = take_profit_price
-                profit_amount = (exit_price - entry_price) * position_size - (commission * 2)
-                capital += profit_amount
-                
-                trades.append({
-                    'entry_time': str(entry_date),
-                    'position': 'long',
-                    'entry': round(entry_price, 2),
-                    'sl': round(stop_loss_price, 2),
-                    'tp': round(take_profit_price, 2),
-                    'exit_time': str(current_date),
-                    'exit': round(exit_price, 2),
-                    'reason': 'TP',
-                    'pnl': round(profit_amount, 2),
-                    'cumulative_pnl': round(capital - initial_capital, 2)
-                })
-                
-                position = None
-                continue
-        
-        # ===== CHECK SL/TP FOR SHORT POSITION =====
-        elif position == 'SHORT':
-            # Stop Loss hit (price went up)
-            if current_high >= stop_loss_price:
-                exit_price = stop_loss_price
-                profit_amount = (entry_price - exit_price) * position_size - (commission * 2)
-                capital += profit_amount
-                
-                trades.append({
-                    'entry_time': str(entry_date),
-                    'position': 'short',
-                    'entry': round(entry_price, 2),
-                    'sl': round(stop_loss_price, 2),
-                    'tp': round(take_profit_price, 2),
-                    'exit_time': str(current_date),
-                    'exit': round(exit_price, 2),
-                    'reason': 'SL',
-                    'pnl': round(profit_amount, 2),
-                    'cumulative_pnl': round(capital - initial_capital, 2)
-                })
-                
-                position = None
-                continue
+            stamps = pd.DatetimeIndex(pd.to_datetime(chunk['Date']))
+            if stamps.tz is not None:
+                tz = tz or stamps.tz
+                stamps = stamps.tz_convert('UTC').tz_localize(None)
             
-            # Take Profit hit (price went down)
-            if current_low <= take_profit_price:
-                exit_price = take_profit_price
-                profit_amount = (entry_price - exit_price) * position_size - (commission * 2)
-                capital += profit_amount
-                
-                trades.append({
-                    'entry_time': str(entry_date),
-                    'position': 'short',
-                    'entry': round(entry_price, 2),
-                    'sl': round(stop_loss_price, 2),
-                    'tp': round(take_profit_price, 2),
-                    'exit_time': str(current_date),
-                    'exit': round(exit_price, 2),
-                    'reason': 'TP',
-                    'pnl': round(profit_amount, 2),
-                    'cumulative_pnl': round(capital - initial_capital, 2)
-                })
-                
-                position = None
-                continue
-        
-        # Calculate signals
-        buy_signals = 0
-        sell_signals = 0
-        neutral_signals = 0
-        active_count = sum(selected_indicators.values())
-        has_volume = data['Volume'].iloc[-1] > 0
-
-        
-        if active_count == 0:
-            continue
-        
-        # All 9 indicators
-        if selected_indicators.get('rsi', False):
-            if ind['rsi'] < 30:
-                buy_signals += 1
-            elif ind['rsi'] > 70:
-                sell_signals += 1
-            else:
-                neutral_signals += 1
+            valid = ~np.isnat(stamps.values)
+            for col in PRICE_COLUMNS if has_volume else PRICE_COLUMNS[:4]:
+                valid &= ~np.isnan(chunk[col].values)
+            dropped += int(len(chunk) - np.count_nonzero(valid))
+            
+            dates.append(stamps.values[valid].astype('datetime64[ns]').view(np.int64))
+            for col in PRICE_COLUMNS if has_volume else PRICE_COLUMNS[:4]:
+                columns[col].append(chunk[col].values[valid])
         
-        if selected_indicators.get('macd', False):
-            if ind['macd'] > ind['macd_signal'] and ind['macd_histogram'] > 0:
-                buy_signals += 1
-            elif ind['macd'] < ind['macd_signal'] and ind['macd_histogram'] < 0:
-                sell_signals += 1
-            else:
-                neutral_signals += 1
+        if chunks == 0:
+            return None, "CSV contains no valid data"
         
-        if selected_indicators.get('bollinger', False):
-            if current_close < ind['bb_lower']:
-                buy_signals += 1
-            elif current_close > ind['bb_upper']:
-                sell_signals += 1
-            else:
-                neutral_signals += 1
+        # One concatenate per column, releasing that column's chunks as we go
+        stamps = np.concatenate(dates)
+        del dates
+        rows = len(stamps)
+        if rows == 0:
+            return None, "CSV contains no valid data"
         
-        if selected_indicators.get('stochastic', False):
-            if ind['stoch_k'] < 20 and ind['stoch_d'] < 20:
-                buy_signals += 1
-            elif ind['stoch_k'] > 80 and ind['stoch_d'] > 80:
-                sell_signals += 1
-            else:
-                neutral_signals += 1
+        order = None if np.all(stamps[1:] >= stamps[:-1]) else np.argsort(stamps, kind='stable')
+        if order is not None:
+            stamps = stamps[order]
         
-        if selected_indicators.get('adx', False):
-            if ind['adx'] > 25:
-                if current_close > ind['sma_20']:
-                    buy_signals += 1
-                else:
-                    sell_signals += 1
-            else:
-                neutral_signals += 1
+        arrays = {}
+        for col in PRICE_COLUMNS:
+            if col == 'Volume' and not has_volume:
+                arrays[col] = np.zeros(rows)  # Placeholder
+                continue
+            arrays[col] = np.concatenate(columns.pop(col))
+            if order is not None:
+                arrays[col] = arrays[col][order]
         
-        if selected_indicators.get('volume', False) and has_volume:
-            if ind['volume_ratio'] > 1.5:
-                if current_close > ind['sma_20']:
-                    buy_signals += 1
-                else:
-                    sell_signals += 1
-            else:
-                neutral_signals += 1
-        elif selected_indicators.get('volume', False) and not has_volume:
-            # Reduce active count since we can't use this indicator
-            active_count -= 1        
+        index = pd.DatetimeIndex(stamps.view('datetime64[ns]'), name='Date')
+        if tz is not None:
+            index = index.tz_localize('UTC').tz_convert(tz)
+        df = pd.DataFrame(arrays, index=index, copy=False)
         
-        if selected_indicators.get('cci', False):
-            if ind['cci'] < -100:
-                buy_signals += 1
-            elif ind['cci'] > 100:
-                sell_signals += 1
-            else:
-                neutral_signals += 1
+        _, peak = tracemalloc.get_traced_memory()
+        df.attrs['ingest'] = {
+            'rows': rows,
+            'chunks': chunks,
+            'dropped_rows': dropped,
+            'seconds': round(time.perf_counter() - started, 3),
+            'peak_memory_mb': round(peak / (1024 * 1024), 2)
+        }
         
-        if selected_indicators.get('willr', False):
-            if ind['willr'] < -80:
-                buy_signals += 1
-            elif ind['willr'] > -20:
-                sell_signals += 1
-            else:
-                neutral_signals += 1
+        if not has_volume:
+            print("Volume column not found - Volume and MFI indicators will be skipped")
+        info(f"CSV loaded: {rows} rows from {df.index[0]} to {df.index[-1]} "
+              f"({chunks} chunks, peak {df.attrs['ingest']['peak_memory_mb']} MB)")
         
-        if selected_indicators.get('mfi', False) and has_volume:
-            if ind['mfi'] < 20:
-                buy_signals += 1
-            elif ind['mfi'] > 80:
-                sell_signals += 1
-            else:
-                neutral_signals += 1
-        elif selected_indicators.get('mfi', False) and not has_volume:
-            # Reduce active count since we can't use this indicator
-            active_count -= 1
+        return df, None
+    
+    except Exception as e:
+        return None, f"Error: {str(e)}"
+    
+    finally:
+        if not tracing:
+            tracemalloc.stop()
 
-        # Recalculate if active_count changed
-        if active_count == 0:
-            continue        
-        
-        # Determine signal based on majority
-        if buy_signals > sell_signals and buy_signals > neutral_signals:
-            signal = 'BUY'
-        elif sell_signals > buy_signals and sell_signals > neutral_signals:
-            signal = 'SELL'
-        else:
-            signal = 'NEUTRAL'
-        
-        # ===== ENTRY LOGIC - OPEN NEW POSITION =====
-        if position is None:
-            # BUY Signal - Enter LONG
-            if signal == 'BUY':
-                entry_price = current_close + (slippage_ticks * tick_size)
-                stop_loss_price = entry_price - (stop_loss_ticks * tick_size)
-                take_profit_price = entry_price + (take_profit_ticks * tick_size)
-                
-                risk_amount = capital * (risk_per_trade / 100)
-                risk_per_share = entry_price - stop_loss_price
-                
-                if risk_per_share > 0:
-                    position_size = int(risk_amount / risk_per_share)
-                else:
-                    position_size = int((capital * 0.1) / entry_price)
-                
-                if position_size > 0:
-                    position = 'LONG'
-                    entry_date = current_date
-                    print(f"LONG: {current_date} | Entry: {entry_price:.2f} | SL: {stop_loss_price:.2f} | TP: {take_profit_price:.2f}")
-            
-            # SELL Signal - Enter SHORT
-            elif signal == 'SELL':
-                entry_price = current_close - (slippage_ticks * tick_size)
-                stop_loss_price = entry_price + (stop_loss_ticks * tick_size)
-                take_profit_price = entry_price - (take_profit_ticks * tick_size)
-                
-                risk_amount = capital * (risk_per_trade / 100)
-                risk_per_share = stop_loss_price - entry_price
-                
-                if risk_per_share > 0:
-                    position_size = int(risk_amount / risk_per_share)
-                else:
-                    position_size = int((capital * 0.1) / entry_price)
-                
-                if position_size > 0:
-                    position = 'SHORT'
-                    entry_date = current_date
-                    print(f"SHORT: {current_date} | Entry: {entry_price:.2f} | SL: {stop_loss_price:.2f} | TP: {take_profit_price:.2f}")
-        
-        # ===== EXIT LOGIC - CLOSE EXISTING POSITION =====
-        elif position == 'LONG' and signal == 'SELL':
-            # Exit LONG on SELL signal
-            exit_price = current_close - (slippage_ticks * tick_size)
-            profit_amount = (exit_price - entry_price) * position_size - (commission * 2)
-            capital += profit_amount
-            
-            trades.append({
-                'entry_time': str(entry_date),
-                'position': 'long',
-                'entry': round(entry_price, 2),
-                'sl': round(stop_loss_price, 2),
-                'tp': round(take_profit_price, 2),
-                'exit_time': str(current_date),
-                'exit': round(exit_price, 2),
-                'reason': 'Signal',
-                'pnl': round(profit_amount, 2),
-                'cumulative_pnl': round(capital - initial_capital, 2)
-            })
-            
-            position = None
-            print(f"EXIT LONG: {current_date} | Exit: {exit_price:.2f} | P&L: {profit_amount:.2f}")
-        
-        elif position == 'SHORT' and signal == 'BUY':
-            # Exit SHORT on BUY signal
-            exit_price = current_close + (slippage_ticks * tick_size)
-            profit_amount = (entry_price - exit_price) * position_size - (commission * 2)
-            capital += profit_amount
-            
-            trades.append({
-                'entry_time': str(entry_date),
-                'position': 'short',
-                'entry': round(entry_price, 2),
-                'sl': round(stop_loss_price, 2),
-                'tp': round(take_profit_price, 2),
-                'exit_time': str(current_date),
-                'exit': round(exit_price, 2),
-                'reason': 'Signal',
-                'pnl': round(profit_amount, 2),
-                'cumulative_pnl': round(capital - initial_capital, 2)
-            })
-            
-            position = None
-            print(f"EXIT SHORT: {current_date} | Exit: {exit_price:.2f} | P&L: {profit_amount:.2f}")
-        
-        # Track equity curve
-        current_equity = capital
-        if position == 'LONG':
-            current_equity = capital + ((current_close - entry_price) * position_size)
-        elif position == 'SHORT':
-            current_equity = capital + ((entry_price - current_close) * position_size)
-        
-        equity_curve.append({
-            'date': str(current_date),
-            'equity': round(current_equity, 2)
-        })
+
+# Trade log record layout, bar positions index into the backtested frame
+TRADE_DTYPE = np.dtype([
+    ('entry_index', np.int64),
+    ('exit_index', np.int64),
+    ('side', np.int8),          # 1 long, -1 short
+    ('entry', np.float64),
+    ('sl', np.float64),
+    ('tp', np.float64),
+    ('exit', np.float64),
+    ('reason', np.int8),        # index into EXIT_REASONS
+    ('pnl', np.float64),
+    ('cumulative_pnl', np.float64)
+])
+EXIT_REASONS = ['SL', 'TP', 'Signal']
+EQUITY_CURVE_POINTS = 50
+
+# backtest_strategy result keys that are not part of the API payload
+RAW_RESULT_KEYS = ('trade_records', 'equity_index', 'equity_values', 'timestamps', 'open_entry_index')
+
+
+def print_trade_log(records, open_trade, index):
+    """Print entries and signal exits in bar order, as the simulation goes (LOG_LEVEL=debug only)"""
+    if not log_enabled('debug'):
+        return
     
-    # Calculate metrics
-    total_trades = len(trades)
-    winning_trades = len([t for t in trades if t['pnl'] > 0])
-    losing_trades = total_trades - winning_trades
+    def print_entry(side, entry_index, entry, sl, tp):
+        label = 'LONG' if side == 1 else 'SHORT'
+        print(f"{label}: {index[entry_index]} | Entry: {entry:.2f} | SL: {sl:.2f} | TP: {tp:.2f}")
     
-    total_return = ((capital - initial_capital) / initial_capital) * 100
-    win_rate = (winning_trades / total_trades * 100) if total_trades > 0 else 0
-    
-    if total_trades > 0:
-        avg_profit = sum([t['pnl'] for t in trades]) / total_trades
-        avg_win = sum([t['pnl'] for t in trades if t['pnl'] > 0]) / winning_trades if winning_trades > 0 else 0
-        avg_loss = sum([t['pnl'] for t in trades if t['pnl'] < 0]) / losing_trades if losing_trades > 0 else 0
-        sl_exits = len([t for t in trades if t['reason'] == 'SL'])
-        tp_exits = len([t for t in trades if t['reason'] == 'TP'])
-        signal_exits = len([t for t in trades if t['reason'] == 'Signal'])
+    for trade in records:
+        print_entry(trade['side'], trade['entry_index'], trade['entry'], trade['sl'], trade['tp'])
+        if trade['reason'] == 2:
+            label = 'LONG' if trade['side'] == 1 else 'SHORT'
+            print(f"EXIT {label}: {index[trade['exit_index']]} | Exit: {trade['exit']:.2f} | P&L: {trade['pnl']:.2f}")
+    
+    side, entry_index, entry, sl, tp = open_trade
+    if side != 0:
+        print_entry(side, int(entry_index), entry, sl, tp)
+
+
+def backtest_strategy(data, selected_indicators, params=None, series=None, progress=None,
+                      indicator_params=None, log=info):
+    """
+    Simulate LONG/SHORT trades from the majority vote of the selected indicators
+    
+    Args:
+        data: OHLCV DataFrame
+        selected_indicators: Dict of which indicators to use
+        params: Capital, risk, SL/TP (ticks), tick size, commission, slippage, interval
+        series: Optional precomputed calculate_indicator_series(data), so repeated
+                runs over the same data skip the indicator work
+        progress: Optional callable(bars_done, bars_total) called as the
+                  simulation advances, see simulate_trades
+        indicator_params: Merged indicator periods/thresholds (defaults when None)
+        log: Callable printing the start/summary lines (sweeps pass debug to keep runs quiet)
+    
+    Returns:
+        Dict with metrics plus raw arrays: 'trade_records' (TRADE_DTYPE),
+        'equity_index' / 'equity_values' (bar positions and equity),
+        'timestamps' and 'open_entry_index' (entry bar of a position still
+        open at the end, or None). Use backtest_result_to_json for the API payload.
+    
+    Raises:
+        ValueError: Unknown interval
+    """
+    if params is None:
+        params = {}
+    
+    initial_capital = float(params.get('initial_capital', 100000))
+    risk_per_trade = float(params.get('risk_per_trade', 2.0))
+    stop_loss_ticks = float(params.get('stop_loss', 20))
+    take_profit_ticks = float(params.get('take_profit', 40))
+    tick_size = float(params.get('tick_size', 0.05))
+    commission = float(params.get('commission', 20.0))
+    slippage_ticks = float(params.get('slippage', 1.0))
+    interval = params.get('interval', '1d')
+    periods_per_year(interval)  # Unknown intervals fail before simulating
+    
+    log(f"\nStarting backtest...")
+    log(f"Data points: {len(data)} | Interval: {interval}")
+    
+    if len(data) < 60:
+        return {'success': False, 'error': 'Need at least 60 candles'}
+    
+    # Compute the selected indicators' series once and vote on all bars in one pass
+    if series is None:
+        series = calculate_indicator_series(
+            data, required_series(selected_indicators, indicator_params), indicator_params
+        )
+    signals = np.zeros(len(data), dtype=np.int8)
+    if series is None:
+        start, active_count = len(data), 0  # Nothing to trade without indicators
     else:
-        avg_profit = avg_win = avg_loss = 0
-        sl_exits = tp_exits = signal_exits = 0
+        start = 60
+        has_volume = data['Volume'].iloc[-1] > 0
+        closes = np.array(data['Close'].values, dtype=np.float64)
+        buy_votes, sell_votes, neutral_votes, active_count = count_indicator_votes(
+            series, closes, selected_indicators, has_volume=has_volume, params=indicator_params
+        )
+        
+        # Determine signal based on majority (1 BUY, -1 SELL, 0 NEUTRAL)
+        signals[(buy_votes > sell_votes) & (buy_votes > neutral_votes)] = 1
+        signals[(sell_votes > buy_votes) & (sell_votes > neutral_votes)] = -1
     
-    equity_values = [e['equity'] for e in equity_curve]
-    peak = equity_values[0] if equity_values else initial_capital
-    max_dd = 0
+    # Position state machine runs over plain arrays (compiled when Numba is installed)
+    with perf_metrics.stage('simulation'):
+        matrix, equity_index, equity_values, capital, open_trade = simulate_trades(
+            data['High'].values, data['Low'].values, data['Close'].values, signals, start,
+            active_count > 0, initial_capital, risk_per_trade, stop_loss_ticks,
+            take_profit_ticks, tick_size, commission, slippage_ticks, progress=progress
+        )
+    perf_metrics.increment('backtests')
+    perf_metrics.increment('bars_simulated', max(len(data) - start, 0))
     
-    for value in equity_values:
-        if value > peak:
-            peak = value
-        dd = ((peak - value) / peak) * 100
-        if dd > max_dd:
-            max_dd = dd
+    records = np.zeros(len(matrix), dtype=TRADE_DTYPE)
+    for column, name in enumerate(TRADE_COLUMNS):
+        records[name] = matrix[:, column]
+    print_trade_log(records, open_trade, data.index)
+    
+    # Calculate metrics (on cent-rounded P&L/equity, as reported in the payload)
+    pnl = np.round(records['pnl'], 2)
+    open_side, open_entry_index = int(open_trade[0]), int(open_trade[1])
+    open_entries = [open_entry_index] if open_side != 0 else []
+    summary = performance_summary(
+        np.round(equity_values, 2), pnl, records['side'],
+        records['entry_index'], records['exit_index'], len(data) - 60, interval,
+        open_entries, [len(data) - 1] * len(open_entries)
+    )
+    total_trades = summary['trades']
+    winning_trades = summary['winning_trades']
+    losing_trades = summary['losing_trades']
+    win_rate = summary['win_rate']
+    total_return = ((capital - initial_capital) / initial_capital) * 100
+    sl_exits, tp_exits, signal_exits = np.bincount(records['reason'], minlength=len(EXIT_REASONS)).tolist()
     
-    print(f"\nBacktest Complete!")
-    print(f"Total Trades: {total_trades} | Win Rate: {win_rate:.1f}%")
-    print(f"Long Trades: {len([t for t in trades if t['position'] == 'long'])}")
-    print(f"Short Trades: {len([t for t in trades if t['position'] == 'short'])}")
+    log(f"\nBacktest Complete!")
+    log(f"Total Trades: {total_trades} | Win Rate: {win_rate:.1f}%")
+    log(f"Long Trades: {summary['by_side']['long']['trades']}")
+    log(f"Short Trades: {summary['by_side']['short']['trades']}")
     
     return {
         'success': True,
@@ -427,13 +318,162 @@ def backtest_strategy(data, selected_indicators, params=None):
         'winning_trades': winning_trades,
         'losing_trades': losing_trades,
         'win_rate': round(win_rate, 2),
-        'avg_profit_per_trade': round(avg_profit, 2),
-        'avg_win': round(avg_win, 2),
-        'avg_loss': round(avg_loss, 2),
-        'max_drawdown': round(max_dd, 2),
+        'avg_profit_per_trade': round(summary['avg_profit'], 2),
+        'avg_win': round(summary['avg_win'], 2),
+        'avg_loss': round(summary['avg_loss'], 2),
+        'max_drawdown': round(summary['max_drawdown'], 2),
+        'max_drawdown_duration': summary['max_drawdown_duration'],
+        'sharpe_ratio': round_metrics(summary['sharpe_ratio']),
+        'sortino_ratio': round_metrics(summary['sortino_ratio']),
+        'calmar_ratio': round_metrics(summary['calmar_ratio']),
+        'profit_factor': round_metrics(summary['profit_factor']),
+        'exposure': round(summary['exposure'], 2),
+        'by_side': round_metrics(summary['by_side']),
         'sl_exits': sl_exits,
         'tp_exits': tp_exits,
         'signal_exits': signal_exits,
-        'equity_curve': equity_curve[-50:],
-        'trades': trades
+        'trade_records': records,
+        'equity_index': equity_index,
+        'equity_values': equity_values,
+        'timestamps': data.index,
+        'open_entry_index': open_entry_index if open_side != 0 else None
     }
+
+
+def select_equity_points(equity_index, timestamps, curve=None):
+    """
+    Pick which equity curve points to return
+    
+    Args:
+        equity_index: Bar positions of the recorded equity values
+        timestamps: Index of the backtested frame
+        curve: {'mode': 'last' | 'downsample' | 'window' | 'all', 'points': N,
+                'start': date, 'end': date} - defaults to the last 50 points
+    
+    Returns:
+        Positions into the equity arrays
+    """
+    curve = curve or {}
+    mode = curve.get('mode', 'last')
+    points = int(curve.get('points', EQUITY_CURVE_POINTS))
+    count = len(equity_index)
+    
+    if mode == 'all':
+        return np.arange(count)
+    
+    if mode == 'downsample':
+        if count <= points:
+            return np.arange(count)
+        # Evenly spaced, always keeping the first and last point
+        return np.unique(np.linspace(0, count - 1, points).round().astype(np.int64))
+    
+    if mode == 'window':
+        dates = timestamps[equity_index]
+        
+        def bound(value):
+            # Naive bounds are read in the frame's timezone
+            value = pd.Timestamp(value)
+            if dates.tz is not None and value.tz is None:
+                value = value.tz_localize(dates.tz)
+            return value
+        
+        mask = np.ones(count, dtype=bool)
+        if curve.get('start'):
+            mask &= dates >= bound(curve['start'])
+        if curve.get('end'):
+            mask &= dates <= bound(curve['end'])
+        return np.flatnonzero(mask)
+    
+    if mode != 'last':
+        raise ValueError(f"Unknown equity curve mode: {mode}")
+    return np.arange(max(0, count - points), count)
+
+
+def backtest_result_to_json(result, curve=None):
+    """
+    Convert a backtest_strategy result to the JSON payload of /api/backtest
+    
+    Args:
+        result: Dict returned by backtest_strategy
+        curve: Equity curve selection, see select_equity_points
+    
+    Returns:
+        Dict with 'equity_curve' and 'trades' as lists of dicts
+    """
+    if not result.get('success'):
+        return result
+    
+    with perf_metrics.stage('serialization'):
+        payload = {key: value for key, value in result.items() if key not in RAW_RESULT_KEYS}
+        timestamps = result['timestamps']
+        records = result['trade_records']
+        equity_index = result['equity_index']
+        equity_values = result['equity_values']
+        
+        selected = select_equity_points(equity_index, timestamps, curve)
+        payload['equity_curve'] = [
+            {'date': str(timestamps[equity_index[j]]), 'equity': round(float(equity_values[j]), 2)}
+            for j in selected
+        ]
+        
+        payload['trades'] = [
+            {
+                'entry_time': str(timestamps[trade['entry_index']]),
+                'position': 'long' if trade['side'] == 1 else 'short',
+                'entry': round(float(trade['entry']), 2),
+                'sl': round(float(trade['sl']), 2),
+                'tp': round(float(trade['tp']), 2),
+                'exit_time': str(timestamps[trade['exit_index']]),
+                'exit': round(float(trade['exit']), 2),
+                'reason': EXIT_REASONS[trade['reason']],
+                'pnl': round(float(trade['pnl']), 2),
+                'cumulative_pnl': round(float(trade['cumulative_pnl']), 2)
+            }
+            for trade in records
+        ]
+        
+        return payload
+
+
+def backtest_result_columns(result, curve=None):
+    """
+    Convert a backtest_strategy result to typed columns (Arrow / columnar payloads)
+    
+    Same fields and rounding as backtest_result_to_json, built with array
+    operations instead of one dict per trade / curve point.
+    
+    Args:
+        result: Successful dict returned by backtest_strategy
+        curve: Equity curve selection, see select_equity_points
+    
+    Returns:
+        (summary, tables) - the scalar fields, and {'trades': {column: array},
+        'equity_curve': {column: array}}
+    """
+    with perf_metrics.stage('serialization'):
+        summary = {key: value for key, value in result.items() if key not in RAW_RESULT_KEYS}
+        timestamps = result['timestamps']
+        records = result['trade_records']
+        equity_index = result['equity_index']
+        
+        selected = select_equity_points(equity_index, timestamps, curve)
+        points = equity_index[selected]
+        equity_curve = {
+            'date': timestamps[points],
+            'equity': np.round(result['equity_values'][selected], 2)
+        }
+        
+        trades = {
+            'entry_time': timestamps[records['entry_index']],
+            'position': np.where(records['side'] == 1, 'long', 'short'),
+            'entry': np.round(records['entry'], 2),
+            'sl': np.round(records['sl'], 2),
+            'tp': np.round(records['tp'], 2),
+            'exit_time': timestamps[records['exit_index']],
+            'exit': np.round(records['exit'], 2),
+            'reason': np.asarray(EXIT_REASONS)[records['reason']],
+            'pnl': np.round(records['pnl'], 2),
+            'cumulative_pnl': np.round(records['cumulative_pnl'], 2)
+        }
+        
+        return summary, {'trades': trades, 'equity_curve': equity_curve}
@@ -0,0 +1,213 @@
+# benchmark.py - Offline benchmarks for the screener and backtester hot paths
+#
+# Usage:
+#   python benchmark.py                          # quick run, JSON to stdout
+#   python benchmark.py --full -o bench.json     # 1k-1M bars, 10-2,000 symbols
+#   python benchmark.py --compare old.json       # flag stages that got slower
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tracemalloc
+import contextlib
+import numpy as np
+import pandas as pd
+import screener
+import screen_pool
+from backtester import backtest_strategy
+
+
+QUICK_BARS = [1000, 10000]
+QUICK_SYMBOLS = [10, 100]
+FULL_BARS = [1000, 10000, 100000, 1000000]
+FULL_SYMBOLS = [10, 100, 500, 2000]
+SCREEN_BARS = 250   # Candles per symbol in screen benchmarks (~1y daily)
+
+ALL_INDICATORS = {
+    'rsi': True, 'macd': True, 'bollinger': True,
+    'stochastic': True, 'adx': True, 'volume': True,
+    'cci': True, 'willr': True, 'mfi': True
+}
+
+
+def synthetic_ohlcv(bars, seed=0, freq='1min'):
+    """
+    Deterministic random-walk OHLCV frame
+
+    Args:
+        bars: Number of candles
+        seed: RNG seed, same seed gives the same frame
+        freq: Candle spacing for the DatetimeIndex
+
+    Returns:
+        DataFrame with Open, High, Low, Close, Volume
+    """
+    rng = np.random.default_rng(seed)
+    close = 1000 * np.exp(np.cumsum(rng.normal(0, 0.002, bars)))
+    spread = np.abs(rng.normal(0, 0.003, bars)) * close
+    high = close + spread * rng.random(bars)
+    low = close - spread * rng.random(bars)
+    open_ = low + (high - low) * rng.random(bars)
+    volume = rng.integers(1000, 500000, bars).astype(np.float64)
+    index = pd.date_range('2015-01-01 09:15', periods=bars, freq=freq, tz='Asia/Kolkata')
+    return pd.DataFrame({'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': volume}, index=index)
+
+
+def synthetic_universe(symbols, bars=SCREEN_BARS):
+    """Dict {symbol: frame} with one seed per symbol"""
+    return {f'SYM{i:04d}': synthetic_ohlcv(bars, seed=i, freq='1D') for i in range(symbols)}
+
+
+def stub_fetch(universe):
+    """Offline stand-in for get_stock_data serving frames from memory"""
+    def fetch(symbol, period='6mo', interval='1d'):
+        return universe.get(symbol)
+    return fetch
+
+
+def measure(func, repeat):
+    """
+    Time func and record its peak traced memory
+
+    Timing runs without tracemalloc, peak memory comes from one extra traced run.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'seconds_min': round(min(timings), 6),
+        'seconds_mean': round(sum(timings) / len(timings), 6),
+        'peak_memory_mb': round(peak / (1024 * 1024), 3)
+    }
+
+
+def bar_stages(bars, max_backtest_bars):
+    """Single-symbol stages at a given history length"""
+    data = synthetic_ohlcv(bars)
+    stages = {
+        'calculate_advanced_indicators': lambda: screener.calculate_advanced_indicators(data),
+        'calculate_indicator_series': lambda: screener.calculate_indicator_series(data),
+        'generate_advanced_signal': lambda: screener.generate_advanced_signal('SYM', ALL_INDICATORS, data=data),
+    }
+    if bars <= max_backtest_bars:
+        stages['backtest_strategy'] = lambda: backtest_strategy(data, ALL_INDICATORS, {'interval': '1m'})
+    return stages
+
+
+def symbol_stages(symbols):
+    """Universe-wide stages at a given symbol count"""
+    universe = synthetic_universe(symbols)
+    fetch = stub_fetch(universe)
+    stocks = list(universe)
+    return {
+        # Signal cache off, every repeat measures the full indicator work
+        'screen_multiple_stocks': lambda: screener.screen_multiple_stocks(
+            stocks, ALL_INDICATORS, '1d', fetch=fetch, use_signal_cache=False
+        ),
+        'screen_cross_section': lambda: screener.screen_cross_section(universe, ALL_INDICATORS),
+        'screen_parallel': lambda: screen_pool.screen_parallel(universe, ALL_INDICATORS, min_symbols=0),
+    }
+
+
+def run_benchmarks(bars_sizes, symbol_sizes, repeat=3, max_backtest_bars=100000, stages=None):
+    """
+    Run every stage at every size
+
+    Returns:
+        Dict with run metadata and one result row per (stage, size)
+    """
+    # Never touch the network, even if a stage falls back to the default fetch
+    screener.get_stock_data = stub_fetch({})
+
+    results = []
+    jobs = [({'bars': bars, 'symbols': 1}, bar_stages(bars, max_backtest_bars)) for bars in bars_sizes]
+    jobs += [({'bars': SCREEN_BARS, 'symbols': symbols}, symbol_stages(symbols)) for symbols in symbol_sizes]
+
+    for size, size_stages in jobs:
+        for name, func in size_stages.items():
+            if stages and name not in stages:
+                continue
+            print(f"{name} bars={size['bars']} symbols={size['symbols']} ...", file=sys.stderr, end=' ', flush=True)
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                row = measure(func, repeat)
+            print(f"{row['seconds_min']:.4f}s", file=sys.stderr)
+            results.append(dict({'stage': name}, **size, **row))
+
+    return {
+        'meta': {
+            'timestamp': str(pd.Timestamp.now()),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'repeat': repeat
+        },
+        'results': results
+    }
+
+
+def compare(current, baseline, threshold=1.2):
+    """
+    Compare two benchmark reports
+
+    Returns:
+        List of rows whose seconds_min grew by more than threshold x
+    """
+    key = lambda row: (row['stage'], row['bars'], row['symbols'])
+    previous = {key(row): row for row in baseline['results']}
+    regressions = []
+    for row in current['results']:
+        old = previous.get(key(row))
+        if old and old['seconds_min'] > 0:
+            ratio = row['seconds_min'] / old['seconds_min']
+            if ratio > threshold:
+                regressions.append(dict(row, baseline_seconds=old['seconds_min'], ratio=round(ratio, 2)))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark screener and backtester hot paths offline')
+    parser.add_argument('--full', action='store_true', help='1k-1M bars and 10-2,000 symbols')
+    parser.add_argument('--bars', type=int, nargs='+', help='History lengths to benchmark')
+    parser.add_argument('--symbols', type=int, nargs='+', help='Universe sizes to benchmark')
+    parser.add_argument('--stages', nargs='+', help='Only run these stages')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--max-backtest-bars', type=int, default=100000,
+                        help='Skip backtest_strategy above this many bars')
+    parser.add_argument('-o', '--output', help='Write JSON here instead of stdout')
+    parser.add_argument('--compare', help='Baseline JSON to check for regressions')
+    parser.add_argument('--threshold', type=float, default=1.2, help='Slowdown ratio counted as a regression')
+    args = parser.parse_args()
+
+    bars_sizes = args.bars or (FULL_BARS if args.full else QUICK_BARS)
+    symbol_sizes = args.symbols or (FULL_SYMBOLS if args.full else QUICK_SYMBOLS)
+    report = run_benchmarks(bars_sizes, symbol_sizes, args.repeat, args.max_backtest_bars, args.stages)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        for row in regressions:
+            print(f"REGRESSION {row['stage']} bars={row['bars']} symbols={row['symbols']}: "
+                  f"{row['baseline_seconds']:.4f}s -> {row['seconds_min']:.4f}s ({row['ratio']}x)", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
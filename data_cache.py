@@ -0,0 +1,302 @@
+# data_cache.py - Persistent OHLCV cache with incremental top-up, shared by all worker processes
+import os
+import re
+import time
+import threading
+from collections import OrderedDict
+import pandas as pd
+from shared_store import shared_store, pack_frame, unpack_frame
+
+
+CACHE_MAX_BYTES = int(float(os.environ.get('OHLCV_CACHE_MAX_MB', 512)) * 1024 * 1024)
+CACHE_MEMORY_MAX_BYTES = int(float(os.environ.get('OHLCV_MEMORY_CACHE_MB', 64)) * 1024 * 1024)   # Per process
+CACHE_ENABLED = os.environ.get('OHLCV_CACHE_ENABLED', '1') != '0'
+
+# Seconds a cached frame is served as-is before the next call tops it up
+CACHE_TTL = {
+    '1m': 60,
+    '2m': 120,
+    '5m': 300,
+    '15m': 900,
+    '30m': 1800,
+    '60m': 3600,
+    '1h': 3600,
+    '1d': 900
+}
+DEFAULT_TTL = 3600
+
+
+def period_to_offset(period):
+    """
+    Convert a yfinance period string to a calendar DateOffset
+
+    Months and years are calendar arithmetic, like yfinance's own
+    relativedelta ('6mo' back from Aug 31 is Feb 28/29).
+
+    Args:
+        period: '1d', '5d', '60d', '1mo', '6mo', '1y', 'max', ...
+
+    Returns:
+        DateOffset, or None for 'max' / unknown periods (no limit)
+    """
+    match = re.fullmatch(r'(\d+)(d|wk|mo|y)', str(period))
+    if not match:
+        return None
+
+    count, unit = int(match.group(1)), match.group(2)
+    units = {'d': 'days', 'wk': 'weeks', 'mo': 'months', 'y': 'years'}
+    return pd.DateOffset(**{units[unit]: count})
+
+
+def period_start(period, end):
+    """First timestamp inside `period` back from end (None for no limit)"""
+    offset = period_to_offset(period)
+    return end - offset if offset is not None else None
+
+
+class OHLCVCache:
+    """
+    Cache of OHLCV frames keyed by (symbol, interval)
+
+    Frames live in the shared store, so every worker process serves what any
+    of them fetched, with a per-process memory copy in front that is
+    dropped as soon as another process writes newer bars (version check).
+    Served frames are read-only views of the stored buffers.
+
+    A frame younger than its interval TTL is a hit. An older frame is topped
+    up by fetching only the bars after its last stored timestamp. A missing
+    frame, or one covering a shorter period than requested, is a miss and is
+    fetched in full. Least recently refreshed frames are evicted past max_bytes.
+    """
+
+    namespace = 'ohlcv'
+
+    def __init__(self, store=shared_store, max_bytes=CACHE_MAX_BYTES, ttl=None,
+                 memory_max_bytes=CACHE_MEMORY_MAX_BYTES):
+        self.store = store
+        self.max_bytes = max_bytes
+        self.memory_max_bytes = memory_max_bytes
+        self.ttl = dict(CACHE_TTL, **(ttl or {}))
+        self.lock = threading.RLock()   # Guards the memory tier and counters
+        self.key_locks = {}             # One lock per (symbol, interval) so fetches overlap
+        self.memory = OrderedDict()     # key -> (version, frame, bytes), least recently used first
+        self.memory_bytes = 0
+        self.hits = 0
+        self.memory_hits = 0
+        self.misses = 0
+        self.topups = 0
+        self.evictions = 0
+
+    def _key(self, symbol, interval):
+        return f"{symbol}|{interval}"
+
+    def _read(self, key, version):
+        """Frame at the given stored version, from memory when this process has it"""
+        with self.lock:
+            cached = self.memory.get(key)
+            if cached is not None and cached[0] == version:
+                self.memory.move_to_end(key)
+                self.memory_hits += 1
+                return cached[1]
+
+        entry = self.store.get(self.namespace, key)
+        if entry is None:
+            return None
+        data = unpack_frame(entry['value'], entry['meta']['frame'])
+        self._remember(key, entry['version'], data, entry['bytes'])
+        return data
+
+    def _remember(self, key, version, data, size):
+        with self.lock:
+            if key in self.memory:
+                self.memory_bytes -= self.memory.pop(key)[2]
+            self.memory[key] = (version, data, size)
+            self.memory_bytes += size
+            while self.memory_bytes > self.memory_max_bytes and self.memory:
+                _, (_, _, dropped) = self.memory.popitem(last=False)
+                self.memory_bytes -= dropped
+
+    def _write(self, symbol, interval, data, period):
+        """Store a frame, returns the stored copy (what a later hit serves)"""
+        key = self._key(symbol, interval)
+        value, frame = pack_frame(data)
+        version = self.store.put(self.namespace, key, value,
+                                 meta={'period': period, 'fetched_at': time.time(), 'frame': frame})
+        stored = unpack_frame(value, frame)
+        self._remember(key, version, stored, len(value))
+        self._evict()
+        return stored
+
+    def _evict(self):
+        """Drop least recently refreshed frames until the cache fits in max_bytes"""
+        _, total = self.store.usage(self.namespace)
+        if total <= self.max_bytes:
+            return
+        for key, size, _ in self.store.entries(self.namespace):
+            if total <= self.max_bytes:
+                break
+            self.store.delete(self.namespace, key)
+            total -= size
+            with self.lock:
+                self.evictions += 1
+
+    def _covers(self, stored_period, period):
+        """True if a frame fetched for stored_period also covers period"""
+        now = pd.Timestamp.now().normalize()
+        stored, requested = period_start(stored_period, now), period_start(period, now)
+        if stored is None:
+            return True
+        return requested is not None and requested >= stored
+
+    def _trim(self, data, period):
+        """Bars within period of the last one, the same for fetched and cached frames"""
+        if data is None or data.empty:
+            return data
+        start = period_start(period, data.index[-1])
+        if start is None:
+            return data
+        return data[data.index >= start]
+
+    def _lookup(self, symbol, period, interval):
+        """
+        Classify a cached frame as 'hit', 'stale' or 'miss' and count it
+
+        Returns:
+            (state, cached DataFrame or None, index entry or None)
+        """
+        key = self._key(symbol, interval)
+        stored = self.store.get(self.namespace, key, with_value=False)
+        entry = dict(stored['meta'], version=stored['version']) if stored is not None else None
+        cached = None
+        if entry is not None and self._covers(entry['period'], period):
+            cached = self._read(key, entry['version'])
+
+        if cached is None or cached.empty:
+            self._count('misses')
+            return 'miss', None, entry
+
+        age = time.time() - entry['fetched_at']
+        if age < self.ttl.get(interval, DEFAULT_TTL):
+            self._count('hits')
+            return 'hit', cached, entry
+
+        self._count('topups')
+        return 'stale', cached, entry
+
+    def _store(self, symbol, period, interval, data):
+        """Store a full-period fetch trimmed to period, returns the frame or None if empty"""
+        if data is None or data.empty:
+            return None
+        return self._write(symbol, interval, self._trim(data, period), period)
+
+    def _top_up(self, symbol, period, interval, cached, entry, fresh):
+        """Merge freshly fetched bars into a stale frame"""
+        if fresh is None or fresh.empty:
+            return self._trim(cached, period)
+
+        merged = pd.concat([cached, fresh])
+        merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+        merged = self._write(symbol, interval, self._trim(merged, entry['period']), entry['period'])
+        return self._trim(merged, period)
+
+    def get(self, symbol, period, interval, fetch):
+        """
+        Get OHLCV data through the cache
+
+        Args:
+            symbol: Full ticker (e.g. 'RELIANCE.NS')
+            period, interval: yfinance period / interval
+            fetch: Callable(symbol, period=..., interval=..., start=...) that
+                   downloads bars, returns DataFrame or None
+
+        Returns:
+            DataFrame with OHLC data or None if nothing could be fetched
+        """
+        key = self._key(symbol, interval)
+        with self.lock:
+            key_lock = self.key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            state, cached, entry = self._lookup(symbol, period, interval)
+
+            if state == 'hit':
+                return self._trim(cached, period)
+
+            # Miss - fetch the full period
+            if state == 'miss':
+                return self._store(symbol, period, interval, fetch(symbol, period=period, interval=interval))
+
+            # Stale - fetch only bars from the last stored one onward (it may have been partial)
+            fresh = fetch(symbol, interval=interval, start=cached.index[-1])
+            return self._top_up(symbol, period, interval, cached, entry, fresh)
+
+    def get_many(self, symbols, period, interval, fetch_many):
+        """
+        Get OHLCV data for many symbols with at most two batched fetches
+
+        Args:
+            symbols: List of full tickers
+            period, interval: yfinance period / interval
+            fetch_many: Callable(symbols, period=..., interval=..., start=...)
+                        returning {symbol: DataFrame or None}
+
+        Returns:
+            Dict {symbol: DataFrame or None}
+        """
+        results = {}
+        stale = {}
+        misses = []
+
+        for symbol in dict.fromkeys(symbols):
+            state, cached, entry = self._lookup(symbol, period, interval)
+            if state == 'hit':
+                results[symbol] = self._trim(cached, period)
+            elif state == 'stale':
+                stale[symbol] = (cached, entry)
+            else:
+                misses.append(symbol)
+
+        # One full-period request for every miss
+        if misses:
+            fetched = fetch_many(misses, period=period, interval=interval)
+            for symbol in misses:
+                results[symbol] = self._store(symbol, period, interval, fetched.get(symbol))
+
+        # One top-up request from the oldest last bar among the stale frames
+        if stale:
+            start = min(cached.index[-1] for cached, _ in stale.values())
+            fetched = fetch_many(list(stale), interval=interval, start=start)
+            for symbol, (cached, entry) in stale.items():
+                fresh = fetched.get(symbol)
+                if fresh is not None:
+                    fresh = fresh[fresh.index >= cached.index[-1]]
+                results[symbol] = self._top_up(symbol, period, interval, cached, entry, fresh)
+
+        return results
+
+    def _count(self, counter):
+        with self.lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def stats(self):
+        """Hit/miss counters (this process) and shared usage for monitoring"""
+        entries, size = self.store.usage(self.namespace)
+        with self.lock:
+            lookups = self.hits + self.misses + self.topups
+            return {
+                'hits': self.hits,
+                'memory_hits': self.memory_hits,
+                'misses': self.misses,
+                'topups': self.topups,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups * 100, 1) if lookups else 0,
+                'entries': entries,
+                'bytes': size,
+                'max_bytes': self.max_bytes,
+                'memory_entries': len(self.memory),
+                'memory_bytes': self.memory_bytes
+            }
+
+
+# Global cache instance (shared across app)
+ohlcv_cache = OHLCVCache()
@@ -0,0 +1,206 @@
+# history_store.py - Memory-mapped columnar OHLCV store for large local datasets
+#
+# Each (symbol, interval) is a directory of raw .npy columns converted once
+# from CSV. Loading memory-maps them, so a date-range slice costs two binary
+# searches and no parsing, and the returned frame shares memory with the files.
+#
+# Usage:
+#   python history_store.py import RELIANCE_1m.csv --symbol RELIANCE --interval 1m
+#   python history_store.py list
+import os
+import re
+import sys
+import json
+import shutil
+import argparse
+import numpy as np
+import pandas as pd
+from backtester import load_csv_chunked, PRICE_COLUMNS, CSV_CHUNK_ROWS
+
+
+HISTORY_DIR = os.environ.get('HISTORY_DIR', os.path.join('data', 'history'))
+
+
+class HistoryStore:
+    """
+    On-disk columnar OHLCV history, one directory per (symbol, interval)
+
+    Layout: <root>/<SYMBOL>/<interval>/{timestamp,Open,High,Low,Close,Volume}.npy
+    plus meta.json (rows, tz, first/last bar). Timestamps are int64
+    nanoseconds, UTC for tz-aware data.
+    """
+
+    def __init__(self, root=HISTORY_DIR):
+        self.root = root
+
+    def _dir(self, symbol, interval):
+        clean = lambda value: re.sub(r'[^A-Za-z0-9._-]', '_', str(value))
+        return os.path.join(self.root, clean(symbol.upper()), clean(interval))
+
+    def _read_meta(self, symbol, interval):
+        try:
+            with open(os.path.join(self._dir(symbol, interval), 'meta.json')) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def exists(self, symbol, interval):
+        return self._read_meta(symbol, interval) is not None
+
+    def write(self, symbol, interval, data):
+        """
+        Replace the stored history with a DataFrame
+
+        Args:
+            symbol, interval: Store key
+            data: DataFrame with a DatetimeIndex and Open/High/Low/Close/Volume
+
+        Returns:
+            Number of rows stored
+        """
+        data = data[~data.index.duplicated(keep='last')].sort_index()
+        tz = str(data.index.tz) if data.index.tz is not None else None
+        index = data.index.tz_convert('UTC').tz_localize(None) if tz else data.index
+
+        target = self._dir(symbol, interval)
+        tmp_dir = f"{target}.{os.getpid()}.tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+
+        np.save(os.path.join(tmp_dir, 'timestamp.npy'), index.values.astype('datetime64[ns]').view(np.int64))
+        for col in PRICE_COLUMNS:
+            np.save(os.path.join(tmp_dir, f'{col}.npy'), np.asarray(data[col].values, dtype=np.float64))
+        with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f:
+            json.dump({
+                'symbol': symbol.upper(),
+                'interval': interval,
+                'rows': len(data),
+                'tz': tz,
+                'first': str(data.index[0]) if len(data) else None,
+                'last': str(data.index[-1]) if len(data) else None
+            }, f)
+
+        # Swap directories, readers holding old memmaps keep their (unlinked) files
+        old_dir = f"{target}.{os.getpid()}.old"
+        if os.path.exists(target):
+            os.replace(target, old_dir)
+        os.replace(tmp_dir, target)
+        shutil.rmtree(old_dir, ignore_errors=True)
+        return len(data)
+
+    def import_csv(self, source, symbol, interval, append=False, chunk_rows=CSV_CHUNK_ROWS):
+        """
+        Convert a CSV (Date, Open, High, Low, Close[, Volume]) into the store
+
+        Args:
+            source: File path or file-like object
+            symbol, interval: Store key
+            append: Merge into existing history instead of replacing it
+                    (rows with the same timestamp take the new values)
+            chunk_rows: Rows parsed per pandas chunk
+
+        Returns:
+            Total rows stored
+        """
+        data, error = load_csv_chunked(source, chunk_rows)
+        if error:
+            raise ValueError(error)
+
+        if append and self.exists(symbol, interval):
+            existing = self.load(symbol, interval)
+            # Keep the stored timezone (CSV offsets parse as fixed UTC+hh:mm zones)
+            if existing.index.tz is not None:
+                if data.index.tz is None:
+                    data.index = data.index.tz_localize(existing.index.tz)
+                else:
+                    data.index = data.index.tz_convert(existing.index.tz)
+            data = pd.concat([existing, data])
+
+        rows = self.write(symbol, interval, data)
+        print(f"Stored {rows} rows for {symbol.upper()} {interval}")
+        return rows
+
+    def load(self, symbol, interval, start=None, end=None):
+        """
+        Memory-mapped OHLCV frame, optionally sliced to [start, end]
+
+        Args:
+            symbol, interval: Store key
+            start, end: Optional dates / timestamps (inclusive), naive values are
+                        read in the stored timezone
+
+        Returns:
+            DataFrame like load_csv_data's (read-only columns backed by the
+            store files), or None if the symbol/interval is not stored
+        """
+        meta = self._read_meta(symbol, interval)
+        if meta is None:
+            return None
+        folder = self._dir(symbol, interval)
+        timestamps = np.load(os.path.join(folder, 'timestamp.npy'), mmap_mode='r')
+
+        def position(value, side):
+            stamp = pd.Timestamp(value)
+            if meta['tz'] and stamp.tzinfo is None:
+                stamp = stamp.tz_localize(meta['tz'])
+            if stamp.tzinfo is not None:
+                stamp = stamp.tz_convert('UTC').tz_localize(None)
+            return int(np.searchsorted(timestamps, stamp.value, side=side))
+
+        first = position(start, 'left') if start is not None else 0
+        last = position(end, 'right') if end is not None else len(timestamps)
+
+        index = pd.DatetimeIndex(np.asarray(timestamps[first:last]).view('datetime64[ns]'))
+        if meta['tz']:
+            index = index.tz_localize('UTC').tz_convert(meta['tz'])
+        columns = {
+            col: np.load(os.path.join(folder, f'{col}.npy'), mmap_mode='r')[first:last]
+            for col in PRICE_COLUMNS
+        }
+        # copy=False keeps each column a view of its memmap
+        return pd.DataFrame(columns, index=index, copy=False)
+
+    def available(self):
+        """Metadata of every stored (symbol, interval)"""
+        entries = []
+        if not os.path.isdir(self.root):
+            return entries
+        for symbol in sorted(os.listdir(self.root)):
+            symbol_dir = os.path.join(self.root, symbol)
+            if not os.path.isdir(symbol_dir):
+                continue
+            for interval in sorted(os.listdir(symbol_dir)):
+                meta = self._read_meta(symbol, interval)
+                if meta is not None:
+                    entries.append(meta)
+        return entries
+
+
+# Global store instance (shared across app)
+history_store = HistoryStore()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Manage the local memory-mapped OHLCV history store')
+    commands = parser.add_subparsers(dest='command', required=True)
+    importer = commands.add_parser('import', help='Convert a CSV into the store')
+    importer.add_argument('csv', help='CSV with Date, Open, High, Low, Close[, Volume]')
+    importer.add_argument('--symbol', required=True)
+    importer.add_argument('--interval', required=True, help="e.g. 1m, 5m, 1d")
+    importer.add_argument('--append', action='store_true', help='Merge into existing history')
+    commands.add_parser('list', help='Show stored symbols and intervals')
+    args = parser.parse_args()
+
+    if args.command == 'import':
+        try:
+            history_store.import_csv(args.csv, args.symbol, args.interval, append=args.append)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+    else:
+        for meta in history_store.available():
+            print(f"{meta['symbol']:<15} {meta['interval']:<5} {meta['rows']:>10} rows  {meta['first']} -> {meta['last']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,300 @@
+# indicators.py - Indicator registry: inputs, parameters and vote rules
+#
+# Series are computed on demand: a screen or backtest asks for the keys its
+# selected indicators (and the risk score) need, and each series group runs
+# once per call even when several indicators share it (e.g. SMA-20 for both
+# the ADX and Volume votes).
+import re
+import copy
+import numpy as np
+import talib as ta
+
+
+# Periods and thresholds per indicator (the values every screen used before
+# they became configurable)
+DEFAULT_INDICATOR_PARAMS = {
+    'rsi': {'timeperiod': 14, 'oversold': 30, 'overbought': 70},
+    'macd': {'fastperiod': 12, 'slowperiod': 26, 'signalperiod': 9},
+    'bollinger': {'timeperiod': 20, 'nbdev': 2.0},
+    'stochastic': {'fastk_period': 5, 'slowk_period': 3, 'slowd_period': 3, 'oversold': 20, 'overbought': 80},
+    'adx': {'timeperiod': 14, 'threshold': 25, 'sma_period': 20},
+    'volume': {'window': 20, 'surge': 1.5, 'sma_period': 20},
+    'cci': {'timeperiod': 14, 'oversold': -100, 'overbought': 100},
+    'willr': {'timeperiod': 14, 'oversold': -80, 'overbought': -20},
+    'mfi': {'timeperiod': 14, 'oversold': 20, 'overbought': 80},
+    'atr': {'timeperiod': 14},
+    'risk': {'rsi_high': 80, 'rsi_low': 20, 'adx_low': 20, 'volume_ratio_low': 0.5}
+}
+
+
+def merge_indicator_params(params=None):
+    """
+    Defaults overlaid with (possibly partial) per-indicator overrides
+
+    Raises:
+        ValueError: Unknown indicator or parameter name
+    """
+    merged = copy.deepcopy(DEFAULT_INDICATOR_PARAMS)
+    for name, overrides in (params or {}).items():
+        if name not in merged:
+            raise ValueError(f"Unknown indicator: {name}")
+        unknown = [key for key in overrides if key not in merged[name]]
+        if unknown:
+            raise ValueError(f"Unknown {name} parameters: {', '.join(unknown)}")
+        merged[name].update(overrides)
+    return merged
+
+
+# ===== Series registry =====
+
+def _volume_stats(inputs, p):
+    # Trailing mean over `window` bars, shorter window at the start
+    volume, window = inputs['volume'], int(p['window'])
+    avg_volume = np.empty(len(volume))
+    head = min(window - 1, len(volume))
+    for i in range(head):
+        avg_volume[i] = np.mean(volume[:i + 1])
+    if len(volume) >= window:
+        windows = np.lib.stride_tricks.sliding_window_view(volume, window)
+        avg_volume[window - 1:] = np.mean(windows, axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        volume_ratio = volume / avg_volume
+    return {'avg_volume': avg_volume, 'current_volume': volume, 'volume_ratio': volume_ratio}
+
+
+def _raw(function):
+    # TA-Lib's C function without the pandas/polars input check wrapped around it
+    return getattr(function, '__wrapped__', function)
+
+
+_HLC = ['high', 'low', 'close']
+_PERIOD = lambda p: {'timeperiod': p['timeperiod']}
+
+# TA-Lib series group -> (params owner, function, input names, params -> kwargs, output keys)
+TALIB_SERIES = {
+    'rsi': ('rsi', _raw(ta.RSI), ['close'], _PERIOD, ['rsi']),
+    'macd': ('macd', _raw(ta.MACD), ['close'],
+             lambda p: {'fastperiod': p['fastperiod'], 'slowperiod': p['slowperiod'],
+                        'signalperiod': p['signalperiod']},
+             ['macd', 'macd_signal', 'macd_histogram']),
+    'bbands': ('bollinger', _raw(ta.BBANDS), ['close'],
+               lambda p: {'timeperiod': p['timeperiod'], 'nbdevup': p['nbdev'], 'nbdevdn': p['nbdev']},
+               ['bb_upper', 'bb_middle', 'bb_lower']),
+    'stoch': ('stochastic', _raw(ta.STOCH), _HLC,
+              lambda p: {'fastk_period': p['fastk_period'], 'slowk_period': p['slowk_period'],
+                         'slowd_period': p['slowd_period']},
+              ['stoch_k', 'stoch_d']),
+    'adx': ('adx', _raw(ta.ADX), _HLC, _PERIOD, ['adx']),
+    'cci': ('cci', _raw(ta.CCI), _HLC, _PERIOD, ['cci']),
+    'willr': ('willr', _raw(ta.WILLR), _HLC, _PERIOD, ['willr']),
+    'mfi': ('mfi', _raw(ta.MFI), _HLC + ['volume'], _PERIOD, ['mfi']),
+    'atr': ('atr', _raw(ta.ATR), _HLC, _PERIOD, ['atr'])
+}
+
+
+def _talib_group(function, names, kwargs, outputs):
+    def compute(inputs, p):
+        result = function(*[inputs[name] for name in names], **kwargs(p))
+        return dict(zip(outputs, result if len(outputs) > 1 else [result]))
+    return compute
+
+
+# Series group -> (params owner, compute(inputs, params) -> {key: array})
+SERIES_GROUPS = {
+    group: (owner, _talib_group(function, names, kwargs, outputs))
+    for group, (owner, function, names, kwargs, outputs) in TALIB_SERIES.items()
+}
+SERIES_GROUPS['volume'] = ('volume', _volume_stats)
+
+# Output key -> series group
+SERIES_KEYS = {
+    'rsi': 'rsi',
+    'macd': 'macd', 'macd_signal': 'macd', 'macd_histogram': 'macd',
+    'bb_upper': 'bbands', 'bb_middle': 'bbands', 'bb_lower': 'bbands',
+    'stoch_k': 'stoch', 'stoch_d': 'stoch',
+    'adx': 'adx',
+    'cci': 'cci',
+    'willr': 'willr',
+    'mfi': 'mfi',
+    'avg_volume': 'volume', 'current_volume': 'volume', 'volume_ratio': 'volume',
+    'atr': 'atr'
+}
+
+# Every key calculate_indicator_series returns by default (in its historical order)
+ALL_SERIES = [
+    'rsi', 'macd', 'macd_signal', 'macd_histogram', 'bb_upper', 'bb_middle', 'bb_lower',
+    'sma_20', 'sma_50', 'ema_12', 'ema_26', 'stoch_k', 'stoch_d', 'adx', 'cci', 'willr', 'mfi',
+    'avg_volume', 'current_volume', 'volume_ratio', 'atr'
+]
+
+# sma_<period> / ema_<period> for any period
+_MOVING_AVERAGE = re.compile(r'(sma|ema)_(\d+)')
+
+
+def compute_series(inputs, keys, params=None):
+    """
+    Compute the requested series, each group at most once
+
+    Args:
+        inputs: Dict with float64 'close', 'high', 'low', 'volume' arrays
+        keys: Series keys (see ALL_SERIES, plus any sma_N / ema_N)
+        params: Merged indicator params (merge_indicator_params)
+
+    Returns:
+        Dict {key: array} with exactly the requested keys
+    """
+    params = params or DEFAULT_INDICATOR_PARAMS
+    computed = {}
+    for key in keys:
+        if key in computed:
+            continue
+        moving_average = _MOVING_AVERAGE.fullmatch(key)
+        if moving_average:
+            kind, period = moving_average.groups()
+            function = ta.SMA if kind == 'sma' else ta.EMA
+            computed[key] = function(inputs['close'], timeperiod=int(period))
+        elif key in SERIES_KEYS:
+            owner, compute = SERIES_GROUPS[SERIES_KEYS[key]]
+            computed.update(compute(inputs, params[owner]))
+        else:
+            raise KeyError(f"Unknown indicator series: {key}")
+    return {key: computed[key] for key in keys}
+
+
+def talib_plan(keys, params=None):
+    """
+    The TA-Lib calls that produce keys, resolved once to run on many rows
+
+    Args:
+        keys: TA-Lib series keys and ema_N (no sma_N or volume stats)
+        params: Merged indicator params (merge_indicator_params)
+
+    Returns:
+        List of (function, input names, kwargs, output keys), one per call;
+        an output key is None where the call's series isn't wanted
+    """
+    params = params or DEFAULT_INDICATOR_PARAMS
+    wanted = set(keys)
+    plan = []
+    groups = []
+    for key in keys:
+        moving_average = _MOVING_AVERAGE.fullmatch(key)
+        if moving_average:
+            kind, period = moving_average.groups()
+            function = _raw(ta.SMA if kind == 'sma' else ta.EMA)
+            plan.append((function, ['close'], {'timeperiod': int(period)}, [key]))
+        elif SERIES_KEYS.get(key) in TALIB_SERIES:
+            group = SERIES_KEYS[key]
+            if group in groups:
+                continue
+            groups.append(group)
+            owner, function, names, kwargs, outputs = TALIB_SERIES[group]
+            plan.append((function, names, kwargs(params[owner]),
+                         [output if output in wanted else None for output in outputs]))
+        else:
+            raise KeyError(f"Not a TA-Lib series: {key}")
+    return plan
+
+
+# ===== Vote registry =====
+
+def _threshold_vote(key):
+    return lambda v, price, p: (v[key] < p['oversold'], v[key] > p['overbought'])
+
+
+def _trend_vote(v, price, p):
+    trending = v['adx'] > p['threshold']
+    above_sma = price > v[f"sma_{int(p['sma_period'])}"]
+    return trending & above_sma, trending & ~above_sma
+
+
+def _volume_vote(v, price, p):
+    surge = v['volume_ratio'] > p['surge']
+    above_sma = price > v[f"sma_{int(p['sma_period'])}"]
+    return surge & above_sma, surge & ~above_sma
+
+
+# Vote indicators in vote order. Each entry:
+#   series(params) -> keys it reads
+#   vote(values, price, params) -> (buy, sell) bool scalars or arrays
+#   needs_volume: dropped from the vote when the data has no volume
+INDICATORS = {
+    'rsi': {
+        'series': lambda p: ['rsi'],
+        'vote': _threshold_vote('rsi'),
+        'needs_volume': False
+    },
+    'macd': {
+        'series': lambda p: ['macd', 'macd_signal', 'macd_histogram'],
+        'vote': lambda v, price, p: (
+            (v['macd'] > v['macd_signal']) & (v['macd_histogram'] > 0),
+            (v['macd'] < v['macd_signal']) & (v['macd_histogram'] < 0)
+        ),
+        'needs_volume': False
+    },
+    'bollinger': {
+        'series': lambda p: ['bb_upper', 'bb_lower'],
+        'vote': lambda v, price, p: (price < v['bb_lower'], price > v['bb_upper']),
+        'needs_volume': False
+    },
+    'stochastic': {
+        'series': lambda p: ['stoch_k', 'stoch_d'],
+        'vote': lambda v, price, p: (
+            (v['stoch_k'] < p['oversold']) & (v['stoch_d'] < p['oversold']),
+            (v['stoch_k'] > p['overbought']) & (v['stoch_d'] > p['overbought'])
+        ),
+        'needs_volume': False
+    },
+    'adx': {
+        'series': lambda p: ['adx', f"sma_{int(p['sma_period'])}"],
+        'vote': _trend_vote,
+        'needs_volume': False
+    },
+    'volume': {
+        'series': lambda p: ['volume_ratio', f"sma_{int(p['sma_period'])}"],
+        'vote': _volume_vote,
+        'needs_volume': True
+    },
+    'cci': {
+        'series': lambda p: ['cci'],
+        'vote': _threshold_vote('cci'),
+        'needs_volume': False
+    },
+    'willr': {
+        'series': lambda p: ['willr'],
+        'vote': _threshold_vote('willr'),
+        'needs_volume': False
+    },
+    'mfi': {
+        'series': lambda p: ['mfi'],
+        'vote': _threshold_vote('mfi'),
+        'needs_volume': True
+    }
+}
+
+INDICATOR_NAMES = list(INDICATORS)
+
+# Series the risk score reads
+RISK_SERIES = ['rsi', 'adx', 'volume_ratio']
+
+
+def required_series(selected_indicators, params=None, risk=False):
+    """
+    Series keys needed to vote with the selected indicators
+
+    Args:
+        selected_indicators: Dict of which indicators to use (None = all)
+        params: Merged indicator params
+        risk: Also include what the risk score needs
+
+    Returns:
+        List of unique keys, in first-use order
+    """
+    params = params or DEFAULT_INDICATOR_PARAMS
+    keys = []
+    for name, spec in INDICATORS.items():
+        if selected_indicators is None or selected_indicators.get(name, False):
+            keys.extend(spec['series'](params[name]))
+    if risk:
+        keys.extend(RISK_SERIES)
+    return list(dict.fromkeys(keys))
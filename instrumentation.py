@@ -0,0 +1,221 @@
+# instrumentation.py - Stage timers, counters, log level and per-request profiling
+#
+# Timers and counters are process-wide and cheap (one perf_counter pair and a
+# lock per stage). While a request is being timed (start_request), stages
+# run in its context are also collected for its Server-Timing header.
+import os
+import io
+import time
+import pstats
+import cProfile
+import threading
+import contextvars
+from collections import OrderedDict
+from contextlib import contextmanager
+
+try:
+    from pyinstrument import Profiler as PyinstrumentProfiler
+except ImportError:
+    PyinstrumentProfiler = None
+
+
+# ===== Log level =====
+
+LOG_LEVELS = {'debug': 10, 'info': 20, 'warning': 30, 'error': 40}
+_log_level = LOG_LEVELS.get(os.environ.get('LOG_LEVEL', 'info').lower(), LOG_LEVELS['info'])
+
+
+def set_log_level(level):
+    """Set the level by name ('debug', 'info', 'warning', 'error')"""
+    global _log_level
+    if level not in LOG_LEVELS:
+        raise ValueError(f"Unknown log level: {level}. Allowed: {', '.join(LOG_LEVELS)}")
+    _log_level = LOG_LEVELS[level]
+
+
+def log_enabled(level):
+    return LOG_LEVELS[level] >= _log_level
+
+
+def debug(message):
+    """Print per-symbol / per-trade detail, only at LOG_LEVEL=debug"""
+    if _log_level <= LOG_LEVELS['debug']:
+        print(message)
+
+
+def info(message):
+    """Print a progress line (request received, run started/finished), hidden at LOG_LEVEL=warning and above"""
+    if _log_level <= LOG_LEVELS['info']:
+        print(message)
+
+
+# ===== Timers and counters =====
+
+TIMING_HEADERS = os.environ.get('TIMING_HEADERS', '0') == '1'   # Server-Timing on every response
+PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', '0') == '1'   # Allow ?profile=1 requests
+PROFILES_KEPT = 20
+
+# Stage durations of the request being handled (None outside a timed request)
+_request_timings = contextvars.ContextVar('request_timings', default=None)
+
+
+class PerfMetrics:
+    """
+    Process-wide stage timers and counters
+
+    A timer keeps count, total, min and max seconds; a counter is an int.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.timers = {}
+        self.counters = {}
+        self.started_at = time.time()
+
+    def record(self, name, seconds):
+        with self.lock:
+            timer = self.timers.get(name)
+            if timer is None:
+                self.timers[name] = {'count': 1, 'total': seconds, 'min': seconds, 'max': seconds}
+            else:
+                timer['count'] += 1
+                timer['total'] += seconds
+                timer['min'] = min(timer['min'], seconds)
+                timer['max'] = max(timer['max'], seconds)
+        timings = _request_timings.get()
+        if timings is not None:
+            with self.lock:
+                timings[name] = timings.get(name, 0.0) + seconds
+
+    def increment(self, name, amount=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    @contextmanager
+    def stage(self, name):
+        """Time the enclosed block as one call of the named stage"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def snapshot(self):
+        """JSON-safe copy of every timer (milliseconds) and counter"""
+        with self.lock:
+            timers = {
+                name: {
+                    'count': timer['count'],
+                    'total_ms': round(timer['total'] * 1000, 3),
+                    'mean_ms': round(timer['total'] / timer['count'] * 1000, 3),
+                    'min_ms': round(timer['min'] * 1000, 3),
+                    'max_ms': round(timer['max'] * 1000, 3)
+                }
+                for name, timer in sorted(self.timers.items())
+            }
+            return {
+                'uptime_seconds': round(time.time() - self.started_at, 1),
+                'timers': timers,
+                'counters': dict(sorted(self.counters.items()))
+            }
+
+    def reset(self):
+        with self.lock:
+            self.timers.clear()
+            self.counters.clear()
+            self.started_at = time.time()
+
+
+# Global metrics instance (shared across app)
+perf_metrics = PerfMetrics()
+
+
+def start_request():
+    """Start collecting stage timings for the current request, returns a token"""
+    return _request_timings.set({})
+
+
+def finish_request(token):
+    """
+    Stop collecting for the request started with token
+
+    Returns:
+        Dict {stage: seconds} of the stages it ran
+    """
+    timings = _request_timings.get() or {}
+    _request_timings.reset(token)
+    return timings
+
+
+def server_timing_header(timings, total=None):
+    """Format stage timings as a Server-Timing header value"""
+    parts = [f"{name.replace(' ', '_')};dur={seconds * 1000:.2f}" for name, seconds in timings.items()]
+    if total is not None:
+        parts.append(f"total;dur={total * 1000:.2f}")
+    return ', '.join(parts)
+
+
+# ===== Profiling =====
+
+class RequestProfiler:
+    """
+    cProfile (or pyinstrument, when installed and asked for) capture of one request
+
+    Reports of the last PROFILES_KEPT captures are kept in memory by id.
+    """
+
+    def __init__(self, kept=PROFILES_KEPT):
+        self.kept = kept
+        self.lock = threading.Lock()
+        self.reports = OrderedDict()   # id -> {'id', 'path', 'engine', 'report'}
+        self.next_id = 1
+
+    def start(self, engine='cprofile'):
+        if engine == 'pyinstrument' and PyinstrumentProfiler is not None:
+            profiler = PyinstrumentProfiler()
+        else:
+            engine = 'cprofile'
+            profiler = cProfile.Profile()
+        if engine == 'pyinstrument':
+            profiler.start()
+        else:
+            profiler.enable()
+        return engine, profiler
+
+    def stop(self, session, path, limit=40):
+        """
+        Stop a capture from start() and store its report
+
+        Returns:
+            Profile id
+        """
+        engine, profiler = session
+        if engine == 'pyinstrument':
+            profiler.stop()
+            report = profiler.output_text()
+        else:
+            profiler.disable()
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(limit)
+            report = out.getvalue()
+
+        with self.lock:
+            profile_id = self.next_id
+            self.next_id += 1
+            self.reports[profile_id] = {'id': profile_id, 'path': path, 'engine': engine, 'report': report}
+            while len(self.reports) > self.kept:
+                self.reports.popitem(last=False)
+        return profile_id
+
+    def get(self, profile_id):
+        with self.lock:
+            return self.reports.get(profile_id)
+
+    def list(self):
+        with self.lock:
+            return [{'id': entry['id'], 'path': entry['path'], 'engine': entry['engine']}
+                    for entry in self.reports.values()]
+
+
+# Global profiler (shared across app)
+request_profiler = RequestProfiler()
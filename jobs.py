@@ -0,0 +1,225 @@
+# jobs.py - In-process background job queue for long-running backtests
+import os
+import json
+import time
+import uuid
+import sqlite3
+import threading
+import traceback
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from shared_store import shared_store
+from serialization import dumps
+
+
+JOB_WORKERS = int(os.environ.get('BACKTEST_JOB_WORKERS', 2))
+JOB_MAX_RETAINED = int(os.environ.get('BACKTEST_JOB_MAX_RETAINED', 100))       # Finished jobs kept
+JOB_RETENTION_SECONDS = int(os.environ.get('BACKTEST_JOB_RETENTION', 3600))    # Age before a finished job is dropped
+PUBLISH_INTERVAL = 0.5   # Seconds between progress writes / cancel checks through the shared store
+
+FINISHED_STATES = {'done', 'failed', 'cancelled'}
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when its cancellation has been requested"""
+    pass
+
+
+class JobQueue:
+    """
+    Thread pool running submitted functions as trackable jobs
+
+    A job is queued, then running, then done / failed / cancelled. The job
+    function gets a progress(done, total, stage=None) callback; cancelling a
+    running job makes its next progress call raise JobCancelled. Finished
+    jobs are kept for retention_seconds, at most max_retained of them.
+
+    A job runs in the process that queued it. Its status and result are
+    also published to the shared store, so status / result / cancel / list
+    work from any worker process (a cancel from another process is picked
+    up within PUBLISH_INTERVAL).
+    """
+
+    namespace = 'jobs'
+    results_namespace = 'job_results'
+    cancel_namespace = 'job_cancel'
+
+    def __init__(self, workers=JOB_WORKERS, max_retained=JOB_MAX_RETAINED,
+                 retention_seconds=JOB_RETENTION_SECONDS, store=shared_store):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='backtest-job')
+        self.max_retained = max_retained
+        self.retention_seconds = retention_seconds
+        self.store = store
+        self.lock = threading.Lock()
+        self.jobs = OrderedDict()   # job id -> job dict, in submission order
+
+    def submit(self, func, *args, kind='backtest', **kwargs):
+        """
+        Queue func(*args, progress=..., **kwargs)
+
+        Returns:
+            Job id
+        """
+        job_id = uuid.uuid4().hex
+        job = {
+            'id': job_id,
+            'kind': kind,
+            'status': 'queued',
+            'stage': None,
+            'progress': {'done': 0, 'total': 0},
+            'created_at': time.time(),
+            'started_at': None,
+            'finished_at': None,
+            'result': None,
+            'error': None,
+            'cancel': threading.Event(),
+            'future': None,
+            'published_at': 0.0
+        }
+        with self.lock:
+            self._prune()
+            self.jobs[job_id] = job
+        self._publish(job)
+        job['future'] = self.executor.submit(self._run, job, func, args, kwargs)
+        return job_id
+
+    def _run(self, job, func, args, kwargs):
+        def progress(done, total, stage=None):
+            job['progress'] = {'done': int(done), 'total': int(total)}
+            if stage is not None:
+                job['stage'] = stage
+            if time.time() - job['published_at'] >= PUBLISH_INTERVAL:
+                self._publish(job)
+                self._check_shared_cancel(job)
+            if job['cancel'].is_set():
+                raise JobCancelled()
+
+        self._check_shared_cancel(job)
+        if job['cancel'].is_set():
+            self._finish(job, 'cancelled')
+            return
+        job['status'] = 'running'
+        job['started_at'] = time.time()
+        self._publish(job)
+        try:
+            result = func(*args, progress=progress, **kwargs)
+            self._finish(job, 'done', result=result)
+        except JobCancelled:
+            self._finish(job, 'cancelled')
+        except Exception as e:
+            print(f"Job {job['id']} failed: {str(e)}")
+            traceback.print_exc()
+            self._finish(job, 'failed', error=str(e))
+
+    def _finish(self, job, status, result=None, error=None):
+        job['result'] = result
+        job['error'] = error
+        job['finished_at'] = time.time()
+        if result is not None:
+            self._shared('put', self.results_namespace, job['id'], dumps(result), ttl=self.retention_seconds)
+        job['status'] = status
+        self._publish(job)
+
+    def _shared(self, method, *args, **kwargs):
+        """Call a shared store method, None if the store is unavailable (the job itself carries on)"""
+        try:
+            return getattr(self.store, method)(*args, **kwargs)
+        except sqlite3.Error as e:
+            print(f"Shared job state unavailable: {e}")
+            return None
+
+    def _publish(self, job):
+        job['published_at'] = time.time()
+        self._shared('put', self.namespace, job['id'], dumps(self._summary(job)), ttl=self.retention_seconds)
+
+    def _check_shared_cancel(self, job):
+        if self._shared('get', self.cancel_namespace, job['id'], with_value=False) is not None:
+            job['cancel'].set()
+
+    def _prune(self):
+        """Drop finished jobs past the retention age or count (lock held)"""
+        now = time.time()
+        finished = [job_id for job_id, job in self.jobs.items() if job['status'] in FINISHED_STATES]
+        for job_id in finished:
+            if now - self.jobs[job_id]['finished_at'] > self.retention_seconds:
+                del self.jobs[job_id]
+        finished = [job_id for job_id in finished if job_id in self.jobs]
+        for job_id in finished[:max(len(finished) - self.max_retained, 0)]:
+            del self.jobs[job_id]
+
+    def get(self, job_id):
+        with self.lock:
+            self._prune()
+            return self.jobs.get(job_id)
+
+    def _summary(self, job):
+        done, total = job['progress']['done'], job['progress']['total']
+        return {
+            'id': job['id'],
+            'kind': job['kind'],
+            'status': job['status'],
+            'stage': job['stage'],
+            'progress': dict(job['progress'], percent=round(done / total * 100, 1) if total else 0),
+            'created_at': job['created_at'],
+            'started_at': job['started_at'],
+            'finished_at': job['finished_at'],
+            'error': job['error']
+        }
+
+    def status(self, job_id):
+        """
+        JSON-safe job summary without the result
+
+        Returns:
+            Dict, or None for an unknown (or expired) job id
+        """
+        job = self.get(job_id)
+        if job is not None:
+            return self._summary(job)
+        # Queued by another worker process
+        entry = self._shared('get', self.namespace, job_id)
+        return json.loads(entry['value']) if entry is not None else None
+
+    def result(self, job_id):
+        job = self.get(job_id)
+        if job is not None:
+            return job['result']
+        entry = self._shared('get', self.results_namespace, job_id)
+        return json.loads(entry['value']) if entry is not None else None
+
+    def cancel(self, job_id):
+        """
+        Request cancellation
+
+        Returns:
+            False if the job is unknown or already finished
+        """
+        job = self.get(job_id)
+        if job is None:
+            # Running in another worker process, it polls for this flag
+            status = self.status(job_id)
+            if status is None or status['status'] in FINISHED_STATES:
+                return False
+            self._shared('put', self.cancel_namespace, job_id, b'1', ttl=self.retention_seconds)
+            return True
+        if job['status'] in FINISHED_STATES:
+            return False
+        job['cancel'].set()
+        if job['future'] is not None and job['future'].cancel():
+            # Never started
+            self._finish(job, 'cancelled')
+        return True
+
+    def list(self):
+        """Summaries of the jobs of every worker process, oldest first"""
+        with self.lock:
+            self._prune()
+            local = {job_id: self._summary(job) for job_id, job in self.jobs.items()}
+        shared = self._shared('values', self.namespace) or []
+        summaries = dict((job_id, json.loads(value)) for job_id, value in shared)
+        summaries.update(local)
+        return sorted(summaries.values(), key=lambda summary: summary['created_at'])
+
+
+# Global job queue (shared across app)
+job_queue = JobQueue()
@@ -0,0 +1,218 @@
+# metrics.py - Vectorized performance statistics for backtest results
+#
+# Every function works on plain NumPy arrays (equity values, per-trade P&L,
+# sides, bar positions), so any engine can reuse them and the cost stays a
+# handful of array passes however many bars were simulated.
+import numpy as np
+
+
+# Bars per year on NSE (252 sessions of 375 minutes, 09:15-15:30)
+PERIODS_PER_YEAR = {
+    '1m': 252 * 375,
+    '2m': 252 * 188,
+    '5m': 252 * 75,
+    '15m': 252 * 25,
+    '30m': 252 * 13,
+    '60m': 252 * 7,
+    '1h': 252 * 7,
+    '90m': 252 * 5,
+    '1d': 252,
+    '1wk': 52,
+    '1mo': 12
+}
+
+
+def _ratio(numerator, denominator):
+    # None instead of inf/nan so results stay JSON-safe
+    if denominator == 0 or not np.isfinite(denominator):
+        return None
+    return float(numerator / denominator)
+
+
+def drawdown(equity):
+    """
+    Percent drawdown from the running peak at every point
+
+    Returns:
+        Array the same length as equity (0 at new highs)
+    """
+    equity = np.asarray(equity, dtype=np.float64)
+    if len(equity) == 0:
+        return equity
+    peak = np.maximum.accumulate(equity)
+    return (peak - equity) / peak * 100
+
+
+def max_drawdown(equity):
+    """Largest percent drop from a running peak"""
+    values = drawdown(equity)
+    return float(values.max()) if len(values) else 0.0
+
+
+def max_drawdown_duration(equity):
+    """Longest stretch (in bars) spent below a previous peak"""
+    equity = np.asarray(equity, dtype=np.float64)
+    if len(equity) == 0:
+        return 0
+    positions = np.arange(len(equity))
+    at_peak = equity >= np.maximum.accumulate(equity)
+    last_peak = np.maximum.accumulate(np.where(at_peak, positions, 0))
+    return int((positions - last_peak).max())
+
+
+def period_returns(equity):
+    """Simple returns between consecutive equity points"""
+    equity = np.asarray(equity, dtype=np.float64)
+    if len(equity) < 2:
+        return np.empty(0)
+    return np.diff(equity) / equity[:-1]
+
+
+def sharpe_ratio(returns, periods_per_year=252, risk_free=0.0):
+    """Annualized Sharpe ratio of per-period returns (risk_free is annual)"""
+    returns = np.asarray(returns, dtype=np.float64)
+    if len(returns) < 2:
+        return None
+    excess = returns - risk_free / periods_per_year
+    return _ratio(excess.mean() * np.sqrt(periods_per_year), excess.std(ddof=1))
+
+
+def sortino_ratio(returns, periods_per_year=252, risk_free=0.0):
+    """Annualized Sortino ratio, penalizing only downside deviation"""
+    returns = np.asarray(returns, dtype=np.float64)
+    if len(returns) < 2:
+        return None
+    excess = returns - risk_free / periods_per_year
+    downside = np.sqrt(np.mean(np.minimum(excess, 0) ** 2))
+    return _ratio(excess.mean() * np.sqrt(periods_per_year), downside)
+
+
+def annualized_return(equity, periods_per_year=252):
+    """Compound annual growth rate of the equity curve (percent)"""
+    equity = np.asarray(equity, dtype=np.float64)
+    if len(equity) < 2 or equity[0] <= 0 or equity[-1] <= 0:
+        return None
+    years = (len(equity) - 1) / periods_per_year
+    return float(((equity[-1] / equity[0]) ** (1 / years) - 1) * 100)
+
+
+def calmar_ratio(equity, periods_per_year=252):
+    """Annualized return divided by max drawdown"""
+    cagr = annualized_return(equity, periods_per_year)
+    if cagr is None:
+        return None
+    return _ratio(cagr, max_drawdown(equity))
+
+
+def profit_factor(pnl):
+    """Gross profit over gross loss (None without losing trades)"""
+    pnl = np.asarray(pnl, dtype=np.float64)
+    return _ratio(pnl[pnl > 0].sum(), -pnl[pnl < 0].sum())
+
+
+def periods_per_year(interval):
+    """
+    Bars per year of an interval, for annualizing
+
+    Raises:
+        ValueError: Unknown interval
+    """
+    if interval not in PERIODS_PER_YEAR:
+        raise ValueError(f"Unknown interval: {interval}. Allowed: {', '.join(PERIODS_PER_YEAR)}")
+    return PERIODS_PER_YEAR[interval]
+
+
+def exposure(entry_index, exit_index, bars, open_entry_index=(), open_end_index=()):
+    """
+    Percent of bars spent in a position
+
+    Positions still open when the data ends count from their entry up to
+    open_end_index (the last bar they were held on).
+    """
+    if bars <= 0:
+        return 0.0
+    held = np.asarray(exit_index, dtype=np.int64) - np.asarray(entry_index, dtype=np.int64)
+    held_open = np.asarray(open_end_index, dtype=np.int64) - np.asarray(open_entry_index, dtype=np.int64)
+    return float((held.sum() + held_open.sum()) / bars * 100)
+
+
+def trade_stats(pnl):
+    """
+    Counts and averages for one set of trades
+
+    Returns:
+        Dict with trades, winning/losing counts, win rate, total and averages
+    """
+    pnl = np.asarray(pnl, dtype=np.float64)
+    total = len(pnl)
+    wins = pnl > 0
+    winning = int(np.count_nonzero(wins))
+    losing = total - winning
+    return {
+        'trades': total,
+        'winning_trades': winning,
+        'losing_trades': losing,
+        'win_rate': winning / total * 100 if total else 0,
+        'total_pnl': pnl.sum(),
+        'avg_profit': pnl.sum() / total if total else 0,
+        'avg_win': pnl[wins].sum() / winning if winning else 0,
+        'avg_loss': pnl[pnl < 0].sum() / losing if losing else 0
+    }
+
+
+def side_stats(pnl, side):
+    """trade_stats split by side (1 long, -1 short)"""
+    pnl = np.asarray(pnl, dtype=np.float64)
+    side = np.asarray(side)
+    return {
+        'long': trade_stats(pnl[side == 1]),
+        'short': trade_stats(pnl[side == -1])
+    }
+
+
+def performance_summary(equity, pnl, side, entry_index, exit_index, bars, interval='1d',
+                        open_entry_index=(), open_end_index=()):
+    """
+    Every statistic for one backtest
+
+    Args:
+        equity: Equity value at each recorded bar
+        pnl: Per-trade P&L
+        side: Per-trade side (1 long, -1 short)
+        entry_index, exit_index: Per-trade bar positions
+        bars: Bars simulated (for exposure)
+        interval: Bar interval (for annualizing)
+        open_entry_index, open_end_index: Entry and last bar positions of
+            positions still open when the data ends (for exposure)
+
+    Returns:
+        Dict of floats/ints/None, unrounded
+
+    Raises:
+        ValueError: Unknown interval
+    """
+    periods = periods_per_year(interval)
+    returns = period_returns(equity)
+    stats = trade_stats(pnl)
+    return dict(
+        stats,
+        max_drawdown=max_drawdown(equity),
+        max_drawdown_duration=max_drawdown_duration(equity),
+        sharpe_ratio=sharpe_ratio(returns, periods),
+        sortino_ratio=sortino_ratio(returns, periods),
+        calmar_ratio=calmar_ratio(equity, periods),
+        profit_factor=profit_factor(pnl),
+        exposure=exposure(entry_index, exit_index, bars, open_entry_index, open_end_index),
+        by_side=side_stats(pnl, side)
+    )
+
+
+def round_metrics(values, digits=2):
+    """Round every float in a (nested) metrics dict for JSON output"""
+    if isinstance(values, dict):
+        return {key: round_metrics(value, digits) for key, value in values.items()}
+    if isinstance(values, float):
+        return round(values, digits)
+    if isinstance(values, np.integer):
+        return int(values)
+    return values
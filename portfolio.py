@@ -0,0 +1,284 @@
+# portfolio.py - Multi-symbol portfolio backtester with a shared capital pool
+import numpy as np
+import pandas as pd
+from screener import calculate_indicator_series, count_indicator_votes
+from indicators import required_series
+from metrics import performance_summary, periods_per_year, trade_stats, round_metrics
+from instrumentation import info
+
+
+def align_frames(frames):
+    """
+    Align many OHLCV frames on the union of their timestamps
+
+    Args:
+        frames: Dict {symbol: DataFrame}
+
+    Returns:
+        (symbols, timestamps, arrays) where arrays maps 'High', 'Low', 'Close',
+        'Volume' to (symbols x bars) float64 matrices, NaN where a symbol has no bar
+    """
+    symbols = [symbol for symbol, data in frames.items() if data is not None and not data.empty]
+    timestamps = pd.DatetimeIndex([])
+    for symbol in symbols:
+        timestamps = timestamps.union(frames[symbol].index)
+
+    arrays = {}
+    for column in ['High', 'Low', 'Close', 'Volume']:
+        matrix = np.full((len(symbols), len(timestamps)), np.nan)
+        for row, symbol in enumerate(symbols):
+            data = frames[symbol]
+            matrix[row, timestamps.get_indexer(data.index)] = np.asarray(data[column].values, dtype=np.float64)
+        arrays[column] = matrix
+
+    return symbols, timestamps, arrays
+
+
+def portfolio_signals(frames, symbols, timestamps, selected_indicators, indicator_params=None):
+    """
+    BUY/SELL/NEUTRAL signal matrix for all symbols
+
+    The selected indicators' series are computed per symbol on its own bars,
+    scattered into (symbols x bars) matrices and voted on in one vectorized pass.
+
+    Returns:
+        (signals, tradeable) - int8 matrix (1 BUY, -1 SELL, 0 NEUTRAL) and a
+        bool matrix of bars past each symbol's 60-candle warm-up
+    """
+    shape = (len(symbols), len(timestamps))
+    matrices = {}
+    tradeable = np.zeros(shape, dtype=bool)
+    has_volume = np.zeros((len(symbols), 1), dtype=bool)
+    closes = np.full(shape, np.nan)
+    keys = required_series(selected_indicators, indicator_params)
+
+    for row, symbol in enumerate(symbols):
+        data = frames[symbol]
+        columns = timestamps.get_indexer(data.index)
+        series = calculate_indicator_series(data, keys, indicator_params)
+        if series is None:
+            continue
+        for key, values in series.items():
+            if key not in matrices:
+                matrices[key] = np.full(shape, np.nan)
+            matrices[key][row, columns] = values
+        closes[row, columns] = np.asarray(data['Close'].values, dtype=np.float64)
+        tradeable[row, columns[60:]] = True
+        has_volume[row] = data['Volume'].iloc[-1] > 0
+
+    signals = np.zeros(shape, dtype=np.int8)
+    if not matrices:
+        return signals, tradeable
+
+    # Vote with and without volume, then pick per symbol
+    votes = {}
+    for flag in (True, False):
+        buy, sell, neutral, active_count = count_indicator_votes(
+            matrices, closes, selected_indicators, has_volume=flag, params=indicator_params
+        )
+        signal = np.zeros(shape, dtype=np.int8)
+        if active_count > 0:
+            signal[(buy > sell) & (buy > neutral)] = 1
+            signal[(sell > buy) & (sell > neutral)] = -1
+        votes[flag] = signal
+    signals = np.where(has_volume, votes[True], votes[False])
+
+    return signals, tradeable
+
+
+def backtest_portfolio(frames, selected_indicators, params=None, indicator_params=None):
+    """
+    Backtest many symbols against one capital pool
+
+    Bars are walked in timestamp order. Each symbol follows the same rules as
+    backtest_strategy (SL checked before TP, signal exits, slippage, commission,
+    risk-based sizing off the current pool capital), with at most
+    max_positions open at once. New entries on a bar go in symbol order.
+
+    Args:
+        frames: Dict {symbol: DataFrame}
+        selected_indicators: Dict of which indicators to use
+        params: Same as backtest_strategy, plus max_positions
+
+    Returns:
+        Dict with portfolio metrics, combined equity curve and per-symbol trade logs
+
+    Raises:
+        ValueError: Unknown interval
+    """
+    if params is None:
+        params = {}
+
+    initial_capital = float(params.get('initial_capital', 100000))
+    risk_per_trade = float(params.get('risk_per_trade', 2.0))
+    stop_loss_ticks = float(params.get('stop_loss', 20))
+    take_profit_ticks = float(params.get('take_profit', 40))
+    tick_size = float(params.get('tick_size', 0.05))
+    commission = float(params.get('commission', 20.0))
+    slippage_ticks = float(params.get('slippage', 1.0))
+    max_positions = int(params.get('max_positions', 5))
+    interval = params.get('interval', '1d')
+    periods_per_year(interval)  # Unknown intervals fail before simulating
+
+    symbols, timestamps, arrays = align_frames(frames)
+    if not symbols:
+        return {'success': False, 'error': 'No data for any symbol'}
+
+    info(f"\nStarting portfolio backtest...")
+    info(f"Symbols: {len(symbols)} | Bars: {len(timestamps)} | Max positions: {max_positions}")
+
+    highs, lows, closes = arrays['High'], arrays['Low'], arrays['Close']
+    signals, tradeable = portfolio_signals(frames, symbols, timestamps, selected_indicators, indicator_params)
+
+    count = len(symbols)
+    side = np.zeros(count, dtype=np.int8)        # 1 LONG, -1 SHORT, 0 flat
+    entry_price = np.zeros(count)
+    stop_loss_price = np.zeros(count)
+    take_profit_price = np.zeros(count)
+    position_size = np.zeros(count)
+    entry_index = np.zeros(count, dtype=np.int64)
+    last_close = np.full(count, np.nan)
+
+    capital = initial_capital
+    trades_by_symbol = {symbol: [] for symbol in symbols}
+    all_trades = []
+    entry_indices, exit_indices = [], []
+    equity_values = np.empty(len(timestamps))
+
+    def close_position(row, t, exit_price, reason):
+        nonlocal capital
+        if side[row] == 1:
+            profit_amount = (exit_price - entry_price[row]) * position_size[row] - (commission * 2)
+        else:
+            profit_amount = (entry_price[row] - exit_price) * position_size[row] - (commission * 2)
+        capital += profit_amount
+
+        trade = {
+            'symbol': symbols[row],
+            'entry_time': str(timestamps[entry_index[row]]),
+            'position': 'long' if side[row] == 1 else 'short',
+            'entry': round(entry_price[row], 2),
+            'sl': round(stop_loss_price[row], 2),
+            'tp': round(take_profit_price[row], 2),
+            'exit_time': str(timestamps[t]),
+            'exit': round(exit_price, 2),
+            'reason': reason,
+            'pnl': round(profit_amount, 2),
+            'cumulative_pnl': round(capital - initial_capital, 2)
+        }
+        trades_by_symbol[symbols[row]].append(trade)
+        all_trades.append(trade)
+        entry_indices.append(entry_index[row])
+        exit_indices.append(t)
+        side[row] = 0
+
+    for t in range(len(timestamps)):
+        high, low, close = highs[:, t], lows[:, t], closes[:, t]
+        active = ~np.isnan(close) & tradeable[:, t]
+        has_bar = ~np.isnan(close)
+        last_close[has_bar] = close[has_bar]
+
+        # ===== SL/TP checks for every open position at once =====
+        longs = active & (side == 1)
+        shorts = active & (side == -1)
+        sl_hit = (longs & (low <= stop_loss_price)) | (shorts & (high >= stop_loss_price))
+        tp_hit = ~sl_hit & ((longs & (high >= take_profit_price)) | (shorts & (low <= take_profit_price)))
+        for row in np.flatnonzero(sl_hit):
+            close_position(row, t, stop_loss_price[row], 'SL')
+        for row in np.flatnonzero(tp_hit):
+            close_position(row, t, take_profit_price[row], 'TP')
+        exited = sl_hit | tp_hit
+
+        signal = signals[:, t]
+
+        # ===== Signal exits =====
+        signal_exit = active & ~exited & (((side == 1) & (signal == -1)) | ((side == -1) & (signal == 1)))
+        for row in np.flatnonzero(signal_exit):
+            slip = slippage_ticks * tick_size
+            close_position(row, t, close[row] - slip if side[row] == 1 else close[row] + slip, 'Signal')
+
+        # ===== Entries, limited by free position slots =====
+        candidates = active & ~exited & ~signal_exit & (side == 0) & (signal != 0)
+        free_slots = max_positions - int(np.count_nonzero(side))
+        for row in np.flatnonzero(candidates)[:max(free_slots, 0)]:
+            direction = int(signal[row])
+            price = close[row] + direction * slippage_ticks * tick_size
+            sl = price - direction * stop_loss_ticks * tick_size
+            tp = price + direction * take_profit_ticks * tick_size
+
+            risk_amount = capital * (risk_per_trade / 100)
+            risk_per_share = (price - sl) * direction
+            if risk_per_share > 0:
+                size = int(risk_amount / risk_per_share)
+            else:
+                size = int((capital * 0.1) / price)
+
+            if size > 0:
+                side[row] = direction
+                entry_price[row] = price
+                stop_loss_price[row] = sl
+                take_profit_price[row] = tp
+                position_size[row] = size
+                entry_index[row] = t
+
+        # Mark open positions to the last known close
+        open_rows = side != 0
+        unrealized = np.sum(side[open_rows] * (last_close[open_rows] - entry_price[open_rows]) * position_size[open_rows])
+        equity_values[t] = capital + unrealized
+
+    # Calculate metrics
+    pnls = np.array([trade['pnl'] for trade in all_trades])
+    sides = np.array([1 if trade['position'] == 'long' else -1 for trade in all_trades])
+    # Exposure is measured against the total position-slot capacity, positions
+    # still open count up to the last bar
+    open_rows = np.flatnonzero(side != 0)
+    summary = performance_summary(
+        equity_values, pnls, sides, entry_indices, exit_indices,
+        len(timestamps) * max_positions, interval,
+        entry_index[open_rows], np.full(len(open_rows), len(timestamps) - 1)
+    )
+    total_trades = summary['trades']
+    winning_trades = summary['winning_trades']
+    win_rate = summary['win_rate']
+
+    per_symbol = []
+    for symbol in symbols:
+        stats = trade_stats([trade['pnl'] for trade in trades_by_symbol[symbol]])
+        per_symbol.append({
+            'symbol': symbol,
+            'trades': stats['trades'],
+            'winning_trades': stats['winning_trades'],
+            'pnl': round(float(stats['total_pnl']), 2)
+        })
+
+    equity_curve = [
+        {'date': str(timestamps[t]), 'equity': round(float(equity_values[t]), 2)}
+        for t in range(max(0, len(timestamps) - 50), len(timestamps))
+    ]
+
+    info(f"\nPortfolio Backtest Complete!")
+    info(f"Total Trades: {total_trades} | Win Rate: {win_rate:.1f}%")
+
+    return {
+        'success': True,
+        'symbols': symbols,
+        'initial_capital': round(initial_capital, 2),
+        'final_capital': round(capital, 2),
+        'total_return': round((capital - initial_capital) / initial_capital * 100, 2),
+        'total_trades': total_trades,
+        'winning_trades': winning_trades,
+        'losing_trades': total_trades - winning_trades,
+        'win_rate': round(win_rate, 2),
+        'max_drawdown': round(summary['max_drawdown'], 2),
+        'max_drawdown_duration': summary['max_drawdown_duration'],
+        'sharpe_ratio': round_metrics(summary['sharpe_ratio']),
+        'sortino_ratio': round_metrics(summary['sortino_ratio']),
+        'calmar_ratio': round_metrics(summary['calmar_ratio']),
+        'profit_factor': round_metrics(summary['profit_factor']),
+        'exposure': round(summary['exposure'], 2),
+        'by_side': round_metrics(summary['by_side']),
+        'per_symbol': per_symbol,
+        'equity_curve': equity_curve,
+        'trades': all_trades,
+        'trades_by_symbol': trades_by_symbol
+    }
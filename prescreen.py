@@ -0,0 +1,360 @@
+# prescreen.py - Scheduled background screening into a shared snapshot
+#
+# A background thread re-runs each configured screen (watchlist x timeframe x
+# indicator set) once per closed candle during the NSE session. With several
+# worker processes only the one holding the runner lease in the shared store
+# screens; it publishes every screen's latest entry there and the others
+# read it (version-checked, so unchanged entries are not parsed again).
+# Each process keeps its copy in a snapshot dict that is rebuilt and swapped
+# in whole, so readers never see a half-updated screen and never take a lock.
+import os
+import json
+import time
+import uuid
+import sqlite3
+import threading
+import traceback
+import pandas as pd
+from screener import screen_multiple_stocks
+from signal_cache import indicator_set_hash
+from indicators import merge_indicator_params
+from resampling import SESSION_TZ, SESSION_OPEN, SESSION_CLOSE, INTERVAL_MINUTES
+from results_store import store_screen_results, reference_screen_results, expire_screen_results
+from shared_store import shared_store
+from serialization import dumps
+from instrumentation import perf_metrics, info
+
+
+PRESCREEN_ENABLED = os.environ.get('PRESCREEN_ENABLED', '0') == '1'
+PRESCREEN_CONFIG = os.environ.get('PRESCREEN_CONFIG')   # JSON file with a list of screens
+PRESCREEN_TIMEFRAMES = os.environ.get('PRESCREEN_TIMEFRAMES', '5m').split(',')
+PRESCREEN_POLL_SECONDS = float(os.environ.get('PRESCREEN_POLL_SECONDS', 15))
+PRESCREEN_DELAY_SECONDS = float(os.environ.get('PRESCREEN_DELAY_SECONDS', 10))   # Wait for the provider to publish the bar
+PRESCREEN_RESULT_TTL = 7 * 24 * 3600   # Stored results of the current run, cut to SCREEN_RESULT_TTL once replaced
+PRESCREEN_LEASE_SECONDS = float(os.environ.get('PRESCREEN_LEASE_SECONDS', 120))   # Runner lease, renewed every poll and screen
+
+
+def session_time(timestamp):
+    """Timestamp as tz-aware IST (naive values are taken as IST already)"""
+    timestamp = pd.Timestamp(timestamp)
+    if timestamp.tz is None:
+        return timestamp.tz_localize(SESSION_TZ)
+    return timestamp.tz_convert(SESSION_TZ)
+
+
+def last_candle_close(now, interval):
+    """
+    Close time of the latest completed candle at `now`
+
+    Intraday candles close every interval from the 09:15 open, the last one
+    of the day at 15:30; a daily candle closes at 15:30. Weekends are
+    skipped, exchange holidays are not known here (a holiday just repeats
+    the previous session's candle).
+
+    Returns:
+        tz-aware IST Timestamp
+    """
+    now = session_time(now)
+    day = now.normalize()
+    if day.weekday() < 5:
+        opened = now - (day + SESSION_OPEN)
+        if opened >= SESSION_CLOSE - SESSION_OPEN:
+            return day + SESSION_CLOSE
+        minutes = INTERVAL_MINUTES[interval]
+        if minutes is not None:
+            step = pd.Timedelta(minutes=minutes)
+            if opened >= step:
+                return day + SESSION_OPEN + opened // step * step
+
+    # No candle closed yet today: last close of the previous weekday
+    day -= pd.Timedelta(days=1)
+    while day.weekday() >= 5:
+        day -= pd.Timedelta(days=1)
+    return day + SESSION_CLOSE
+
+
+def expand_screens(config):
+    """
+    Normalize screen definitions
+
+    Args:
+        config: List of dicts with 'stocks', 'timeframe' (or a 'timeframes'
+                list), 'indicators' and optional 'params' / 'name'
+
+    Returns:
+        List of screens, one per timeframe, with merged indicator params
+
+    Raises:
+        ValueError: Unknown timeframe, indicator or parameter
+    """
+    screens = []
+    for entry in config:
+        timeframes = entry.get('timeframes') or [entry.get('timeframe', '1d')]
+        params = merge_indicator_params(entry.get('params'))
+        for timeframe in timeframes:
+            if timeframe not in INTERVAL_MINUTES:
+                raise ValueError(f"Unknown timeframe: {timeframe}. Allowed: {', '.join(INTERVAL_MINUTES)}")
+            key = screen_key(timeframe, entry['indicators'], params)
+            screens.append({
+                'name': entry.get('name') or f"{timeframe}:{key[1]}",
+                'key': key,
+                'stocks': list(entry['stocks']),
+                'timeframe': timeframe,
+                'indicators': dict(entry['indicators']),
+                'params': params
+            })
+    return screens
+
+
+def load_screen_config(path):
+    """Screen definitions from a JSON file (see expand_screens)"""
+    with open(path) as f:
+        return json.load(f)
+
+
+def screen_key(timeframe, selected_indicators, indicator_params):
+    return (timeframe, indicator_set_hash(selected_indicators, indicator_params))
+
+
+def _store_key(key):
+    return '|'.join(key)
+
+
+class PreScreener:
+    """
+    Re-runs configured screens on every candle close and keeps the latest results
+
+    Every process may start the thread, but only the holder of the
+    runner lease screens; the rest pick its entries up from the store.
+
+    clock() -> tz-aware Timestamp and fetch (per-symbol data source, see
+    screen_multiple_stocks) can be swapped for a fake clock and a local
+    stub; run_due(now) does one scheduler tick without the thread.
+    """
+
+    namespace = 'prescreen'
+    lease_key = 'runner'
+
+    def __init__(self, screens=None, clock=None, fetch=None, store=shared_store,
+                 poll_seconds=PRESCREEN_POLL_SECONDS, delay_seconds=PRESCREEN_DELAY_SECONDS,
+                 lease_seconds=PRESCREEN_LEASE_SECONDS):
+        self.screens = screens or []
+        self.clock = clock or (lambda: pd.Timestamp.now(tz=SESSION_TZ))
+        self.fetch = fetch
+        self.store = store
+        self.poll_seconds = poll_seconds
+        self.delay = pd.Timedelta(seconds=delay_seconds)
+        self.lease_seconds = lease_seconds
+        self.owner = None              # Lease owner id while the thread runs
+        self.lock = threading.Lock()   # Serializes writers only
+        self.snapshot = {}             # screen key -> entry, replaced (never mutated) on every update
+        self.versions = {}             # screen key -> store version of the entry in snapshot
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def configure(self, config):
+        """Replace the screen list (raises ValueError, see expand_screens)"""
+        self.screens = expand_screens(config)
+
+    def run_screen(self, screen, candle=None):
+        """
+        Run one screen now and swap its results into the snapshot
+
+        The results are also stored once for CSV export; snapshot hits
+        reference them instead of storing a copy per request.
+        """
+        start = time.perf_counter()
+        with perf_metrics.stage('prescreen'):
+            results = screen_multiple_stocks(screen['stocks'], screen['indicators'], screen['timeframe'],
+                                             fetch=self.fetch, indicator_params=screen['params'])
+        entry = {
+            'name': screen['name'],
+            'stocks': screen['stocks'],
+            'timeframe': screen['timeframe'],
+            'candle': candle if candle is not None else last_candle_close(self.clock() - self.delay, screen['timeframe']),
+            'computed_at': self.clock(),
+            'duration': round(time.perf_counter() - start, 3),
+            'results': results,
+            'result_id': store_screen_results(results, ttl=PRESCREEN_RESULT_TTL)
+        }
+        replaced = self.snapshot.get(screen['key'])
+        self._swap(screen['key'], entry, self._publish(screen['key'], entry))
+        if replaced is not None and replaced['result_id'] is not None:
+            # Still exportable for a while by ids already handed out
+            expire_screen_results(replaced['result_id'])
+        perf_metrics.increment('prescreen_runs')
+        return entry
+
+    def _swap(self, key, entry, version):
+        with self.lock:
+            snapshot = dict(self.snapshot)
+            snapshot[key] = entry
+            self.snapshot = snapshot
+            self.versions[key] = version
+
+    def _publish(self, key, entry):
+        """Write an entry to the shared store for the other processes, returns its version"""
+        try:
+            return self.store.put(self.namespace, _store_key(key), dumps(dict(
+                entry, candle=str(entry['candle']), computed_at=str(entry['computed_at'])
+            )))
+        except sqlite3.Error as e:
+            print(f"Could not publish pre-screen {entry['name']}: {e}")
+            return None
+
+    def sync(self, key):
+        """
+        Latest entry for a screen key, picked up from the store if another process published a newer one
+
+        Returns:
+            Entry or None
+        """
+        try:
+            version = self.store.version(self.namespace, _store_key(key))
+            if version is None or version == self.versions.get(key):
+                return self.snapshot.get(key)
+            stored = self.store.get(self.namespace, _store_key(key))
+        except sqlite3.Error as e:
+            print(f"Could not read pre-screen snapshot: {e}")
+            return self.snapshot.get(key)
+        if stored is None:
+            return self.snapshot.get(key)
+        entry = json.loads(stored['value'])
+        entry['candle'] = pd.Timestamp(entry['candle'])
+        entry['computed_at'] = pd.Timestamp(entry['computed_at'])
+        self._swap(key, entry, stored['version'])
+        return entry
+
+    def lead(self):
+        """
+        Take or renew the runner lease for this process's thread
+
+        Returns:
+            True if this process should screen (also when the store can't
+            be reached, so screening degrades to once per process)
+        """
+        if self.owner is None:
+            return True
+        try:
+            return self.store.lease(self.namespace, self.lease_key, self.owner, self.lease_seconds)
+        except sqlite3.Error as e:
+            print(f"Could not take the pre-screen lease: {e}")
+            return True
+
+    def run_due(self, now=None, force=False):
+        """
+        One scheduler tick: run every screen whose candle has closed since its last run
+
+        Returns:
+            Names of the screens that ran
+        """
+        now = session_time(now if now is not None else self.clock())
+        ran = []
+        for screen in self.screens:
+            candle = last_candle_close(now - self.delay, screen['timeframe'])
+            entry = self.sync(screen['key'])
+            if not force and entry is not None and entry['candle'] == candle:
+                continue
+            if not force and not self.lead():
+                # Another process took over (this one stalled past its lease)
+                break
+            try:
+                self.run_screen(screen, candle)
+                ran.append(screen['name'])
+            except Exception as e:
+                print(f"Pre-screen {screen['name']} failed: {str(e)}")
+                traceback.print_exc()
+                perf_metrics.increment('prescreen_errors')
+        return ran
+
+    def _loop(self):
+        while True:
+            if self.lead():
+                self.run_due()
+            if self.stop_event.wait(self.poll_seconds):
+                return
+
+    def start(self):
+        if self.thread is not None and self.thread.is_alive():
+            return
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._loop, name='prescreen', daemon=True)
+        self.thread.start()
+        info(f"Pre-screening {len(self.screens)} screen(s) every candle close (one runner across workers)")
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        if self.owner is not None:
+            try:
+                self.store.release(self.namespace, self.lease_key, self.owner)
+            except sqlite3.Error as e:
+                print(f"Could not release the pre-screen lease: {e}")
+            self.owner = None
+
+    def lookup(self, stocks, timeframe, selected_indicators, indicator_params):
+        """
+        Snapshot results for a screen request
+
+        Matches a screen with the same timeframe, enabled indicators and
+        params whose watchlist covers every requested stock.
+
+        Returns:
+            Dict with 'results' (only the requested stocks, in screen order),
+            their 'result_id' for export, 'candle', 'computed_at' and
+            'age_seconds', or None
+        """
+        entry = self.sync(screen_key(timeframe, selected_indicators, indicator_params))
+        if entry is None or not set(stocks) <= set(entry['stocks']):
+            return None
+        wanted = set(stocks)
+        if wanted == set(entry['stocks']):
+            result_id = entry['result_id']
+        else:
+            result_id = reference_screen_results(entry['result_id'], sorted(wanted))
+        return {
+            'name': entry['name'],
+            'result_id': result_id,
+            'candle': str(entry['candle']),
+            'computed_at': str(entry['computed_at']),
+            'age_seconds': round((self.clock() - entry['computed_at']).total_seconds(), 3),
+            'results': [result for result in entry['results'] if result['symbol'] in wanted]
+        }
+
+    def status(self):
+        """JSON-safe state of every configured screen"""
+        now = self.clock()
+        screens = []
+        for screen in self.screens:
+            entry = self.sync(screen['key'])
+            screens.append({
+                'name': screen['name'],
+                'timeframe': screen['timeframe'],
+                'stocks': len(screen['stocks']),
+                'indicators': [name for name, on in screen['indicators'].items() if on],
+                'candle': str(entry['candle']) if entry else None,
+                'computed_at': str(entry['computed_at']) if entry else None,
+                'age_seconds': round((now - entry['computed_at']).total_seconds(), 3) if entry else None,
+                'duration': entry['duration'] if entry else None,
+                'results': len(entry['results']) if entry else 0
+            })
+        runner = None
+        try:
+            lease = self.store.get(self.namespace, self.lease_key)
+            runner = lease['value'] if lease is not None else None
+        except sqlite3.Error:
+            pass
+        return {
+            'running': self.thread is not None and self.thread.is_alive(),
+            'runner': runner,
+            'is_runner': runner is not None and runner == self.owner,
+            'now': str(now),
+            'screens': screens
+        }
+
+
+# Global pre-screener (shared across app)
+prescreener = PreScreener()
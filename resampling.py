@@ -0,0 +1,105 @@
+# resampling.py - Build coarser OHLCV bars from a finer interval on NSE session boundaries
+#
+# NSE trades 09:15-15:30 IST. Intraday bars are anchored to the 09:15 open of
+# each day (so 1h bars are 09:15, 10:15, ... 15:15, like yfinance's), daily
+# bars cover one session. Grouping is done with NumPy reduceat over the
+# sorted timestamps, no pandas groupby.
+import numpy as np
+import pandas as pd
+
+
+SESSION_TZ = 'Asia/Kolkata'
+SESSION_OPEN = pd.Timedelta(hours=9, minutes=15)
+SESSION_CLOSE = pd.Timedelta(hours=15, minutes=30)
+
+# Bar length of every interval that can be screened ('1d' is one session)
+INTERVAL_MINUTES = {
+    '1m': 1,
+    '2m': 2,
+    '5m': 5,
+    '15m': 15,
+    '30m': 30,
+    '60m': 60,
+    '1h': 60,
+    '90m': 90,
+    '1d': None
+}
+
+_DAY_NS = 24 * 60 * 60 * 10 ** 9
+
+
+def finest_interval(intervals):
+    """
+    Smallest interval in the list (the one to fetch)
+
+    Raises:
+        ValueError: Unknown interval, or a coarser interval is not a whole
+                    multiple of the finest one
+    """
+    unknown = [interval for interval in intervals if interval not in INTERVAL_MINUTES]
+    if unknown:
+        raise ValueError(f"Unknown timeframes: {', '.join(unknown)}. Allowed: {', '.join(INTERVAL_MINUTES)}")
+
+    intraday = [interval for interval in intervals if INTERVAL_MINUTES[interval] is not None]
+    if not intraday:
+        return '1d'
+    base = min(intraday, key=lambda interval: INTERVAL_MINUTES[interval])
+    for interval in intraday:
+        if INTERVAL_MINUTES[interval] % INTERVAL_MINUTES[base]:
+            raise ValueError(f"{interval} bars can't be built from {base} bars")
+    return base
+
+
+def session_wall_clock(index):
+    """
+    Timestamps as IST wall-clock int64 nanoseconds
+
+    tz-aware indexes are converted to IST, naive ones are taken as IST already
+    """
+    if index.tz is not None:
+        index = index.tz_convert(SESSION_TZ).tz_localize(None)
+    return index.values.astype('datetime64[ns]').view(np.int64)
+
+
+def resample_ohlcv(data, interval):
+    """
+    Aggregate OHLCV bars into a coarser interval
+
+    Args:
+        data: OHLCV DataFrame at a finer interval, sorted by time
+        interval: Target interval (see INTERVAL_MINUTES)
+
+    Returns:
+        DataFrame with Open (first), High (max), Low (min), Close (last) and
+        Volume (sum) per bar, indexed by bar start in the input's timezone.
+        The last bar may still be forming, as with a live fetch.
+    """
+    if data is None or data.empty:
+        return data
+
+    wall = session_wall_clock(data.index)
+    day = wall - wall % _DAY_NS
+    minutes = INTERVAL_MINUTES[interval]
+    if minutes is None:
+        bucket = day
+    else:
+        step = minutes * 60 * 10 ** 9
+        since_open = wall - day - SESSION_OPEN.value
+        bucket = day + SESSION_OPEN.value + since_open // step * step
+
+    # Rows where a new bar starts
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    ends = np.r_[starts[1:], len(bucket)] - 1
+
+    columns = {
+        'Open': np.asarray(data['Open'].values, dtype=np.float64)[starts],
+        'High': np.maximum.reduceat(np.asarray(data['High'].values, dtype=np.float64), starts),
+        'Low': np.minimum.reduceat(np.asarray(data['Low'].values, dtype=np.float64), starts),
+        'Close': np.asarray(data['Close'].values, dtype=np.float64)[ends],
+        'Volume': np.add.reduceat(np.asarray(data['Volume'].values, dtype=np.float64), starts)
+    }
+
+    index = pd.DatetimeIndex(bucket[starts].view('datetime64[ns]'), name=data.index.name)
+    if data.index.tz is not None:
+        index = index.tz_localize(SESSION_TZ).tz_convert(data.index.tz)
+    return pd.DataFrame(columns, index=index)
@@ -0,0 +1,67 @@
+# results_store.py - Screen results kept server-side by id, for CSV export
+#
+# Results are stored as JSON (orjson when installed) in the shared store, so
+# any worker process can export what another one screened. A subset of
+# stored results (a snapshot served for part of a pre-screen watchlist) is
+# a small reference entry, the results themselves are not written again.
+import json
+import uuid
+import sqlite3
+from shared_store import shared_store
+from serialization import dumps
+
+
+SCREEN_RESULT_TTL = 3600   # Seconds screen results stay exportable by id
+NAMESPACE = 'screen_results'
+
+
+def store_screen_results(results, ttl=SCREEN_RESULT_TTL):
+    """
+    Keep screen results for /api/export-csv
+
+    Returns:
+        Their result id, or None if the store could not be written
+    """
+    result_id = uuid.uuid4().hex
+    try:
+        shared_store.put(NAMESPACE, result_id, dumps(results), ttl=ttl)
+    except sqlite3.Error as e:
+        print(f"Could not store screen results: {e}")
+        return None
+    return result_id
+
+
+def reference_screen_results(result_id, symbols, ttl=SCREEN_RESULT_TTL):
+    """Result id for only `symbols` of already stored results (None if result_id is None)"""
+    if result_id is None:
+        return None
+    reference_id = uuid.uuid4().hex
+    try:
+        shared_store.put(NAMESPACE, reference_id, None, meta={'ref': result_id, 'symbols': list(symbols)}, ttl=ttl)
+    except sqlite3.Error as e:
+        print(f"Could not store screen results: {e}")
+        return None
+    return reference_id
+
+
+def expire_screen_results(result_id, ttl=SCREEN_RESULT_TTL):
+    """Keep stored results exportable for ttl more seconds only"""
+    try:
+        shared_store.expire(NAMESPACE, result_id, ttl)
+    except sqlite3.Error as e:
+        print(f"Could not expire screen results: {e}")
+
+
+def load_screen_results(result_id):
+    """Results stored by store_screen_results / reference_screen_results, or None once expired"""
+    entry = shared_store.get(NAMESPACE, result_id)
+    if entry is None:
+        return None
+    meta = entry['meta']
+    if meta is not None and 'ref' in meta:
+        results = load_screen_results(meta['ref'])
+        if results is None:
+            return None
+        wanted = set(meta['symbols'])
+        return [result for result in results if result['symbol'] in wanted]
+    return json.loads(entry['value'])
@@ -0,0 +1,176 @@
+# screen_pool.py - Process-pool indicator computation for large universes
+#
+# The stacked (column x symbol x bar) OHLCV block is written straight into
+# one shared-memory buffer, never built in process memory first. Workers attach to it by name, compute the latest indicator values
+# for their chunk of rows and send back only those small per-symbol arrays;
+# the vote runs once in the parent over the whole universe.
+import os
+import math
+import atexit
+import threading
+import multiprocessing
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+import pandas as pd
+from screener import (stack_layout, stack_frames, latest_indicator_values, vote_cross_section,
+                      screen_cross_section, SCREEN_COLUMNS, STACK_COLUMNS)
+from indicators import DEFAULT_INDICATOR_PARAMS, required_series
+from instrumentation import perf_metrics, info
+
+
+SCREEN_WORKERS = int(os.environ.get('SCREEN_WORKERS', os.cpu_count() or 1))
+PARALLEL_MIN_SYMBOLS = int(os.environ.get('SCREEN_PARALLEL_MIN_SYMBOLS', 200))   # Smaller lists run serially
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def _pool_context():
+    # No fork: the app runs fetch threads, and a forked child could inherit a held lock
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+def get_pool(workers):
+    """Shared worker pool, started on first use and kept for later screens"""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context())
+            _pool_workers = workers
+        return _pool
+
+
+def discard_pool(pool):
+    """Drop a broken pool so the next get_pool starts a fresh one"""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+@atexit.register
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _attach(name):
+    """Open an existing block without the resource tracker unlinking it when this worker exits"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 always registers, but pool workers share the parent's
+        # tracker, where the block is already registered (and unlinked by the parent)
+        return shared_memory.SharedMemory(name=name)
+
+
+def _latest_chunk(name, shape, start, stop, keys, params):
+    """Worker: latest indicator values for rows [start, stop) of the shared block"""
+    block = _attach(name)
+    try:
+        view = np.ndarray(shape, dtype=np.float64, buffer=block.buf)
+        arrays = {column: view[i, start:stop] for i, column in enumerate(STACK_COLUMNS)}
+        # Copies, nothing returned may point into the buffer
+        latest = {key: np.array(values) for key, values in latest_indicator_values(arrays, keys, params).items()}
+        del view, arrays
+        return start, latest
+    finally:
+        block.close()
+
+
+def _latest_on_pool(workers, name, shape, chunk_size, keys, params):
+    """Latest indicator values of every row of the shared block, one pool task per chunk"""
+    rows = shape[1]
+    latest = {key: np.empty(rows) for key in keys}
+    pool = get_pool(workers)
+    try:
+        futures = [
+            pool.submit(_latest_chunk, name, shape, start, min(start + chunk_size, rows), keys, params)
+            for start in range(0, rows, chunk_size)
+        ]
+        for future in futures:
+            start, values = future.result()
+            for key, chunk in values.items():
+                latest[key][start:start + len(chunk)] = chunk
+    except BrokenProcessPool:
+        discard_pool(pool)
+        raise
+    return latest
+
+
+def screen_parallel(frames, selected_indicators, indicator_params=None, workers=None, chunk_size=None,
+                    min_symbols=PARALLEL_MIN_SYMBOLS):
+    """
+    Screen a universe with indicators computed on a process pool
+
+    Same results as screen_cross_section (and screen_multiple_stocks).
+    Falls back to screen_cross_section in-process for a single worker or
+    fewer than min_symbols symbols, where pool overhead would dominate.
+    If a worker dies the pool is restarted and the screen retried once,
+    then computed in-process.
+
+    Args:
+        frames: Dict {symbol: DataFrame}, e.g. from get_stocks_data
+        selected_indicators: Dict of which indicators to use
+        indicator_params: Merged indicator periods/thresholds (defaults when None)
+        workers: Process count (default SCREEN_WORKERS)
+        chunk_size: Symbols per task (default: about 4 tasks per worker)
+        min_symbols: Smallest universe sent to the pool
+
+    Returns:
+        DataFrame with one row per symbol (SCREEN_COLUMNS), sorted like
+        sort_screen_results
+    """
+    workers = max(1, int(workers or SCREEN_WORKERS))
+    if workers == 1 or len(frames) < min_symbols:
+        return screen_cross_section(frames, selected_indicators, indicator_params)
+
+    params = indicator_params or DEFAULT_INDICATOR_PARAMS
+    symbols, bars = stack_layout(frames)
+    perf_metrics.increment('symbols_screened', len(symbols))
+    perf_metrics.increment('symbols_skipped', len(frames) - len(symbols))
+    if sum(selected_indicators.values()) == 0 or not symbols:
+        return pd.DataFrame(columns=SCREEN_COLUMNS)
+
+    keys = required_series(selected_indicators, params, risk=True)
+    shape = (len(STACK_COLUMNS), len(symbols), bars)
+    chunk_size = chunk_size or math.ceil(len(symbols) / (workers * 4))
+    info(f"\nParallel screen: {len(symbols)} symbols x {bars} bars on {workers} worker(s)")
+
+    block = shared_memory.SharedMemory(create=True, size=max(int(np.prod(shape)) * 8, 1))
+    try:
+        # Frames are copied once, into the shared block
+        view = np.ndarray(shape, dtype=np.float64, buffer=block.buf)
+        _, arrays = stack_frames(frames, out=view)
+        price = arrays['Close'][:, -1].copy()
+
+        with perf_metrics.stage('indicators'):
+            try:
+                latest = _latest_on_pool(workers, block.name, shape, chunk_size, keys, params)
+            except BrokenProcessPool as e:
+                print(f"Screen worker pool broke ({e}), retrying on a new pool")
+                perf_metrics.increment('pool_restarts')
+                try:
+                    latest = _latest_on_pool(workers, block.name, shape, chunk_size, keys, params)
+                except BrokenProcessPool as e:
+                    print(f"Screen worker pool broke again ({e}), computing in-process")
+                    # Copies, the block is released below
+                    latest = {key: np.array(values)
+                              for key, values in latest_indicator_values(arrays, keys, params).items()}
+    finally:
+        # No views may outlive the mapping
+        view = arrays = None
+        block.close()
+        block.unlink()
+
+    return vote_cross_section(symbols, latest, price, selected_indicators, params)
@@ -3,9 +3,25 @@ import yfinance as yf
 import pandas as pd
 import numpy as np
 import talib as ta
+from data_cache import ohlcv_cache, period_start, CACHE_ENABLED
+from signal_cache import signal_cache
+from instrumentation import perf_metrics, debug, info
+from resampling import finest_interval, resample_ohlcv, INTERVAL_MINUTES, SESSION_OPEN, SESSION_CLOSE
+from indicators import (ALL_SERIES, INDICATORS, SERIES_KEYS, DEFAULT_INDICATOR_PARAMS,
+                        compute_series, required_series, talib_plan)
+import time
+import contextvars
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
 
-def get_stock_data(symbol, period='6mo', interval='1d'):
+# Concurrent fetch defaults for screen_multiple_stocks
+FETCH_WORKERS = 8       # Max fetch requests in flight at once
+FETCH_TIMEOUT = 30      # Seconds one request may take before its symbols are skipped
+BATCH_SIZE = 50         # Symbols per multi-ticker yf.download request
+
+
+def get_stock_data(symbol, period='6mo', interval='1d', use_cache=CACHE_ENABLED):
     """
     Get stock data for Indian stocks with interval support
     
@@ -13,28 +29,54 @@ def get_stock_data(symbol, period='6mo', interval='1d'):
         symbol: Stock symbol (e.g., 'RELIANCE', 'TCS')
         period: '1d', '5d', '7d', '1mo', '3mo', '6mo', '1y', '2y', '5y'
         interval: '1m', '5m', '15m', '30m', '60m', '1h', '1d'
+        use_cache: Serve from / top up the on-disk OHLCV cache
+    
+    Returns:
+        DataFrame with OHLC data or None if error
+    """
+    # Add .NS suffix for NSE stocks
+    if not symbol.endswith('.NS'):
+        symbol = symbol + '.NS'
+    
+    if use_cache:
+        try:
+            return ohlcv_cache.get(symbol, period, interval, download_stock_data)
+        except Exception as e:
+            print(f"Cache error for {symbol}, fetching directly: {e}")
+    
+    return download_stock_data(symbol, period=period, interval=interval)
+
+
+def download_stock_data(symbol, period='6mo', interval='1d', start=None):
+    """
+    Download candles for a full ticker from yfinance
+    
+    Args:
+        symbol: Full ticker (e.g., 'RELIANCE.NS')
+        period: yfinance period, ignored when start is given
+        interval: yfinance interval
+        start: Only fetch bars from this timestamp onward (cache top-up)
     
     Returns:
         DataFrame with OHLC data or None if error
     """
     try:
-        # Add .NS suffix for NSE stocks
-        if not symbol.endswith('.NS'):
-            symbol = symbol + '.NS'
-        
-        print(f"\nFetching data: {symbol}")
-        print(f"   Period: {period} | Interval: {interval}")
+        debug(f"\nFetching data: {symbol}")
+        debug(f"   Period: {period if start is None else f'from {start}'} | Interval: {interval}")
         
         stock = yf.Ticker(symbol)
         
         # Fetch data with interval parameter
-        data = stock.history(period=period, interval=interval)
+        if start is None:
+            data = stock.history(period=period, interval=interval)
+        else:
+            data = stock.history(start=start, interval=interval)
         
         if data.empty:
             print(f"No data returned for {symbol}")
             return None
         
-        print(f"Fetched {len(data)} candles from {data.index[0]} to {data.index[-1]}")
+        debug(f"Fetched {len(data)} candles from {data.index[0]} to {data.index[-1]}")
         
         return data
         
@@ -43,76 +85,189 @@ def get_stock_data(symbol, period='6mo', interval='1d'):
         return None
 
 
-def calculate_advanced_indicators(data):
+def download_stocks_batch(symbols, period='6mo', interval='1d', start=None, download=None):
     """
-    Calculate multiple technical indicators using TA-Lib
-    Returns: Dictionary with all indicator values
+    Download a whole list of full tickers in one multi-ticker request
+    
+    Args:
+        symbols: List of full tickers (e.g., ['RELIANCE.NS', 'TCS.NS'])
+        period: yfinance period, ignored when start is given
+        interval: yfinance interval
+        start: Only fetch bars from this timestamp onward (cache top-up)
+        download: yf.download compatible callable (swap in a stub for offline runs)
+    
+    Returns:
+        Dict {symbol: DataFrame or None}, same columns as Ticker.history
     """
-    # Convert to float64 (TA-Lib requirement)
-    close = np.array(data['Close'].values, dtype=np.float64)
-    high = np.array(data['High'].values, dtype=np.float64)
-    low = np.array(data['Low'].values, dtype=np.float64)
-    volume = np.array(data['Volume'].values, dtype=np.float64)
+    if download is None:
+        download = yf.download
     
-    indicators = {}
+    results = dict.fromkeys(symbols)
+    if not symbols:
+        return results
     
     try:
-        # RSI (Relative Strength Index)
-        indicators['rsi'] = ta.RSI(close, timeperiod=14)[-1]
-        
-        # MACD (Moving Average Convergence Divergence)
-        macd, signal, hist = ta.MACD(close, fastperiod=12, slowperiod=26, signalperiod=9)
-        indicators['macd'] = macd[-1]
-        indicators['macd_signal'] = signal[-1]
-        indicators['macd_histogram'] = hist[-1]
-        
-        # Bollinger Bands
-        upper, middle, lower = ta.BBANDS(close, timeperiod=20)
-        indicators['bb_upper'] = upper[-1]
-        indicators['bb_middle'] = middle[-1]
-        indicators['bb_lower'] = lower[-1]
-        
-        # Moving Averages
-        indicators['sma_20'] = ta.SMA(close, timeperiod=20)[-1]
-        indicators['sma_50'] = ta.SMA(close, timeperiod=50)[-1]
-        indicators['ema_12'] = ta.EMA(close, timeperiod=12)[-1]
-        indicators['ema_26'] = ta.EMA(close, timeperiod=26)[-1]
-        
-        # Stochastic Oscillator
-        slowk, slowd = ta.STOCH(high, low, close)
-        indicators['stoch_k'] = slowk[-1]
-        indicators['stoch_d'] = slowd[-1]
-        
-        # ADX (Trend Strength)
-        indicators['adx'] = ta.ADX(high, low, close, timeperiod=14)[-1]
-        
-        # CCI (Commodity Channel Index)
-        indicators['cci'] = ta.CCI(high, low, close, timeperiod=14)[-1]
-        
-        # Williams %R
-        indicators['willr'] = ta.WILLR(high, low, close, timeperiod=14)[-1]
-        
-        # MFI (Money Flow Index)
-        indicators['mfi'] = ta.MFI(high, low, close, volume, timeperiod=14)[-1]
+        info(f"\nBatch fetching {len(symbols)} symbols")
+        info(f"   Period: {period if start is None else f'from {start}'} | Interval: {interval}")
         
-        # Volume indicators
-        indicators['avg_volume'] = np.mean(volume[-20:])
-        indicators['current_volume'] = volume[-1]
-        indicators['volume_ratio'] = volume[-1] / np.mean(volume[-20:])
-        
-        # ATR (Average True Range - Volatility)
-        indicators['atr'] = ta.ATR(high, low, close, timeperiod=14)[-1]
+        # Match Ticker.history: adjusted prices, exchange timezone, no dividends/splits columns
+        kwargs = {'period': period} if start is None else {'start': start}
+        data = download(
+            list(symbols), interval=interval, group_by='ticker', auto_adjust=True,
+            actions=False, ignore_tz=False, threads=True, progress=False, **kwargs
+        )
+    except Exception as e:
+        print(f"Error batch fetching: {e}")
+        return results
+    
+    if data is None or data.empty:
+        print("No data returned for batch")
+        return results
+    
+    for symbol in symbols:
+        if isinstance(data.columns, pd.MultiIndex):
+            if symbol not in data.columns.get_level_values(0):
+                continue
+            frame = data[symbol]
+        elif len(symbols) == 1:
+            frame = data
+        else:
+            continue
         
+        # Rows are aligned across tickers, drop the ones this symbol didn't trade
+        frame = frame.dropna(how='all')
+        frame.columns.name = None
+        if frame.empty:
+            print(f"No data returned for {symbol}")
+            continue
+        results[symbol] = frame
+    
+    return results
+
+
+def get_stocks_data(stocks, period='6mo', interval='1d', use_cache=CACHE_ENABLED, download=None):
+    """
+    Get stock data for a whole watchlist with batched requests
+    
+    Args:
+        stocks: List of stock symbols (e.g., ['RELIANCE', 'TCS'])
+        period, interval: Same as get_stock_data
+        use_cache: Serve from / top up the on-disk OHLCV cache
+        download: yf.download compatible callable (swap in a stub for offline runs)
+    
+    Returns:
+        Dict {symbol as given: DataFrame or None}
+    """
+    # Add .NS suffix for NSE stocks, blank symbols are never requested
+    tickers = {}
+    for symbol in stocks:
+        if symbol and symbol.strip():
+            tickers[symbol] = symbol if symbol.endswith('.NS') else symbol + '.NS'
+    
+    def fetch_many(symbols, period=period, interval=interval, start=None):
+        return download_stocks_batch(symbols, period=period, interval=interval, start=start, download=download)
+    
+    frames = None
+    if use_cache:
+        try:
+            frames = ohlcv_cache.get_many(list(tickers.values()), period, interval, fetch_many)
+        except Exception as e:
+            print(f"Cache error for batch, fetching directly: {e}")
+    if frames is None:
+        frames = fetch_many(list(dict.fromkeys(tickers.values())))
+    
+    return {symbol: frames.get(tickers[symbol]) if symbol in tickers else None for symbol in stocks}
+
+
+def calculate_indicator_series(data, keys=None, params=None):
+    """
+    Calculate indicator series over the whole frame using TA-Lib
+    Value at index i equals what calculate_advanced_indicators(data.iloc[:i+1]) returns
+    
+    Args:
+        data: OHLCV DataFrame
+        keys: Series to compute (default: all of indicators.ALL_SERIES), see
+              indicators.required_series for just what a strategy needs
+        params: Merged indicator params (default periods when None)
+    
+    Returns: Dictionary of NumPy arrays, or None on error
+    """
+    # Convert to float64 (TA-Lib requirement)
+    inputs = {
+        'close': np.array(data['Close'].values, dtype=np.float64),
+        'high': np.array(data['High'].values, dtype=np.float64),
+        'low': np.array(data['Low'].values, dtype=np.float64),
+        'volume': np.array(data['Volume'].values, dtype=np.float64)
+    }
+    
+    try:
+        with perf_metrics.stage('indicators'):
+            return compute_series(inputs, ALL_SERIES if keys is None else keys, params)
     except Exception as e:
         print(f"Error calculating indicators: {e}")
         return None
+
+
+def calculate_advanced_indicators(data, keys=None, params=None):
+    """
+    Calculate technical indicators using TA-Lib
+    Returns: Dictionary with the latest value of each indicator (all by default)
+    """
+    series = calculate_indicator_series(data, keys, params)
+    if series is None:
+        return None
     
-    return indicators
+    return {key: values[-1] for key, values in series.items()}
 
 
-def generate_advanced_signal(symbol, selected_indicators=None, data=None):
+def count_indicator_votes(indicators, price, selected_indicators, has_volume=True, params=None):
+    """
+    Count buy/sell/neutral votes from the selected indicators
+    
+    Works on scalar indicator values or on full indicator series,
+    every rule is a NumPy comparison so one call covers all bars.
+    
+    Args:
+        indicators: Dict from calculate_advanced_indicators or calculate_indicator_series
+        price: Close price (scalar or array aligned with the indicators)
+        selected_indicators: Dict of which indicators to use
+        has_volume: When False, Volume and MFI are dropped from the vote
+        params: Merged indicator params (default thresholds when None)
+    
+    Returns:
+        Tuple (buy_signals, sell_signals, neutral_signals, active_count)
+    """
+    started = time.perf_counter()
+    params = params or DEFAULT_INDICATOR_PARAMS
+    price = np.asarray(price, dtype=np.float64)
+    buy_signals = np.zeros(price.shape, dtype=np.int64)
+    sell_signals = np.zeros(price.shape, dtype=np.int64)
+    neutral_signals = np.zeros(price.shape, dtype=np.int64)
+    active_count = sum(selected_indicators.values())
+    
+    for name, spec in INDICATORS.items():
+        if not selected_indicators.get(name, False):
+            continue
+        if spec['needs_volume'] and not has_volume:
+            # Can't use this indicator without volume data
+            active_count -= 1
+            continue
+        
+        buy, sell = spec['vote'](indicators, price, params[name])
+        buy = np.asarray(buy)
+        sell = np.asarray(sell) & ~buy
+        buy_signals = buy_signals + buy
+        sell_signals = sell_signals + sell
+        neutral_signals = neutral_signals + ~(buy | sell)
+    
+    perf_metrics.record('vote', time.perf_counter() - started)
+    return buy_signals, sell_signals, neutral_signals, active_count
+
+
+def generate_advanced_signal(symbol, selected_indicators=None, data=None, indicator_params=None):
     """
     Generate trading signal based on majority vote from selected indicators
+    Only the series the selected indicators and the risk score need are computed
     Returns: BUY, SELL, or HOLD
     """
     if data is None:
@@ -135,99 +290,32 @@ def generate_advanced_signal(symbol, selected_indicators=None, data=None):
         return None
     
     # Calculate indicators
-    indicators = calculate_advanced_indicators(data)
+    params = indicator_params or DEFAULT_INDICATOR_PARAMS
+    indicators = calculate_advanced_indicators(data, required_series(selected_indicators, params, risk=True), params)
     if indicators is None:
         return None
     
-    current_price = data['Close'].iloc[-1]
+    return signal_from_indicators(symbol, indicators, data['Close'].iloc[-1], selected_indicators, params)
+
+
+def signal_from_indicators(symbol, indicators, current_price, selected_indicators, indicator_params=None):
+    """
+    Build the screen result for one symbol from its latest indicator values
+    Indicator fields that were not computed (not selected) come back as None
+    Returns: Result dict with BUY, SELL, or HOLD signal, or None if no indicator is active
+    """
+    params = indicator_params or DEFAULT_INDICATOR_PARAMS
+    active_count = sum(selected_indicators.values())
+    if active_count == 0:
+        return None
     
     # Count signals
-    buy_signals = 0
-    sell_signals = 0
-    neutral_signals = 0
-    
-    # 1. RSI
-    if selected_indicators.get('rsi', False):
-        if indicators['rsi'] < 30:
-            buy_signals += 1
-        elif indicators['rsi'] > 70:
-            sell_signals += 1
-        else:
-            neutral_signals += 1
-    
-    # 2. MACD
-    if selected_indicators.get('macd', False):
-        if indicators['macd'] > indicators['macd_signal'] and indicators['macd_histogram'] > 0:
-            buy_signals += 1
-        elif indicators['macd'] < indicators['macd_signal'] and indicators['macd_histogram'] < 0:
-            sell_signals += 1
-        else:
-            neutral_signals += 1
-    
-    # 3. Bollinger Bands
-    if selected_indicators.get('bollinger', False):
-        if current_price < indicators['bb_lower']:
-            buy_signals += 1
-        elif current_price > indicators['bb_upper']:
-            sell_signals += 1
-        else:
-            neutral_signals += 1
-    
-    # 4. Stochastic
-    if selected_indicators.get('stochastic', False):
-        if indicators['stoch_k'] < 20 and indicators['stoch_d'] < 20:
-            buy_signals += 1
-        elif indicators['stoch_k'] > 80 and indicators['stoch_d'] > 80:
-            sell_signals += 1
-        else:
-            neutral_signals += 1
-    
-    # 5. ADX (Trend Strength)
-    if selected_indicators.get('adx', False):
-        if indicators['adx'] > 25:
-            if current_price > indicators['sma_20']:
-                buy_signals += 1
-            else:
-                sell_signals += 1
-        else:
-            neutral_signals += 1
-    
-    # 6. Volume
-    if selected_indicators.get('volume', False):
-        if indicators['volume_ratio'] > 1.5:
-            if current_price > indicators['sma_20']:
-                buy_signals += 1
-            else:
-                sell_signals += 1
-        else:
-            neutral_signals += 1
-    
-    # 7. CCI
-    if selected_indicators.get('cci', False):
-        if indicators['cci'] < -100:
-            buy_signals += 1
-        elif indicators['cci'] > 100:
-            sell_signals += 1
-        else:
-            neutral_signals += 1
-    
-    # 8. Williams %R
-    if selected_indicators.get('willr', False):
-        if indicators['willr'] < -80:
-            buy_signals += 1
-        elif indicators['willr'] > -20:
-            sell_signals += 1
-        else:
-            neutral_signals += 1
-    
-    # 9. MFI (Money Flow Index)
-    if selected_indicators.get('mfi', False):
-        if indicators['mfi'] < 20:
-            buy_signals += 1
-        elif indicators['mfi'] > 80:
-            sell_signals += 1
-        else:
-            neutral_signals += 1
+    buy_signals, sell_signals, neutral_signals, _ = count_indicator_votes(
+        indicators, current_price, selected_indicators, params=params
+    )
+    buy_signals = int(buy_signals)
+    sell_signals = int(sell_signals)
+    neutral_signals = int(neutral_signals)
     
     # Calculate percentages
     buy_percentage = (buy_signals / active_count) * 100
@@ -247,16 +335,20 @@ def generate_advanced_signal(symbol, selected_indicators=None, data=None):
     confidence = (max_signals / active_count) * 100
     
     # Risk assessment
+    risk = params['risk']
     risk_factors = 0
-    if indicators['rsi'] > 80 or indicators['rsi'] < 20:
+    if indicators['rsi'] > risk['rsi_high'] or indicators['rsi'] < risk['rsi_low']:
         risk_factors += 1
-    if indicators['adx'] < 20:
+    if indicators['adx'] < risk['adx_low']:
         risk_factors += 1
-    if indicators['volume_ratio'] < 0.5:
+    if indicators['volume_ratio'] < risk['volume_ratio_low']:
         risk_factors += 1
     
     risk_score = (risk_factors / 3) * 100
     
+    def value(key):
+        return round(indicators[key], 2) if key in indicators else None
+    
     return {
         'symbol': symbol,
         'signal': signal,
@@ -269,18 +361,173 @@ def generate_advanced_signal(symbol, selected_indicators=None, data=None):
         'sell_percentage': round(sell_percentage, 1),
         'neutral_percentage': round(neutral_percentage, 1),
         'risk_score': round(risk_score, 1),
-        'rsi': round(indicators['rsi'], 2),
-        'macd': round(indicators['macd'], 2),
-        'adx': round(indicators['adx'], 2),
-        'cci': round(indicators['cci'], 2),
-        'willr': round(indicators['willr'], 2),
-        'mfi': round(indicators['mfi'], 2),
-        'volume_ratio': round(indicators['volume_ratio'], 2)
+        'rsi': value('rsi'),
+        'macd': value('macd'),
+        'adx': value('adx'),
+        'cci': value('cci'),
+        'willr': value('willr'),
+        'mfi': value('mfi'),
+        'volume_ratio': value('volume_ratio')
     }
 
 
 
-def screen_multiple_stocks(stocks, selected_indicators, timeframe='1d'):
+def fetch_stocks_concurrently(stocks, period, interval, fetch=None, fetch_batch=None,
+                              batch_size=BATCH_SIZE, max_workers=FETCH_WORKERS, timeout=FETCH_TIMEOUT):
+    """
+    Fetch many symbols on a bounded thread pool
+    
+    Symbols go out in chunks of batch_size through fetch_batch, or one by one
+    through fetch when a per-symbol source is given.
+    
+    Args:
+        stocks: List of stock symbols
+        period, interval: Passed through to the fetch function
+        fetch: Callable(symbol, period=..., interval=...) -> DataFrame or None
+               (swap in a fake source for offline runs)
+        fetch_batch: Callable(symbols, period=..., interval=...) -> {symbol: DataFrame or None}
+                     (defaults to get_stocks_data when fetch is not given)
+        batch_size: Symbols per fetch_batch call
+        max_workers: Max concurrent fetch calls
+        timeout: Seconds a running call may take before its symbols are skipped
+                 (None waits forever)
+    
+    Yields:
+        (index, symbol, data) as soon as each fetch finishes, data is None on failure
+    """
+    if fetch is not None:
+        chunks = [[i] for i in range(len(stocks))]
+    else:
+        if fetch_batch is None:
+            fetch_batch = get_stocks_data
+        chunks = [list(range(i, min(i + batch_size, len(stocks)))) for i in range(0, len(stocks), batch_size)]
+    
+    started = {}
+    
+    def run(chunk_id, chunk):
+        started[chunk_id] = time.monotonic()
+        with perf_metrics.stage('fetch'):
+            if fetch is not None:
+                return [fetch(stocks[chunk[0]], period=period, interval=interval)]
+            frames = fetch_batch([stocks[i] for i in chunk], period=period, interval=interval)
+            return [frames.get(stocks[i]) for i in chunk]
+    
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks) or 1)))
+    try:
+        # Each fetch runs in a copy of the caller's context, so its time lands in the request's timings
+        pending = {
+            executor.submit(contextvars.copy_context().run, run, c, chunk): c
+            for c, chunk in enumerate(chunks)
+        }
+        while pending:
+            done, _ = wait(pending, timeout=1.0 if timeout else None, return_when=FIRST_COMPLETED)
+            
+            for future in done:
+                chunk = chunks[pending.pop(future)]
+                try:
+                    frames = future.result()
+                except Exception as e:
+                    print(f"Error fetching {', '.join(stocks[i] for i in chunk)}: {e}")
+                    frames = [None] * len(chunk)
+                for index, data in zip(chunk, frames):
+                    yield index, stocks[index], data
+            
+            if timeout:
+                now = time.monotonic()
+                for future, c in list(pending.items()):
+                    if c in started and now - started[c] > timeout:
+                        print(f"Timed out fetching {', '.join(stocks[i] for i in chunks[c])} after {timeout}s")
+                        del pending[future]
+                        for index in chunks[c]:
+                            yield index, stocks[index], None
+    finally:
+        # Don't block on abandoned (timed out) fetches
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+# History fetched per screening timeframe
+SCREEN_PERIODS = {
+    '1m': '7d',
+    '2m': '60d',
+    '5m': '60d',
+    '15m': '60d',
+    '30m': '60d',
+    '60m': '60d',
+    '1h': '60d',
+    '90m': '60d',
+    '1d': '6mo'
+}
+
+MIN_SCREEN_BARS = 60    # Fewer bars than this and a symbol is not scored
+
+# Sort order of screen results
+SIGNAL_PRIORITY = {
+    'STRONG BUY': 5,
+    'BUY': 4,
+    'STRONG SELL': 3,
+    'SELL': 2,
+    'HOLD': 1
+}
+
+
+def iter_screen_results(stocks, selected_indicators, timeframe='1d', fetch=None, fetch_batch=None,
+                        batch_size=BATCH_SIZE, max_workers=FETCH_WORKERS, fetch_timeout=FETCH_TIMEOUT,
+                        use_signal_cache=True, indicator_params=None):
+    """
+    Screen stocks, yielding each symbol's result as soon as it is computed
+    
+    Args:
+        Same as screen_multiple_stocks
+    
+    Yields:
+        (index, symbol, result) in completion order, result is None when the
+        symbol was skipped (no data, too few candles, no signal)
+    """
+    period = SCREEN_PERIODS.get(timeframe, '6mo')
+    
+    info(f"\nScreening {len(stocks)} stocks with timeframe: {timeframe}, period: {period}")
+    
+    # Indicators run as each frame arrives
+    for index, symbol, data in fetch_stocks_concurrently(
+        stocks, period, timeframe, fetch=fetch, fetch_batch=fetch_batch, batch_size=batch_size,
+        max_workers=max_workers, timeout=fetch_timeout
+    ):
+        debug(f"\nAnalyzing {symbol}...")
+        
+        if data is None or len(data) < 60:
+            debug(f"Skipping {symbol} - insufficient data")
+            perf_metrics.increment('symbols_skipped')
+            yield index, symbol, None
+            continue
+        
+        perf_metrics.increment('symbols_screened')
+        
+        # Generate signal (cached until the next candle arrives)
+        if use_signal_cache:
+            result = signal_cache.get_or_compute(
+                symbol, timeframe, selected_indicators, data,
+                lambda: generate_advanced_signal(symbol, selected_indicators, data=data,
+                                                 indicator_params=indicator_params),
+                indicator_params=indicator_params
+            )
+        else:
+            result = generate_advanced_signal(symbol, selected_indicators, data=data,
+                                              indicator_params=indicator_params)
+        yield index, symbol, result
+
+
+def sort_screen_results(results):
+    """Sort results by signal priority, then buy percentage (stable for ties)"""
+    return sorted(
+        results,
+        key=lambda x: (SIGNAL_PRIORITY.get(x['signal'], 0), x.get('buy_percentage', 0)),
+        reverse=True
+    )
+
+
+def screen_multiple_stocks(stocks, selected_indicators, timeframe='1d', fetch=None, fetch_batch=None,
+                           batch_size=BATCH_SIZE, max_workers=FETCH_WORKERS, fetch_timeout=FETCH_TIMEOUT,
+                           use_signal_cache=True, indicator_params=None):
     """
     Screen multiple stocks with selected indicators and timeframe
     
@@ -288,53 +535,367 @@ def screen_multiple_stocks(stocks, selected_indicators, timeframe='1d'):
         stocks: List of stock symbols
         selected_indicators: Dict of which indicators to use
         timeframe: '1d', '1h', '30m', '15m', etc.
+        fetch: Optional per-symbol data source, see fetch_stocks_concurrently
+        fetch_batch: Optional batched data source (defaults to get_stocks_data)
+        batch_size: Symbols per batched request
+        max_workers: Max concurrent fetch requests
+        fetch_timeout: Per-request fetch timeout in seconds
+        use_signal_cache: Reuse results computed earlier within the same candle
+        indicator_params: Merged indicator periods/thresholds (defaults when None)
     
     Returns:
         List of results
     """
-    results = []
+    # Slots keep the input order for ties in the final sort
+    slots = [None] * len(stocks)
     
-    # Determine period based on timeframe
-    period_map = {
-        '1m': '7d',
-        '5m': '60d',
-        '15m': '60d',
-        '30m': '60d',
-        '1h': '60d',
-        '1d': '6mo'
-    }
-    period = period_map.get(timeframe, '6mo')
+    for index, symbol, result in iter_screen_results(
+        stocks, selected_indicators, timeframe, fetch=fetch, fetch_batch=fetch_batch,
+        batch_size=batch_size, max_workers=max_workers, fetch_timeout=fetch_timeout,
+        use_signal_cache=use_signal_cache, indicator_params=indicator_params
+    ):
+        slots[index] = result
+    
+    return sort_screen_results([signal_data for signal_data in slots if signal_data])
+
+
+def covers_timeframe(period, interval, min_bars=MIN_SCREEN_BARS):
+    """
+    True if `period` of history holds at least min_bars bars of interval
     
-    print(f"\nScreening {len(stocks)} stocks with timeframe: {timeframe}, period: {period}")
+    Counts 5 sessions a week of 09:15-15:30, so exchange holidays can
+    leave a borderline period a few bars short.
+    """
+    now = pd.Timestamp.now().normalize()
+    start = period_start(period, now)
+    if start is None:
+        return True
+    sessions = (now - start).days * 5 // 7
+    minutes = INTERVAL_MINUTES[interval]
+    if minutes is None:
+        return sessions >= min_bars
+    session_minutes = (SESSION_CLOSE - SESSION_OPEN) // pd.Timedelta(minutes=1)
+    return sessions * -(-session_minutes // minutes) >= min_bars
+
+
+def screen_multi_timeframe(stocks, selected_indicators, timeframes, fetch=None, fetch_batch=None,
+                           batch_size=BATCH_SIZE, max_workers=FETCH_WORKERS, fetch_timeout=FETCH_TIMEOUT,
+                           use_signal_cache=True, indicator_params=None, period=None):
+    """
+    Screen stocks on several timeframes from one fetch per symbol
     
-    for symbol in stocks:
-        print(f"\nAnalyzing {symbol}...")
-        
-        # Get data with timeframe
-        data = get_stock_data(symbol, period=period, interval=timeframe)
-        
-        if data is None or len(data) < 60:
-            print(f"Skipping {symbol} - insufficient data")
+    Each symbol is fetched once at the finest requested interval; coarser
+    bars are built locally on NSE session boundaries (see resampling.py)
+    and every timeframe is scored like screen_multiple_stocks.
+    
+    The finest interval's history limits what it can be resampled into:
+    60 days of 5m bars are only about 41 sessions, too few daily bars to
+    score. A timeframe the base period can't cover with MIN_SCREEN_BARS
+    bars (see covers_timeframe) is fetched on its own interval and
+    SCREEN_PERIODS instead, one extra fetch per such timeframe.
+    
+    Args:
+        stocks, selected_indicators, fetch, fetch_batch, batch_size,
+        max_workers, fetch_timeout, use_signal_cache, indicator_params:
+            Same as screen_multiple_stocks
+        timeframes: e.g. ['5m', '15m', '1h', '1d']
+        period: History to fetch (default: SCREEN_PERIODS of the finest
+                interval; symbols left with under 60 bars on a timeframe are
+                not scored on it)
+    
+    Returns:
+        Dict with 'base_interval', 'period', 'timeframes', 'fetched'
+        (timeframes fetched on their own interval), 'matrix' (per symbol: the
+        signal on each timeframe, the consensus signal and the % of scored
+        timeframes agreeing with it, sorted like screen results) and
+        'results' ({symbol: {timeframe: result or None}})
+    """
+    timeframes = list(dict.fromkeys(timeframes))
+    base = finest_interval(timeframes)
+    period = period or SCREEN_PERIODS.get(base, '6mo')
+    fetched = [timeframe for timeframe in timeframes
+               if timeframe != base and not covers_timeframe(period, timeframe)]
+    
+    info(f"\nMulti-timeframe screen: {len(stocks)} stocks, timeframes {', '.join(timeframes)} "
+          f"from {base} bars ({period})")
+    
+    # Timeframes the base history is too short for, on their own interval
+    direct = {}
+    for timeframe in fetched:
+        info(f"Fetching {timeframe} bars ({SCREEN_PERIODS.get(timeframe, '6mo')}) - "
+              f"{period} of {base} bars can't cover it")
+        direct[timeframe] = {
+            symbol: data for _, symbol, data in fetch_stocks_concurrently(
+                stocks, SCREEN_PERIODS.get(timeframe, '6mo'), timeframe, fetch=fetch, fetch_batch=fetch_batch,
+                batch_size=batch_size, max_workers=max_workers, timeout=fetch_timeout
+            )
+        }
+    
+    rows = [None] * len(stocks)
+    results = {}
+    for index, symbol, data in fetch_stocks_concurrently(
+        stocks, period, base, fetch=fetch, fetch_batch=fetch_batch, batch_size=batch_size,
+        max_workers=max_workers, timeout=fetch_timeout
+    ):
+        if data is None or data.empty:
+            debug(f"Skipping {symbol} - no data")
+            perf_metrics.increment('symbols_skipped')
             continue
+        perf_metrics.increment('symbols_screened')
         
-        # Generate signal
-        signal_data = generate_advanced_signal(symbol, selected_indicators, data=data)
+        scored = {}
+        for timeframe in timeframes:
+            if timeframe in direct:
+                frame = direct[timeframe].get(symbol)
+                if frame is None:
+                    frame = data.iloc[:0]
+            else:
+                frame = data if timeframe == base else resample_ohlcv(data, timeframe)
+            if len(frame) < MIN_SCREEN_BARS:
+                debug(f"Skipping {symbol} {timeframe} - {len(frame)} bars")
+                scored[timeframe] = None
+                continue
+            compute = lambda frame=frame: generate_advanced_signal(
+                symbol, selected_indicators, data=frame, indicator_params=indicator_params
+            )
+            if use_signal_cache:
+                scored[timeframe] = signal_cache.get_or_compute(
+                    symbol, timeframe, selected_indicators, frame, compute, indicator_params=indicator_params
+                )
+            else:
+                scored[timeframe] = compute()
+        results[symbol] = scored
         
-        if signal_data:
-            results.append(signal_data)
-    
-    # Sort by signal priority
-    signal_priority = {
-        'STRONG BUY': 5,
-        'BUY': 4,
-        'STRONG SELL': 3,
-        'SELL': 2,
-        'HOLD': 1
-    }
+        signals = [result['signal'] for result in scored.values() if result]
+        if not signals:
+            continue
+        counts = Counter(signals).most_common()
+        tied = len(counts) > 1 and counts[0][1] == counts[1][1]
+        row = {'symbol': symbol}
+        row.update({timeframe: result['signal'] if result else None for timeframe, result in scored.items()})
+        row['consensus'] = 'MIXED' if tied else counts[0][0]
+        row['agreement'] = round(counts[0][1] / len(signals) * 100, 1)
+        row['scored_timeframes'] = len(signals)
+        rows[index] = row
+    
+    matrix = sorted(
+        [row for row in rows if row],
+        key=lambda row: (SIGNAL_PRIORITY.get(row['consensus'], 0), row['agreement']),
+        reverse=True
+    )
+    return {'base_interval': base, 'period': period, 'timeframes': timeframes, 'fetched': fetched,
+            'matrix': matrix, 'results': results}
+
+
+# Result columns, in the order signal_from_indicators builds them
+SCREEN_COLUMNS = [
+    'symbol', 'signal', 'confidence', 'price', 'buy_signals', 'sell_signals', 'neutral_signals',
+    'buy_percentage', 'sell_percentage', 'neutral_percentage', 'risk_score',
+    'rsi', 'macd', 'adx', 'cci', 'willr', 'mfi', 'volume_ratio'
+]
+
+
+STACK_COLUMNS = ['Close', 'High', 'Low', 'Volume']
+
+
+def stack_layout(frames, min_candles=60):
+    """
+    Rows and width of the matrices stack_frames builds
     
-    results.sort(key=lambda x: (signal_priority.get(x['signal'], 0), x.get('buy_percentage', 0)), reverse=True)
+    Returns:
+        (symbols, bars) - the symbols with at least min_candles candles, in
+        frames order, and the longest of their histories
+    """
+    symbols = [symbol for symbol, data in frames.items() if data is not None and len(data) >= min_candles]
+    bars = max((len(frames[symbol]) for symbol in symbols), default=0)
+    return symbols, bars
+
+
+def stack_frames(frames, min_candles=60, out=None):
+    """
+    Right-align OHLCV frames into (symbols x bars) matrices
     
-    return results
+    Row i is symbol i's whole history ending in the last column (its own
+    latest candle), left-padded with NaN. TA-Lib skips leading NaNs, so a
+    padded row gives the same indicator values as the unpadded frame.
+    
+    Args:
+        frames: Dict {symbol: DataFrame}
+        min_candles: Symbols with fewer candles are left out
+        out: Optional float64 (4 x symbols x bars) array to fill instead of
+             allocating one (e.g. a shared-memory buffer), see stack_layout
+    
+    Returns:
+        (symbols, arrays) where arrays maps 'Close', 'High', 'Low', 'Volume'
+        to float64 matrices (views into out when given)
+    
+    Raises:
+        ValueError: out does not match the stacked shape
+    """
+    symbols, bars = stack_layout(frames, min_candles)
+    shape = (len(STACK_COLUMNS), len(symbols), bars)
+    
+    # One (columns x symbols x bars) block; frame.to_numpy() is far cheaper
+    # than four column lookups, positions are resolved once per column layout
+    if out is None:
+        block = np.empty(shape)
+    elif out.shape != shape or out.dtype != np.float64:
+        raise ValueError(f"out must be a float64 array of shape {shape}, got {out.dtype} {out.shape}")
+    else:
+        block = out
+    positions = {}
+    for row, symbol in enumerate(symbols):
+        data = frames[symbol]
+        layout = tuple(data.columns)
+        if layout not in positions:
+            positions[layout] = [data.columns.get_loc(column) for column in STACK_COLUMNS]
+        values = data.to_numpy()[:, positions[layout]]
+        pad = bars - len(values)
+        block[:, row, :pad] = np.nan
+        block[:, row, pad:] = values.T
+    
+    return symbols, dict(zip(STACK_COLUMNS, block))
+
+
+def latest_indicator_values(arrays, keys, params=None):
+    """
+    Latest value of each indicator series for every row of stacked matrices
+    
+    Volume stats and SMAs are column slices of the whole matrix; the
+    recursive TA-Lib indicators (RSI, MACD, ADX, ...) run once per row,
+    calling the C functions straight from a plan resolved up front (the
+    per-call Python overhead was most of the cost, see talib_plan).
+    
+    Returns:
+        Dict {key: array with one value per symbol}
+    """
+    params = params or DEFAULT_INDICATOR_PARAMS
+    close, volume = arrays['Close'], arrays['Volume']
+    count = len(close)
+    values = {}
+    per_row = []
+    
+    for key in keys:
+        if key.startswith('sma_') and key[4:].isdigit():
+            period = int(key[4:])
+            values[key] = close[:, -period:].mean(axis=1) if close.shape[1] >= period else np.full(count, np.nan)
+        elif SERIES_KEYS.get(key) == 'volume':
+            window = int(params['volume']['window'])
+            with np.errstate(divide='ignore', invalid='ignore'):
+                avg_volume = np.nanmean(volume[:, -window:], axis=1)
+                values['avg_volume'] = avg_volume
+                values['current_volume'] = volume[:, -1]
+                values['volume_ratio'] = volume[:, -1] / avg_volume
+        else:
+            per_row.append(key)
+    
+    for key in per_row:
+        values[key] = np.full(count, np.nan)
+    plan = [
+        (function, [{'close': close, 'high': arrays['High'], 'low': arrays['Low'], 'volume': volume}[name]
+                    for name in names], kwargs, [values[key] if key else None for key in outputs])
+        for function, names, kwargs, outputs in talib_plan(per_row, params)
+    ]
+    for row in range(count):
+        for function, matrices, kwargs, targets in plan:
+            result = function(*[matrix[row] for matrix in matrices], **kwargs)
+            if len(targets) == 1:
+                targets[0][row] = result[-1]
+                continue
+            for target, series in zip(targets, result):
+                if target is not None:
+                    target[row] = series[-1]
+    
+    return {key: values[key] for key in keys}
+
+
+def screen_cross_section(frames, selected_indicators, indicator_params=None):
+    """
+    Screen a whole universe at once over a (symbols x bars) matrix
+    
+    Same rules and output fields as screen_multiple_stocks, but votes,
+    confidence, risk score and the signal-priority sort run as array
+    operations over all symbols instead of one call per symbol.
+    
+    Args:
+        frames: Dict {symbol: DataFrame}, e.g. from get_stocks_data
+        selected_indicators: Dict of which indicators to use
+        indicator_params: Merged indicator periods/thresholds (defaults when None)
+    
+    Returns:
+        DataFrame with one row per symbol (SCREEN_COLUMNS), sorted like
+        sort_screen_results
+    """
+    params = indicator_params or DEFAULT_INDICATOR_PARAMS
+    symbols, arrays = stack_frames(frames)
+    perf_metrics.increment('symbols_screened', len(symbols))
+    perf_metrics.increment('symbols_skipped', len(frames) - len(symbols))
+    if sum(selected_indicators.values()) == 0 or not symbols:
+        return pd.DataFrame(columns=SCREEN_COLUMNS)
+    
+    info(f"\nCross-sectional screen: {len(symbols)} symbols x {arrays['Close'].shape[1]} bars")
+    
+    keys = required_series(selected_indicators, params, risk=True)
+    try:
+        with perf_metrics.stage('indicators'):
+            latest = latest_indicator_values(arrays, keys, params)
+    except Exception as e:
+        print(f"Error calculating indicators: {e}")
+        return pd.DataFrame(columns=SCREEN_COLUMNS)
+    
+    return vote_cross_section(symbols, latest, arrays['Close'][:, -1], selected_indicators, params)
+
+
+def vote_cross_section(symbols, latest, price, selected_indicators, indicator_params=None):
+    """
+    Screen results for many symbols from their latest indicator values
+    
+    Args:
+        symbols: Symbol per row
+        latest: Dict {key: array with one value per symbol}, see latest_indicator_values
+        price: Latest close per symbol
+        selected_indicators: Dict of which indicators to use
+        indicator_params: Merged indicator periods/thresholds (defaults when None)
+    
+    Returns:
+        DataFrame like screen_cross_section's
+    """
+    params = indicator_params or DEFAULT_INDICATOR_PARAMS
+    active_count = sum(selected_indicators.values())
+    
+    buy, sell, neutral, _ = count_indicator_votes(latest, price, selected_indicators, params=params)
+    
+    signal = np.where((buy > sell) & (buy >= neutral), 'BUY',
+                      np.where((sell > buy) & (sell >= neutral), 'SELL', 'HOLD'))
+    confidence = np.maximum(np.maximum(buy, sell), neutral) / active_count * 100
+    
+    risk = params['risk']
+    risk_factors = (
+        ((latest['rsi'] > risk['rsi_high']) | (latest['rsi'] < risk['rsi_low'])).astype(int)
+        + (latest['adx'] < risk['adx_low'])
+        + (latest['volume_ratio'] < risk['volume_ratio_low'])
+    )
+    
+    results = pd.DataFrame({
+        'symbol': symbols,
+        'signal': signal,
+        'confidence': np.round(confidence, 1),
+        'price': np.round(price, 2),
+        'buy_signals': buy,
+        'sell_signals': sell,
+        'neutral_signals': neutral,
+        'buy_percentage': np.round(buy / active_count * 100, 1),
+        'sell_percentage': np.round(sell / active_count * 100, 1),
+        'neutral_percentage': np.round(neutral / active_count * 100, 1),
+        'risk_score': np.round(risk_factors / 3 * 100, 1)
+    })
+    for key in SCREEN_COLUMNS[11:]:
+        results[key] = np.round(latest[key], 2) if key in latest else None
+    
+    # Stable descending sort keeps input order for ties, as sort_screen_results does
+    priority = results['signal'].map(SIGNAL_PRIORITY).to_numpy()
+    order = np.lexsort((-results['buy_percentage'].to_numpy(), -priority))
+    return results.iloc[order].reset_index(drop=True)
 
 
 
@@ -0,0 +1,98 @@
+# serialization.py - Response bodies: fast JSON and Arrow IPC by content negotiation
+#
+# JSON goes through orjson when it is installed (NumPy scalars and arrays
+# serialize natively, NaN becomes null); otherwise through the json module
+# with the same output.
+# Clients that send Accept: application/vnd.apache.arrow.stream (or
+# ?format=arrow) get a table as an Arrow IPC stream instead, typed columns
+# with no per-row objects, and the scalar fields as schema metadata.
+import json
+import math
+import numpy as np
+import pyarrow as pa
+from flask import Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+JSON_MIMETYPE = 'application/json'
+ARROW_MIMETYPE = 'application/vnd.apache.arrow.stream'
+
+
+def _sanitize(value):
+    # json module fallback: NumPy values to Python ones and NaN/inf to None, as orjson does
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: _sanitize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_sanitize(item) for item in value]
+    if isinstance(value, np.ndarray):
+        return _sanitize(value.tolist())
+    if isinstance(value, np.generic):
+        return _sanitize(value.item())
+    return value
+
+
+def dumps(payload):
+    """Encode payload as JSON bytes (NaN and infinity become null)"""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(_sanitize(payload), allow_nan=False, separators=(',', ':')).encode()
+
+
+def wants_arrow(request):
+    """True if the client asked for Arrow IPC (?format=arrow or an Accept header preferring it)"""
+    if request.args.get('format') == 'arrow':
+        return True
+    best = request.accept_mimetypes.best_match([JSON_MIMETYPE, ARROW_MIMETYPE], default=JSON_MIMETYPE)
+    return best == ARROW_MIMETYPE
+
+
+def json_response(payload, status=200, headers=None):
+    return Response(dumps(payload), status=status, mimetype=JSON_MIMETYPE, headers=headers)
+
+
+def columns_to_table(columns, summary=None):
+    """
+    Arrow table from a dict of equal-length arrays (or lists of dicts' values)
+
+    Args:
+        columns: Dict {name: ndarray / DatetimeIndex / list}
+        summary: Scalar fields, stored as JSON under the 'summary' schema metadata key
+
+    Returns:
+        pyarrow.Table
+    """
+    table = pa.table({name: pa.array(values) for name, values in columns.items()})
+    if summary is not None:
+        table = table.replace_schema_metadata({'summary': dumps(summary)})
+    return table
+
+
+def records_to_table(records, summary=None):
+    """Arrow table from a list of result dicts (column order of the first record)"""
+    names = list(dict.fromkeys(name for record in records for name in record))
+    return columns_to_table({name: [record.get(name) for record in records] for name in names}, summary)
+
+
+def arrow_response(table, status=200, headers=None):
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return Response(sink.getvalue().to_pybytes(), status=status, mimetype=ARROW_MIMETYPE, headers=headers)
+
+
+def negotiate(request, payload, table_key, status=200):
+    """
+    payload as JSON, or its table_key list of records as Arrow IPC when asked for
+
+    The rest of payload travels as the Arrow 'summary' metadata.
+    """
+    if wants_arrow(request) and isinstance(payload.get(table_key), list):
+        summary = {key: value for key, value in payload.items() if key != table_key}
+        return arrow_response(records_to_table(payload[table_key], summary), status)
+    return json_response(payload, status)
@@ -0,0 +1,238 @@
+# shared_store.py - SQLite store shared by every worker process on the host
+#
+# gunicorn workers each have their own memory, so anything cached in a
+# module global is fetched and computed once per worker. Entries here live
+# in one SQLite file in WAL mode: every process sees every write, readers
+# never block writers, and each entry carries a version number so the
+# per-process caches in front of it can tell when their copy is stale.
+import os
+import json
+import time
+import sqlite3
+import threading
+import numpy as np
+import pandas as pd
+
+
+SHARED_STORE_PATH = os.environ.get('SHARED_STORE_PATH', os.path.join('.cache', 'shared.sqlite'))
+SHARED_STORE_TIMEOUT = 30      # Seconds a writer waits for the lock
+PURGE_EVERY = 200              # Puts per process between expired-entry sweeps
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value BLOB,
+    meta TEXT,
+    version INTEGER NOT NULL,
+    bytes INTEGER NOT NULL,
+    updated_at REAL NOT NULL,
+    expires_at REAL,
+    PRIMARY KEY (namespace, key)
+) WITHOUT ROWID
+"""
+
+
+class SharedStore:
+    """
+    Namespaced key -> bytes (+ JSON meta) entries in one SQLite file
+
+    Each put bumps the entry's version. A connection is opened per thread
+    and per process, so the store is safe to use from request threads and
+    after a fork.
+    """
+
+    def __init__(self, path=SHARED_STORE_PATH, timeout=SHARED_STORE_TIMEOUT):
+        self.path = path
+        self.timeout = timeout
+        self.local = threading.local()
+        self.puts = 0
+
+    def _connection(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is not None and self.local.pid == os.getpid():
+            return conn
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(_SCHEMA)
+        self.local.conn = conn
+        self.local.pid = os.getpid()
+        return conn
+
+    def get(self, namespace, key, with_value=True):
+        """
+        Entry for key, or None if missing or expired
+
+        Returns:
+            Dict with 'value' (bytes, only when with_value), 'meta',
+            'version', 'bytes' and 'updated_at'
+        """
+        columns = 'value, meta, version, bytes, updated_at' if with_value else 'NULL, meta, version, bytes, updated_at'
+        row = self._connection().execute(
+            f"SELECT {columns} FROM entries WHERE namespace = ? AND key = ? "
+            f"AND (expires_at IS NULL OR expires_at > ?)",
+            (namespace, key, time.time())
+        ).fetchone()
+        if row is None:
+            return None
+        value, meta, version, size, updated_at = row
+        entry = {'meta': json.loads(meta) if meta else None, 'version': version,
+                 'bytes': size, 'updated_at': updated_at}
+        if with_value:
+            entry['value'] = value
+        return entry
+
+    def version(self, namespace, key):
+        """Current version of key (None if missing), without reading the value"""
+        entry = self.get(namespace, key, with_value=False)
+        return entry['version'] if entry is not None else None
+
+    def put(self, namespace, key, value, meta=None, ttl=None):
+        """
+        Insert or replace an entry
+
+        Args:
+            value: bytes
+            meta: JSON-serializable dict stored next to the value
+            ttl: Seconds until the entry expires (None keeps it until replaced)
+
+        Returns:
+            The entry's new version
+        """
+        now = time.time()
+        version = self._connection().execute(
+            "INSERT INTO entries (namespace, key, value, meta, version, bytes, updated_at, expires_at) "
+            "VALUES (?, ?, ?, ?, 1, ?, ?, ?) "
+            "ON CONFLICT (namespace, key) DO UPDATE SET value = excluded.value, meta = excluded.meta, "
+            "version = entries.version + 1, bytes = excluded.bytes, updated_at = excluded.updated_at, "
+            "expires_at = excluded.expires_at "
+            "RETURNING version",
+            (namespace, key, value, json.dumps(meta) if meta is not None else None, len(value or b''),
+             now, now + ttl if ttl is not None else None)
+        ).fetchone()[0]
+
+        self.puts += 1
+        if self.puts % PURGE_EVERY == 0:
+            self.purge_expired()
+        return version
+
+    def lease(self, namespace, key, owner, ttl):
+        """
+        Take or renew a lease on key for ttl seconds
+
+        Only one owner holds a lease at a time; it passes to another owner
+        once it expires without being renewed.
+
+        Returns:
+            True if owner holds the lease now
+        """
+        now = time.time()
+        row = self._connection().execute(
+            "INSERT INTO entries (namespace, key, value, meta, version, bytes, updated_at, expires_at) "
+            "VALUES (?, ?, ?, NULL, 1, 0, ?, ?) "
+            "ON CONFLICT (namespace, key) DO UPDATE SET value = excluded.value, "
+            "version = entries.version + 1, updated_at = excluded.updated_at, expires_at = excluded.expires_at "
+            "WHERE entries.value = excluded.value OR entries.expires_at <= ? "
+            "RETURNING version",
+            (namespace, key, owner, now, now + ttl, now)
+        ).fetchone()
+        return row is not None
+
+    def release(self, namespace, key, owner):
+        """Give up a lease held by owner"""
+        self._connection().execute("DELETE FROM entries WHERE namespace = ? AND key = ? AND value = ?",
+                                   (namespace, key, owner))
+
+    def delete(self, namespace, key):
+        self._connection().execute("DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def expire(self, namespace, key, ttl):
+        """Set an entry to expire ttl seconds from now, without rewriting its value"""
+        self._connection().execute("UPDATE entries SET expires_at = ? WHERE namespace = ? AND key = ?",
+                                   (time.time() + ttl, namespace, key))
+
+    def clear(self, namespace):
+        self._connection().execute("DELETE FROM entries WHERE namespace = ?", (namespace,))
+
+    def purge_expired(self):
+        self._connection().execute("DELETE FROM entries WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                                   (time.time(),))
+
+    def entries(self, namespace):
+        """(key, bytes, updated_at) of every entry in the namespace, oldest update first"""
+        return self._connection().execute(
+            "SELECT key, bytes, updated_at FROM entries WHERE namespace = ? ORDER BY updated_at",
+            (namespace,)
+        ).fetchall()
+
+    def values(self, namespace):
+        """(key, value) of every live entry in the namespace"""
+        return self._connection().execute(
+            "SELECT key, value FROM entries WHERE namespace = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (namespace, time.time())
+        ).fetchall()
+
+    def usage(self, namespace):
+        """(entries, bytes) in the namespace"""
+        count, size = self._connection().execute(
+            "SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM entries WHERE namespace = ?", (namespace,)
+        ).fetchone()
+        return count, size
+
+
+def pack_frame(data):
+    """
+    Serialize a numeric DataFrame as raw column buffers
+
+    Returns:
+        (bytes, meta) - the int64 nanosecond index followed by each column,
+        and the layout unpack_frame needs to map it back
+
+    Raises:
+        ValueError: A column is not numeric
+    """
+    index = data.index
+    columns = []
+    buffers = [np.ascontiguousarray(index.values.astype('datetime64[ns]').view(np.int64)).tobytes()]
+    for name in data.columns:
+        values = np.ascontiguousarray(data[name].to_numpy())
+        if values.dtype.kind not in 'biuf':
+            raise ValueError(f"Column {name} is not numeric ({values.dtype})")
+        columns.append([str(name), values.dtype.str])
+        buffers.append(values.tobytes())
+    meta = {
+        'rows': len(data),
+        'columns': columns,
+        'tz': str(index.tz) if getattr(index, 'tz', None) is not None else None,
+        'index_name': index.name
+    }
+    return b''.join(buffers), meta
+
+
+def unpack_frame(value, meta):
+    """
+    DataFrame over the buffers from pack_frame
+
+    Columns are read-only NumPy views of value, nothing is parsed or copied
+    """
+    rows = meta['rows']
+    offset = rows * 8
+    index = pd.DatetimeIndex(np.frombuffer(value, dtype=np.int64, count=rows).view('datetime64[ns]'),
+                             name=meta['index_name'])
+    if meta['tz'] is not None:
+        index = index.tz_localize('UTC').tz_convert(meta['tz'])
+
+    columns = {}
+    for name, dtype in meta['columns']:
+        dtype = np.dtype(dtype)
+        columns[name] = np.frombuffer(value, dtype=dtype, count=rows, offset=offset)
+        offset += rows * dtype.itemsize
+    return pd.DataFrame(columns, index=index, copy=False)
+
+
+# Global store (shared across app)
+shared_store = SharedStore()
@@ -0,0 +1,167 @@
+# signal_cache.py - In-memory LRU cache of per-symbol screen results
+import os
+import sys
+import json
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from shared_store import shared_store
+from serialization import dumps
+
+
+SIGNAL_CACHE_MAX_BYTES = int(float(os.environ.get('SIGNAL_CACHE_MAX_MB', 32)) * 1024 * 1024)
+SIGNAL_SHARED_TTL = int(os.environ.get('SIGNAL_SHARED_TTL', 24 * 3600))   # Seconds a result stays in the shared store
+
+_MISSING = object()
+
+
+def indicator_set_hash(selected_indicators, indicator_params=None):
+    """
+    Stable short hash of the enabled indicators and their parameters
+
+    Only the enabled names count, so {'rsi': True, 'cci': False} and
+    {'rsi': True} share cache entries. None (all indicators) with default
+    params gets its own key.
+    """
+    if selected_indicators is None and indicator_params is None:
+        return 'default'
+    enabled = None
+    if selected_indicators is not None:
+        enabled = sorted(name for name, on in selected_indicators.items() if on)
+    payload = json.dumps([enabled, indicator_params], sort_keys=True)
+    return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+
+def _sizeof(value):
+    """Approximate deep size in bytes of a result dict"""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(_sizeof(key) + _sizeof(item) for key, item in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(_sizeof(item) for item in value)
+    return size
+
+
+class SignalCache:
+    """
+    LRU cache of generate_advanced_signal results
+
+    Keyed by (symbol, timeframe, indicator set + params hash, last candle timestamp), so
+    every request inside the same candle is served from memory and the first
+    request after a new candle recomputes. Least recently used entries are
+    evicted once the estimated size passes max_bytes.
+
+    A local miss is looked up in the shared store before computing, and
+    computed results are written there as JSON, so one worker's screen
+    serves the others. Shared entries expire after shared_ttl seconds.
+    """
+
+    namespace = 'signals'
+
+    def __init__(self, max_bytes=SIGNAL_CACHE_MAX_BYTES, store=shared_store, shared_ttl=SIGNAL_SHARED_TTL):
+        self.max_bytes = max_bytes
+        self.store = store
+        self.shared_ttl = shared_ttl
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()    # key -> (result, bytes)
+        self.bytes = 0
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key(self, symbol, timeframe, selected_indicators, last_timestamp, indicator_params=None):
+        return (symbol, timeframe, indicator_set_hash(selected_indicators, indicator_params), str(last_timestamp))
+
+    def get(self, key):
+        """Cached result for key (None results count too), or _MISSING"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return _MISSING
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, result):
+        size = _sizeof(key) + _sizeof(result)
+        with self.lock:
+            if key in self.entries:
+                self.bytes -= self.entries.pop(key)[1]
+            self.entries[key] = (result, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes and self.entries:
+                _, (_, evicted) = self.entries.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+
+    def get_or_compute(self, symbol, timeframe, selected_indicators, data, compute, indicator_params=None):
+        """
+        Serve one symbol's screen result from cache, computing it on a miss
+
+        Args:
+            symbol, timeframe, selected_indicators: Cache key parts
+            data: OHLCV frame (its last index value completes the key)
+            compute: Callable() -> result dict or None
+            indicator_params: Indicator periods/thresholds (part of the key)
+
+        Returns:
+            Result dict (a copy, safe to modify) or None
+        """
+        key = self.key(symbol, timeframe, selected_indicators, data.index[-1], indicator_params)
+        result = self.get(key)
+        if result is _MISSING:
+            result = self._get_shared(key)
+            if result is _MISSING:
+                result = compute()
+                self._put_shared(key, result)
+            self.put(key, result)
+        return dict(result) if result is not None else None
+
+    def _get_shared(self, key):
+        if self.store is None:
+            return _MISSING
+        try:
+            entry = self.store.get(self.namespace, '|'.join(key))
+        except sqlite3.Error as e:
+            print(f"Shared signal cache unavailable: {e}")
+            return _MISSING
+        if entry is None:
+            return _MISSING
+        with self.lock:
+            self.shared_hits += 1
+        return json.loads(entry['value'])
+
+    def _put_shared(self, key, result):
+        if self.store is None:
+            return
+        try:
+            self.store.put(self.namespace, '|'.join(key), dumps(result), ttl=self.shared_ttl)
+        except sqlite3.Error as e:
+            print(f"Shared signal cache unavailable: {e}")
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        """Hit/miss counters and memory usage for sizing the cache"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'shared_hits': self.shared_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups * 100, 1) if lookups else 0,
+                'entries': len(self.entries),
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes
+            }
+
+
+# Global cache instance (shared across app)
+signal_cache = SignalCache()
@@ -0,0 +1,238 @@
+# simulator.py - Bar-by-bar trade simulator kernel over plain float arrays
+#
+# Compiled with Numba when it is installed, otherwise the same function runs
+# as plain Python over lists (still far cheaper than pandas .iloc per bar).
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+# Columns of the trade matrix returned by simulate_trades
+TRADE_COLUMNS = ['entry_index', 'exit_index', 'side', 'entry', 'sl', 'tp',
+                 'exit', 'reason', 'pnl', 'cumulative_pnl']
+
+# Kernel state between chunks
+STATE_FIELDS = ['capital', 'position', 'entry', 'entry_index', 'sl', 'tp', 'position_size']
+
+# Bars simulated per kernel call, progress is reported between calls
+SIMULATION_CHUNK = 50000
+
+
+def _grow(trades):
+    bigger = np.zeros((trades.shape[0] * 2, trades.shape[1]))
+    bigger[:trades.shape[0]] = trades
+    return bigger
+
+
+def _record(trades, count, entry_index, exit_index, side, entry_price, stop_loss_price,
+            take_profit_price, exit_price, reason, profit_amount, cumulative_pnl):
+    if count == trades.shape[0]:
+        trades = _grow(trades)
+    trades[count, 0] = entry_index
+    trades[count, 1] = exit_index
+    trades[count, 2] = side
+    trades[count, 3] = entry_price
+    trades[count, 4] = stop_loss_price
+    trades[count, 5] = take_profit_price
+    trades[count, 6] = exit_price
+    trades[count, 7] = reason
+    trades[count, 8] = profit_amount
+    trades[count, 9] = cumulative_pnl
+    return trades
+
+
+def _simulate(highs, lows, closes, signals, start, stop, trade_signals, initial_capital,
+              risk_per_trade, stop_loss_ticks, take_profit_ticks, tick_size,
+              commission, slippage_ticks, state):
+    # Position state carries over between chunks through the STATE_FIELDS vector
+    capital = state[0]
+    position = int(state[1])  # 0 flat, 1 LONG, -1 SHORT
+    entry_price = state[2]
+    entry_index = int(state[3])
+    stop_loss_price = state[4]
+    take_profit_price = state[5]
+    position_size = state[6]
+    slip = slippage_ticks * tick_size
+
+    trades = np.zeros((256, 10))
+    trade_count = 0
+    equity_index = np.empty(max(stop - start, 0), dtype=np.int64)
+    equity_values = np.empty(max(stop - start, 0), dtype=np.float64)
+    equity_count = 0
+
+    for i in range(start, stop):
+        current_high = highs[i]
+        current_low = lows[i]
+        current_close = closes[i]
+
+        # ===== SL before TP, both exits skip the rest of the bar =====
+        if position == 1:
+            exit_price = 0.0
+            reason = -1
+            if current_low <= stop_loss_price:
+                exit_price = stop_loss_price
+                reason = 0
+            elif current_high >= take_profit_price:
+                exit_price = take_profit_price
+                reason = 1
+            if reason >= 0:
+                profit_amount = (exit_price - entry_price) * position_size - (commission * 2)
+                capital += profit_amount
+                trades = _record(trades, trade_count, entry_index, i, 1, entry_price, stop_loss_price,
+                                 take_profit_price, exit_price, reason, profit_amount, capital - initial_capital)
+                trade_count += 1
+                position = 0
+                continue
+
+        elif position == -1:
+            exit_price = 0.0
+            reason = -1
+            if current_high >= stop_loss_price:
+                exit_price = stop_loss_price
+                reason = 0
+            elif current_low <= take_profit_price:
+                exit_price = take_profit_price
+                reason = 1
+            if reason >= 0:
+                profit_amount = (entry_price - exit_price) * position_size - (commission * 2)
+                capital += profit_amount
+                trades = _record(trades, trade_count, entry_index, i, -1, entry_price, stop_loss_price,
+                                 take_profit_price, exit_price, reason, profit_amount, capital - initial_capital)
+                trade_count += 1
+                position = 0
+                continue
+
+        if not trade_signals:
+            continue
+
+        signal = signals[i]
+
+        # ===== Entries =====
+        if position == 0:
+            if signal != 0:
+                entry_price = current_close + signal * slip
+                stop_loss_price = entry_price - signal * (stop_loss_ticks * tick_size)
+                take_profit_price = entry_price + signal * (take_profit_ticks * tick_size)
+
+                risk_amount = capital * (risk_per_trade / 100)
+                risk_per_share = (entry_price - stop_loss_price) * signal
+
+                if risk_per_share > 0:
+                    size = np.trunc(risk_amount / risk_per_share)
+                else:
+                    size = np.trunc((capital * 0.1) / entry_price)
+
+                if size > 0:
+                    position = signal
+                    position_size = size
+                    entry_index = i
+
+        # ===== Signal exits =====
+        elif position == 1 and signal == -1:
+            exit_price = current_close - slip
+            profit_amount = (exit_price - entry_price) * position_size - (commission * 2)
+            capital += profit_amount
+            trades = _record(trades, trade_count, entry_index, i, 1, entry_price, stop_loss_price,
+                             take_profit_price, exit_price, 2, profit_amount, capital - initial_capital)
+            trade_count += 1
+            position = 0
+
+        elif position == -1 and signal == 1:
+            exit_price = current_close + slip
+            profit_amount = (entry_price - exit_price) * position_size - (commission * 2)
+            capital += profit_amount
+            trades = _record(trades, trade_count, entry_index, i, -1, entry_price, stop_loss_price,
+                             take_profit_price, exit_price, 2, profit_amount, capital - initial_capital)
+            trade_count += 1
+            position = 0
+
+        # Mark to the close
+        current_equity = capital
+        if position == 1:
+            current_equity = capital + ((current_close - entry_price) * position_size)
+        elif position == -1:
+            current_equity = capital + ((entry_price - current_close) * position_size)
+
+        equity_index[equity_count] = i
+        equity_values[equity_count] = current_equity
+        equity_count += 1
+
+    state[0] = capital
+    state[1] = position
+    state[2] = entry_price
+    state[3] = entry_index
+    state[4] = stop_loss_price
+    state[5] = take_profit_price
+    state[6] = position_size
+    return trades[:trade_count], equity_index[:equity_count], equity_values[:equity_count]
+
+
+if NUMBA_AVAILABLE:
+    _grow = njit(cache=True)(_grow)
+    _record = njit(cache=True)(_record)
+    # nogil so backtests on a thread pool (see jobs.py) run in parallel
+    _simulate_compiled = njit(cache=True, nogil=True)(_simulate)
+
+
+def simulate_trades(highs, lows, closes, signals, start, trade_signals, initial_capital,
+                    risk_per_trade, stop_loss_ticks, take_profit_ticks, tick_size,
+                    commission, slippage_ticks, progress=None, chunk_size=SIMULATION_CHUNK):
+    """
+    Run the LONG/SHORT position state machine over precomputed signals
+
+    SL is checked before TP, a bar that hits either does nothing else.
+    Entries and signal exits fill at the close +/- slippage, commission is
+    charged twice per round trip and size risks risk_per_trade % of capital.
+
+    Args:
+        highs, lows, closes: float64 arrays, one value per bar
+        signals: int8 array (1 BUY, -1 SELL, 0 NEUTRAL)
+        start: First bar to simulate
+        trade_signals: False skips entries/exits (no active indicators)
+        Remaining args: backtest_strategy params, already converted to float
+        progress: Optional callable(bars_done, bars_total), called after every
+                  chunk_size bars (raise from it to abort the run)
+
+    Returns:
+        (trades, equity_index, equity_values, capital, open_trade) where trades
+        is a (count x TRADE_COLUMNS) float matrix and open_trade holds
+        [side, entry_index, entry, sl, tp] of a position still open at the end
+    """
+    args = (bool(trade_signals), float(initial_capital), float(risk_per_trade),
+            float(stop_loss_ticks), float(take_profit_ticks), float(tick_size),
+            float(commission), float(slippage_ticks))
+    highs = np.asarray(highs, dtype=np.float64)
+    lows = np.asarray(lows, dtype=np.float64)
+    closes = np.asarray(closes, dtype=np.float64)
+    signals = np.asarray(signals, dtype=np.int64)
+    state = [float(initial_capital), 0, 0.0, 0, 0.0, 0.0, 0.0]
+
+    if NUMBA_AVAILABLE:
+        kernel = _simulate_compiled
+        state = np.array(state, dtype=np.float64)
+    else:
+        # Python floats/ints index much faster than NumPy scalars
+        kernel = _simulate
+        highs, lows, closes, signals = highs.tolist(), lows.tolist(), closes.tolist(), signals.tolist()
+
+    bars = len(closes)
+    total = max(bars - start, 0)
+    pieces = []
+    for chunk_start in range(start, bars, chunk_size):
+        chunk_stop = min(chunk_start + chunk_size, bars)
+        pieces.append(kernel(highs, lows, closes, signals, chunk_start, chunk_stop, *args, state))
+        if progress is not None:
+            progress(chunk_stop - start, total)
+
+    trades = np.concatenate([piece[0] for piece in pieces]) if pieces else np.zeros((0, len(TRADE_COLUMNS)))
+    equity_index = np.concatenate([piece[1] for piece in pieces]) if pieces else np.empty(0, dtype=np.int64)
+    equity_values = np.concatenate([piece[2] for piece in pieces]) if pieces else np.empty(0)
+
+    capital, position, entry_price, entry_index, stop_loss_price, take_profit_price, _ = state
+    open_trade = np.array([position, entry_index, entry_price, stop_loss_price, take_profit_price])
+    # NumPy scalar either way, so callers round it the same on both paths
+    return trades, equity_index, equity_values, np.float64(capital), open_trade
@@ -40,7 +40,7 @@ async function runScreener() {
     document.getElementById('screener-results').style.display = 'none';
 
     try {
-        const response = await fetch('/api/screen', {
+        const response = await fetch('/api/screen/stream', {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
@@ -51,14 +51,20 @@ async function runScreener() {
             })
         });
 
-        const data = await response.json();
-
-        if (data.success) {
-            displayResults(data.results);
-            updateTime();
-        } else {
-            alert('Error: ' + data.error);
-        }
+        // Rows render as they arrive, the summary line re-renders them sorted
+        startProgressiveResults();
+        await readNDJSON(response, message => {
+            if (message.type === 'result') {
+                document.getElementById('loading').style.display = 'none';
+                appendProgressiveResult(message.result, message.done, message.total);
+            } else if (message.type === 'summary') {
+                displayResults(message.results);
+                currentResultId = message.result_id;
+                updateTime();
+            } else if (message.type === 'error') {
+                alert('Error: ' + message.error);
+            }
+        });
     } catch (error) {
         alert('Error running screener: ' + error);
     } finally {
@@ -67,8 +73,28 @@ async function runScreener() {
 }
 
 
+// Read a newline-delimited JSON response, calling onMessage per line
+async function readNDJSON(response, onMessage) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+        const { value, done } = await reader.read();
+        buffer += decoder.decode(value || new Uint8Array(), { stream: !done });
+
+        const lines = buffer.split('\n');
+        buffer = lines.pop();
+        lines.filter(line => line.trim()).forEach(line => onMessage(JSON.parse(line)));
+
+        if (done) break;
+    }
+    if (buffer.trim()) onMessage(JSON.parse(buffer));
+}
+
 
 let currentResults = [];
+let currentResultId = null;  // Server-side copy of the results, exported by id
 
 
 function displayResults(results) {
@@ -77,7 +103,22 @@ function displayResults(results) {
     currentResults = results;
     document.getElementById('export-btn').style.display = 'inline-block';
     
-    // Summary
+    container.appendChild(createScreenSummary(results));
+    
+    // Stock cards
+    const stockGrid = document.createElement('div');
+    stockGrid.className = 'stock-grid';
+    
+    results.forEach(stock => {
+        stockGrid.appendChild(createStockCard(stock));
+    });
+    
+    container.appendChild(stockGrid);
+    document.getElementById('screener-results').style.display = 'block';
+}
+
+
+function createScreenSummary(results, progress) {
     const summary = document.createElement('div');
     summary.style.cssText = 'background: #0f172a; padding: 20px; border-radius: 8px; margin-bottom: 20px;';
     
@@ -86,7 +127,7 @@ function displayResults(results) {
     const holds = results.filter(s => s.signal === 'HOLD').length;
     
     summary.innerHTML = `
-        <h3 style="color: #e2e8f0; margin-bottom: 15px;">Screening Summary</h3>
+        <h3 style="color: #e2e8f0; margin-bottom: 15px;">Screening Summary${progress ? ` (${progress})` : ''}</h3>
         <div style="display: grid; grid-template-columns: repeat(3, 1fr); gap: 15px;">
             <div style="background: #2aaf5fff; padding: 15px; border-radius: 6px; text-align: center;">
                 <div style="font-size: 2rem; font-weight: bold; color: #9df8beff;">${buys}</div>
@@ -102,98 +143,118 @@ function displayResults(results) {
             </div>
         </div>
     `;
-    container.appendChild(summary);
+    return summary;
+}
+
+
+function createStockCard(stock) {
+    const card = document.createElement('div');
+    card.className = 'stock-card';
     
-    // Stock cards
-    const stockGrid = document.createElement('div');
-    stockGrid.className = 'stock-grid';
+    // Signal color
+    let signalColor, signalBg, signalEmoji;
+    if (stock.signal === 'BUY') {
+        signalColor = '#86efac';
+        signalBg = '#14532d';
+        signalEmoji = '🟢';
+    } else if (stock.signal === 'SELL') {
+        signalColor = '#fca5a5';
+        signalBg = '#7f1d1d';
+        signalEmoji = '🔴';
+    } else {
+        signalColor = '#93c5fd';
+        signalBg = '#1e3a8a';
+        signalEmoji = '🟡';
+    }
     
-    results.forEach(stock => {
-        const card = document.createElement('div');
-        card.className = 'stock-card';
-        
-        // Signal color
-        let signalColor, signalBg, signalEmoji;
-        if (stock.signal === 'BUY') {
-            signalColor = '#86efac';
-            signalBg = '#14532d';
-            signalEmoji = '🟢';
-        } else if (stock.signal === 'SELL') {
-            signalColor = '#fca5a5';
-            signalBg = '#7f1d1d';
-            signalEmoji = '🔴';
-        } else {
-            signalColor = '#93c5fd';
-            signalBg = '#1e3a8a';
-            signalEmoji = '🟡';
-        }
+    card.innerHTML = `
+        <div style="display: flex; justify-content: space-between; align-items: start; margin-bottom: 15px;">
+            <div>
+                <h3 style="color: #e2e8f0; margin: 0; font-size: 1.3rem;">${stock.symbol}</h3>
+                <p style="color: #94a3b8; margin: 5px 0 0 0;">₹${stock.price}</p>
+            </div>
+            <div style="background: ${signalBg}; padding: 8px 16px; border-radius: 6px;">
+                <span style="color: ${signalColor}; font-weight: bold; font-size: 1.1rem;">
+                    ${signalEmoji} ${stock.signal}
+                </span>
+            </div>
+        </div>
         
-        card.innerHTML = `
-            <div style="display: flex; justify-content: space-between; align-items: start; margin-bottom: 15px;">
-                <div>
-                    <h3 style="color: #e2e8f0; margin: 0; font-size: 1.3rem;">${stock.symbol}</h3>
-                    <p style="color: #94a3b8; margin: 5px 0 0 0;">₹${stock.price}</p>
-                </div>
-                <div style="background: ${signalBg}; padding: 8px 16px; border-radius: 6px;">
-                    <span style="color: ${signalColor}; font-weight: bold; font-size: 1.1rem;">
-                        ${signalEmoji} ${stock.signal}
-                    </span>
-                </div>
+        <div style="background: #0f172a; padding: 12px; border-radius: 6px; margin-bottom: 12px;">
+            <div style="display: flex; justify-content: space-between; margin-bottom: 8px;">
+                <span style="color: #94a3b8; font-size: 0.9rem;">Confidence:</span>
+                <span style="color: #e2e8f0; font-weight: bold;">${stock.confidence}%</span>
             </div>
-            
-            <div style="background: #0f172a; padding: 12px; border-radius: 6px; margin-bottom: 12px;">
-                <div style="display: flex; justify-content: space-between; margin-bottom: 8px;">
-                    <span style="color: #94a3b8; font-size: 0.9rem;">Confidence:</span>
-                    <span style="color: #e2e8f0; font-weight: bold;">${stock.confidence}%</span>
-                </div>
-                <div style="background: #1e293b; height: 8px; border-radius: 4px; overflow: hidden;">
-                    <div style="background: ${signalColor}; height: 100%; width: ${stock.confidence}%;"></div>
-                </div>
+            <div style="background: #1e293b; height: 8px; border-radius: 4px; overflow: hidden;">
+                <div style="background: ${signalColor}; height: 100%; width: ${stock.confidence}%;"></div>
             </div>
-            
-            <div style="display: grid; grid-template-columns: repeat(3, 1fr); gap: 10px; margin-bottom: 12px;">
-                <div style="text-align: center; padding: 8px; background: #14532d; border-radius: 4px;">
-                    <div style="font-size: 1.2rem; font-weight: bold; color: #86efac;">${stock.buy_signals}</div>
-                    <div style="font-size: 0.75rem; color: #bbf7d0;">BUY</div>
-                </div>
-                <div style="text-align: center; padding: 8px; background: #7f1d1d; border-radius: 4px;">
-                    <div style="font-size: 1.2rem; font-weight: bold; color: #fca5a5;">${stock.sell_signals}</div>
-                    <div style="font-size: 0.75rem; color: #fecaca;">SELL</div>
-                </div>
-                <div style="text-align: center; padding: 8px; background: #1e3a8a; border-radius: 4px;">
-                    <div style="font-size: 1.2rem; font-weight: bold; color: #93c5fd;">${stock.neutral_signals}</div>
-                    <div style="font-size: 0.75rem; color: #bfdbfe;">HOLD</div>
-                </div>
+        </div>
+        
+        <div style="display: grid; grid-template-columns: repeat(3, 1fr); gap: 10px; margin-bottom: 12px;">
+            <div style="text-align: center; padding: 8px; background: #14532d; border-radius: 4px;">
+                <div style="font-size: 1.2rem; font-weight: bold; color: #86efac;">${stock.buy_signals}</div>
+                <div style="font-size: 0.75rem; color: #bbf7d0;">BUY</div>
             </div>
-            
-            <div style="display: grid; grid-template-columns: repeat(2, 1fr); gap: 8px; font-size: 0.85rem;">
-                <div style="display: flex; justify-content: space-between;">
-                    <span style="color: #94a3b8;">RSI:</span>
-                    <span style="color: #e2e8f0;">${stock.rsi}</span>
-                </div>
-                <div style="display: flex; justify-content: space-between;">
-                    <span style="color: #94a3b8;">ADX:</span>
-                    <span style="color: #e2e8f0;">${stock.adx}</span>
-                </div>
-                <div style="display: flex; justify-content: space-between;">
-                    <span style="color: #94a3b8;">CCI:</span>
-                    <span style="color: #e2e8f0;">${stock.cci}</span>
-                </div>
-                <div style="display: flex; justify-content: space-between;">
-                    <span style="color: #94a3b8;">MFI:</span>
-                    <span style="color: #e2e8f0;">${stock.mfi}</span>
-                </div>
+            <div style="text-align: center; padding: 8px; background: #7f1d1d; border-radius: 4px;">
+                <div style="font-size: 1.2rem; font-weight: bold; color: #fca5a5;">${stock.sell_signals}</div>
+                <div style="font-size: 0.75rem; color: #fecaca;">SELL</div>
             </div>
-        `;
+            <div style="text-align: center; padding: 8px; background: #1e3a8a; border-radius: 4px;">
+                <div style="font-size: 1.2rem; font-weight: bold; color: #93c5fd;">${stock.neutral_signals}</div>
+                <div style="font-size: 0.75rem; color: #bfdbfe;">HOLD</div>
+            </div>
+        </div>
         
-        stockGrid.appendChild(card);
-    });
+        <div style="display: grid; grid-template-columns: repeat(2, 1fr); gap: 8px; font-size: 0.85rem;">
+            <div style="display: flex; justify-content: space-between;">
+                <span style="color: #94a3b8;">RSI:</span>
+                <span style="color: #e2e8f0;">${stock.rsi}</span>
+            </div>
+            <div style="display: flex; justify-content: space-between;">
+                <span style="color: #94a3b8;">ADX:</span>
+                <span style="color: #e2e8f0;">${stock.adx}</span>
+            </div>
+            <div style="display: flex; justify-content: space-between;">
+                <span style="color: #94a3b8;">CCI:</span>
+                <span style="color: #e2e8f0;">${stock.cci ?? '-'}</span>
+            </div>
+            <div style="display: flex; justify-content: space-between;">
+                <span style="color: #94a3b8;">MFI:</span>
+                <span style="color: #e2e8f0;">${stock.mfi ?? '-'}</span>
+            </div>
+        </div>
+    `;
     
+    return card;
+}
+
+
+// Progressive rendering while the stream is open (arrival order)
+function startProgressiveResults() {
+    const container = document.getElementById('results-container');
+    container.innerHTML = '';
+    currentResults = [];
+    currentResultId = null;
+    
+    const stockGrid = document.createElement('div');
+    stockGrid.className = 'stock-grid';
+    stockGrid.id = 'progressive-grid';
+    
+    container.appendChild(createScreenSummary([], 'starting...'));
     container.appendChild(stockGrid);
-    document.getElementById('screener-results').style.display = 'block';
 }
 
 
+function appendProgressiveResult(stock, done, total) {
+    const container = document.getElementById('results-container');
+    if (stock) {
+        currentResults.push(stock);
+        document.getElementById('progressive-grid').appendChild(createStockCard(stock));
+    }
+    container.replaceChild(createScreenSummary(currentResults, `${done}/${total}`), container.firstChild);
+    document.getElementById('screener-results').style.display = 'block';
+}
+
 async function exportToCSV() {
     if (currentResults.length === 0) {
         alert('No results to export. Please run the screener first.');
@@ -205,16 +266,20 @@ async function exportToCSV() {
     exportBtn.innerText = '📥 Exporting...';
 
     try {
-        const response = await fetch('/api/export-csv', {
+        const post = body => fetch('/api/export-csv', {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
             },
-            body: JSON.stringify({
-                results: currentResults
-            })
+            body: JSON.stringify(body)
         });
 
+        // Export the server's copy by id, re-upload the results only if it has expired
+        let response = currentResultId ? await post({ result_id: currentResultId }) : null;
+        if (!response || response.status === 404) {
+            response = await post({ results: currentResults });
+        }
+
         if (response.ok) {
             // Download the CSV file
             const blob = await response.blob();
@@ -375,6 +440,7 @@ async function runBacktest() {
     };
 
     let requestData = { params: params };
+    let csvFile = null;
 
     if (dataSource === 'csv') {
         const fileInput = document.getElementById('csv-file');
@@ -383,8 +449,8 @@ async function runBacktest() {
             return;
         }
 
-        const csvText = await fileInput.files[0].text();
-        requestData.csv_data = csvText;
+        // Sent as a multipart upload below, parsed in chunks on the server
+        csvFile = fileInput.files[0];
     } else {
         requestData.stock = document.getElementById('stock-select').value;
         requestData.period = document.getElementById('period-select').value;
@@ -396,14 +462,53 @@ async function runBacktest() {
     document.getElementById('backtest-loading').style.display = 'block';
     document.getElementById('backtest-results').style.display = 'none';
 
+    const progressText = document.getElementById('backtest-progress');
+
     try {
-        const response = await fetch('/api/backtest', {
+        // Run as a background job and poll, so long backtests don't hit request timeouts
+        let submitOptions = {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify(requestData)
-        });
+        };
+        if (csvFile) {
+            const form = new FormData();
+            form.append('request', JSON.stringify(requestData));
+            form.append('csv_file', csvFile);
+            submitOptions = { method: 'POST', body: form };
+        }
+        const submit = await fetch('/api/backtest/jobs', submitOptions);
+        const submitted = await submit.json();
+        if (!submitted.success) {
+            alert('Error: ' + submitted.error);
+            return;
+        }
+
+        let job = submitted.status;
+        let data = null;
+        while (job && !['done', 'failed', 'cancelled'].includes(job.status)) {
+            await new Promise(resolve => setTimeout(resolve, 500));
+            const poll = await fetch(`/api/backtest/jobs/${submitted.job_id}`);
+            // The job can't be seen from the worker that answered (or expired)
+            job = poll.ok ? (await poll.json()).job : null;
+            if (!job) break;
+            if (job.stage === 'simulating' && job.progress.total > 0) {
+                progressText.textContent = `Simulating ${job.progress.done.toLocaleString()} / ${job.progress.total.toLocaleString()} bars (${job.progress.percent}%)`;
+            } else if (job.stage === 'loading') {
+                progressText.textContent = 'Loading data...';
+            }
+        }
 
-        const data = await response.json();
+        if (job) {
+            const response = await fetch(`/api/backtest/jobs/${submitted.job_id}/result`);
+            data = response.status !== 404 ? await response.json() : null;
+        }
+        if (!data) {
+            // Lost track of the job: run the backtest in this request instead
+            progressText.textContent = 'Running backtest...';
+            const response = await fetch('/api/backtest', submitOptions);
+            data = await response.json();
+        }
 
         if (data.success) {
             displayBacktestResults(data);
@@ -414,6 +519,7 @@ async function runBacktest() {
         alert('Error running backtest: ' + error);
     } finally {
         document.getElementById('backtest-loading').style.display = 'none';
+        progressText.textContent = '';
     }
 }
 
@@ -493,6 +599,25 @@ function displayBacktestResults(data) {
             </div>
         </div>
         
+        <div class="stock-grid" style="grid-template-columns: repeat(4, 1fr); margin-top: 15px;">
+            <div class="metric">
+                <div class="metric-label">Sharpe Ratio</div>
+                <div class="metric-value">${data.sharpe_ratio ?? '-'}</div>
+            </div>
+            <div class="metric">
+                <div class="metric-label">Sortino Ratio</div>
+                <div class="metric-value">${data.sortino_ratio ?? '-'}</div>
+            </div>
+            <div class="metric">
+                <div class="metric-label">Profit Factor</div>
+                <div class="metric-value">${data.profit_factor ?? '-'}</div>
+            </div>
+            <div class="metric">
+                <div class="metric-label">Exposure</div>
+                <div class="metric-value">${data.exposure}%</div>
+            </div>
+        </div>
+        
         <div style="background: #0f172a; padding: 15px; border-radius: 8px; margin-top: 15px;">
             <h4 style="color: #e2e8f0; margin-bottom: 10px;">Exit Analysis:</h4>
             <div style="display: flex; gap: 20px; color: #94a3b8;">
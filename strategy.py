@@ -1,12 +1,24 @@
 # strategy.py - Centralized strategy configuration
+import json
+from indicators import merge_indicator_params
+from shared_store import shared_store
+
+
 class TradingStrategy:
     """
     Centralized strategy configuration
     Used across screener, backtester, and live monitoring
+    
+    With a store, every change is saved there and sync() loads changes
+    saved by other worker processes, so all workers use the same settings.
     """
     
-    def __init__(self, name="My Strategy"):
+    namespace = 'strategy'
+    
+    def __init__(self, name="My Strategy", store=None):
         self.name = name
+        self.store = store
+        self.version = None     # Store version this copy was loaded from / saved as
         self.selected_indicators = {
             'rsi': True,
             'macd': True,
@@ -18,10 +30,40 @@ class TradingStrategy:
             'willr': True,
             'mfi': True
         }
+        # Periods/thresholds per indicator, see indicators.DEFAULT_INDICATOR_PARAMS
+        self.indicator_params = merge_indicator_params()
     
     def set_indicators(self, indicators_dict):
         """Update which indicators to use"""
         self.selected_indicators = indicators_dict
+        self.save()
+    
+    def set_indicator_params(self, params_dict):
+        """
+        Override indicator periods/thresholds (partial dicts keep the other defaults)
+        
+        Raises:
+            ValueError: Unknown indicator or parameter name
+        """
+        self.indicator_params = merge_indicator_params(params_dict)
+        self.save()
+    
+    def save(self):
+        """Publish the current settings to the other worker processes"""
+        if self.store is None:
+            return
+        state = {'indicators': self.selected_indicators, 'params': self.indicator_params}
+        self.version = self.store.put(self.namespace, self.name, json.dumps(state).encode())
+    
+    def sync(self):
+        """Load settings another process saved since this copy was loaded (one version lookup)"""
+        if self.store is None or self.store.version(self.namespace, self.name) in (None, self.version):
+            return
+        entry = self.store.get(self.namespace, self.name)
+        state = json.loads(entry['value'])
+        self.selected_indicators = state['indicators']
+        self.indicator_params = merge_indicator_params(state['params'])
+        self.version = entry['version']
     
     def get_active_indicators(self):
         """Get list of active indicator names"""
@@ -32,8 +74,9 @@ class TradingStrategy:
         return {
             'name': self.name,
             'indicators': self.selected_indicators,
+            'params': self.indicator_params,
             'active_count': sum(self.selected_indicators.values())
         }
 
 # Global strategy instance (shared across app)
-current_strategy = TradingStrategy()
+current_strategy = TradingStrategy(store=shared_store)
@@ -0,0 +1,456 @@
+# streaming.py - Incremental indicator state for live bar updates
+#
+# Each indicator keeps O(1) state (EMA seeds, Wilder smoothing, fixed-size
+# windows) and follows the same recurrences as TA-Lib, so after every bar the
+# values match calculate_advanced_indicators on the full history.
+import math
+from collections import deque
+from screener import signal_from_indicators
+from indicators import DEFAULT_INDICATOR_PARAMS
+
+
+NAN = float('nan')
+
+
+def _is_zero(value):
+    # TA-Lib TA_IS_ZERO
+    return -0.00000001 < value < 0.00000001
+
+
+def _true_range(high, low, prev_close):
+    true_range = high - low
+    if abs(high - prev_close) > true_range:
+        true_range = abs(high - prev_close)
+    if abs(low - prev_close) > true_range:
+        true_range = abs(low - prev_close)
+    return true_range
+
+
+class SMA:
+    """Simple moving average with a running total (TA-Lib INT_SMA)"""
+
+    def __init__(self, period):
+        self.period = period
+        self.window = deque(maxlen=period)
+        self.total = 0.0
+
+    def update(self, value):
+        self.window.append(value)
+        self.total += value
+        if len(self.window) < self.period:
+            return NAN
+        average = self.total / self.period
+        self.total -= self.window[0]
+        return average
+
+
+class EMA:
+    """
+    Exponential moving average seeded with the SMA of its first period values
+
+    skip drops the first values before seeding, TA-Lib MACD seeds the fast EMA
+    on the bars right before the slow EMA's first output.
+    """
+
+    def __init__(self, period, skip=0):
+        self.period = period
+        self.k = 2.0 / (period + 1)
+        self.skip = skip
+        self.count = 0
+        self.total = 0.0
+        self.value = NAN
+
+    def update(self, value):
+        if self.skip > 0:
+            self.skip -= 1
+            return NAN
+        self.count += 1
+        if self.count < self.period:
+            self.total += value
+            return NAN
+        if self.count == self.period:
+            self.total += value
+            self.value = self.total / self.period
+        else:
+            self.value = ((value - self.value) * self.k) + self.value
+        return self.value
+
+
+class RSI:
+    """Wilder RSI (TA-Lib RSI)"""
+
+    def __init__(self, period=14):
+        self.period = period
+        self.prev = None
+        self.count = 0
+        self.gain = 0.0
+        self.loss = 0.0
+
+    def update(self, close):
+        if self.prev is None:
+            self.prev = close
+            return NAN
+        change = close - self.prev
+        self.prev = close
+        self.count += 1
+
+        if self.count <= self.period:
+            if change < 0:
+                self.loss -= change
+            else:
+                self.gain += change
+            if self.count < self.period:
+                return NAN
+            self.loss /= self.period
+            self.gain /= self.period
+        else:
+            self.loss *= (self.period - 1)
+            self.gain *= (self.period - 1)
+            if change < 0:
+                self.loss -= change
+            else:
+                self.gain += change
+            self.loss /= self.period
+            self.gain /= self.period
+
+        total = self.gain + self.loss
+        return 100.0 * (self.gain / total) if not _is_zero(total) else 0.0
+
+
+class MACD:
+    """MACD line, signal and histogram (TA-Lib MACD)"""
+
+    def __init__(self, fast=12, slow=26, signal=9):
+        self.fast = EMA(fast, skip=slow - fast)
+        self.slow = EMA(slow)
+        self.signal = EMA(signal)
+
+    def update(self, close):
+        fast = self.fast.update(close)
+        slow = self.slow.update(close)
+        if math.isnan(slow):
+            return NAN, NAN, NAN
+        macd = fast - slow
+        signal = self.signal.update(macd)
+        if math.isnan(signal):
+            return NAN, NAN, NAN
+        return macd, signal, macd - signal
+
+
+class BollingerBands:
+    """Upper, middle and lower bands around an SMA (TA-Lib BBANDS)"""
+
+    def __init__(self, period=20, deviations=2.0):
+        self.period = period
+        self.deviations = deviations
+        self.middle = SMA(period)
+        self.window = deque(maxlen=period)
+        self.total_sq = 0.0
+
+    def update(self, close):
+        middle = self.middle.update(close)
+        self.window.append(close)
+        self.total_sq += close * close
+        if math.isnan(middle):
+            return NAN, NAN, NAN
+        variance = self.total_sq / self.period
+        self.total_sq -= self.window[0] * self.window[0]
+        variance -= middle * middle
+        deviation = math.sqrt(variance) if variance >= 0.00000001 else 0.0
+        return middle + deviation * self.deviations, middle, middle - deviation * self.deviations
+
+
+class Stochastic:
+    """Slow stochastic %K/%D with SMA smoothing (TA-Lib STOCH defaults)"""
+
+    def __init__(self, fastk=5, slowk=3, slowd=3):
+        self.highs = deque(maxlen=fastk)
+        self.lows = deque(maxlen=fastk)
+        self.slowk = SMA(slowk)
+        self.slowd = SMA(slowd)
+
+    def update(self, high, low, close):
+        self.highs.append(high)
+        self.lows.append(low)
+        if len(self.highs) < self.highs.maxlen:
+            return NAN, NAN
+        lowest = min(self.lows)
+        diff = (max(self.highs) - lowest) / 100.0
+        fastk = (close - lowest) / diff if diff != 0.0 else 0.0
+        slowk = self.slowk.update(fastk)
+        if math.isnan(slowk):
+            return NAN, NAN
+        slowd = self.slowd.update(slowk)
+        if math.isnan(slowd):
+            return NAN, NAN
+        return slowk, slowd
+
+
+class ADX:
+    """Wilder ADX (TA-Lib ADX)"""
+
+    def __init__(self, period=14):
+        self.period = period
+        self.count = 0
+        self.prev_high = self.prev_low = self.prev_close = None
+        self.plus_dm = self.minus_dm = self.tr = 0.0
+        self.sum_dx = 0.0
+        self.value = NAN
+
+    def _directional_index(self):
+        if _is_zero(self.tr):
+            return None
+        minus_di = 100.0 * (self.minus_dm / self.tr)
+        plus_di = 100.0 * (self.plus_dm / self.tr)
+        total = minus_di + plus_di
+        if _is_zero(total):
+            return None
+        return 100.0 * (abs(minus_di - plus_di) / total)
+
+    def update(self, high, low, close):
+        if self.prev_high is None:
+            self.prev_high, self.prev_low, self.prev_close = high, low, close
+            return NAN
+
+        self.count += 1
+        diff_plus = high - self.prev_high
+        diff_minus = self.prev_low - low
+        true_range = _true_range(high, low, self.prev_close)
+        self.prev_high, self.prev_low, self.prev_close = high, low, close
+
+        smoothing = self.count >= self.period
+        if smoothing:
+            self.minus_dm -= self.minus_dm / self.period
+            self.plus_dm -= self.plus_dm / self.period
+        if diff_minus > 0 and diff_plus < diff_minus:
+            self.minus_dm += diff_minus
+        elif diff_plus > 0 and diff_plus > diff_minus:
+            self.plus_dm += diff_plus
+        if smoothing:
+            self.tr = self.tr - (self.tr / self.period) + true_range
+        else:
+            self.tr += true_range
+            return NAN
+
+        dx = self._directional_index()
+        # First ADX is the mean DX of bars period..2*period-1, then Wilder smoothing
+        if self.count < 2 * self.period - 1:
+            if dx is not None:
+                self.sum_dx += dx
+            return NAN
+        if self.count == 2 * self.period - 1:
+            if dx is not None:
+                self.sum_dx += dx
+            self.value = self.sum_dx / self.period
+        elif dx is not None:
+            self.value = ((self.value * (self.period - 1)) + dx) / self.period
+        return self.value
+
+
+class ATR:
+    """Wilder average true range (TA-Lib ATR)"""
+
+    def __init__(self, period=14):
+        self.period = period
+        self.prev_close = None
+        self.count = 0
+        self.value = 0.0
+
+    def update(self, high, low, close):
+        if self.prev_close is None:
+            self.prev_close = close
+            return NAN
+        true_range = _true_range(high, low, self.prev_close)
+        self.prev_close = close
+        self.count += 1
+
+        if self.count < self.period:
+            self.value += true_range
+            return NAN
+        if self.count == self.period:
+            self.value = (self.value + true_range) / self.period
+        else:
+            self.value *= self.period - 1
+            self.value += true_range
+            self.value /= self.period
+        return self.value
+
+
+class CCI:
+    """Commodity channel index over typical price (TA-Lib CCI)"""
+
+    def __init__(self, period=14):
+        self.period = period
+        self.window = deque(maxlen=period)
+
+    def update(self, high, low, close):
+        typical = (high + low + close) / 3
+        self.window.append(typical)
+        if len(self.window) < self.period:
+            return NAN
+        average = sum(self.window) / self.period
+        deviation = sum(abs(value - average) for value in self.window)
+        distance = typical - average
+        if distance != 0.0 and deviation != 0.0:
+            return distance / (0.015 * (deviation / self.period))
+        return 0.0
+
+
+class WilliamsR:
+    """Williams %R (TA-Lib WILLR)"""
+
+    def __init__(self, period=14):
+        self.highs = deque(maxlen=period)
+        self.lows = deque(maxlen=period)
+
+    def update(self, high, low, close):
+        self.highs.append(high)
+        self.lows.append(low)
+        if len(self.highs) < self.highs.maxlen:
+            return NAN
+        highest = max(self.highs)
+        diff = (highest - min(self.lows)) / (-100.0)
+        return (highest - close) / diff if diff != 0.0 else 0.0
+
+
+class MFI:
+    """Money flow index (TA-Lib MFI)"""
+
+    def __init__(self, period=14):
+        self.period = period
+        self.prev_typical = None
+        self.flows = deque(maxlen=period)
+        self.positive = 0.0
+        self.negative = 0.0
+
+    def update(self, high, low, close, volume):
+        typical = (high + low + close) / 3.0
+        if self.prev_typical is None:
+            self.prev_typical = typical
+            return NAN
+        change = typical - self.prev_typical
+        self.prev_typical = typical
+        flow = typical * volume
+
+        if len(self.flows) == self.period:
+            positive, negative = self.flows[0]
+            self.positive -= positive
+            self.negative -= negative
+        if change < 0:
+            self.flows.append((0.0, flow))
+            self.negative += flow
+        elif change > 0:
+            self.flows.append((flow, 0.0))
+            self.positive += flow
+        else:
+            self.flows.append((0.0, 0.0))
+
+        if len(self.flows) < self.period:
+            return NAN
+        total = self.positive + self.negative
+        return 100.0 * (self.positive / total) if total >= 1.0 else 0.0
+
+
+class StreamingIndicators:
+    """
+    Incremental version of calculate_advanced_indicators for one symbol
+
+    Seed it once with from_frame(history), then call update() with each new
+    candle. Every update is constant time and the values match TA-Lib on the
+    full history to within floating-point tolerance.
+
+    indicator_params are the merged periods/thresholds (merge_indicator_params,
+    defaults when None), the same ones the screen and backtest are given.
+    """
+
+    # Moving averages every screen reports (see indicators.ALL_SERIES)
+    MOVING_AVERAGES = ['sma_20', 'sma_50', 'ema_12', 'ema_26']
+
+    def __init__(self, indicator_params=None):
+        params = indicator_params or DEFAULT_INDICATOR_PARAMS
+        self.params = params
+        self.bars = 0
+        self.close = NAN
+        self.rsi = RSI(params['rsi']['timeperiod'])
+        self.macd = MACD(params['macd']['fastperiod'], params['macd']['slowperiod'], params['macd']['signalperiod'])
+        self.bbands = BollingerBands(params['bollinger']['timeperiod'], params['bollinger']['nbdev'])
+        self.stoch = Stochastic(params['stochastic']['fastk_period'], params['stochastic']['slowk_period'],
+                                params['stochastic']['slowd_period'])
+        self.adx = ADX(params['adx']['timeperiod'])
+        self.cci = CCI(params['cci']['timeperiod'])
+        self.willr = WilliamsR(params['willr']['timeperiod'])
+        self.mfi = MFI(params['mfi']['timeperiod'])
+        self.atr = ATR(params['atr']['timeperiod'])
+        self.volumes = deque(maxlen=int(params['volume']['window']))
+
+        # Plus the SMAs the ADX and Volume votes compare price with
+        keys = self.MOVING_AVERAGES + [f"sma_{int(params[name]['sma_period'])}" for name in ('adx', 'volume')]
+        self.averages = {}
+        for key in dict.fromkeys(keys):
+            kind, period = key.split('_')
+            self.averages[key] = SMA(int(period)) if kind == 'sma' else EMA(int(period))
+        self.values = None
+
+    @classmethod
+    def from_frame(cls, data, indicator_params=None):
+        """Build the state by replaying an OHLCV DataFrame"""
+        state = cls(indicator_params)
+        columns = zip(data['High'].values, data['Low'].values, data['Close'].values, data['Volume'].values)
+        for high, low, close, volume in columns:
+            state.update(high, low, close, volume)
+        return state
+
+    def update(self, high, low, close, volume):
+        """
+        Append one candle
+
+        Returns:
+            Dictionary with all indicator values (same keys as calculate_advanced_indicators)
+        """
+        high, low, close, volume = float(high), float(low), float(close), float(volume)
+        self.bars += 1
+        self.close = close
+
+        macd, macd_signal, macd_histogram = self.macd.update(close)
+        bb_upper, bb_middle, bb_lower = self.bbands.update(close)
+        stoch_k, stoch_d = self.stoch.update(high, low, close)
+
+        self.volumes.append(volume)
+        avg_volume = sum(self.volumes) / len(self.volumes)
+        if avg_volume != 0:
+            volume_ratio = volume / avg_volume
+        else:
+            volume_ratio = NAN if volume == 0 else math.copysign(math.inf, volume)
+
+        self.values = {
+            'rsi': self.rsi.update(close),
+            'macd': macd,
+            'macd_signal': macd_signal,
+            'macd_histogram': macd_histogram,
+            'bb_upper': bb_upper,
+            'bb_middle': bb_middle,
+            'bb_lower': bb_lower,
+            'stoch_k': stoch_k,
+            'stoch_d': stoch_d,
+            'adx': self.adx.update(high, low, close),
+            'cci': self.cci.update(high, low, close),
+            'willr': self.willr.update(high, low, close),
+            'mfi': self.mfi.update(high, low, close, volume),
+            'avg_volume': avg_volume,
+            'current_volume': volume,
+            'volume_ratio': volume_ratio,
+            'atr': self.atr.update(high, low, close)
+        }
+        for key, average in self.averages.items():
+            self.values[key] = average.update(close)
+        return self.values
+
+    def signal(self, symbol, selected_indicators):
+        """
+        Screen result from the current state, same as generate_advanced_signal
+        with this state's indicator params
+        Returns: Result dict, or None before 60 bars
+        """
+        if self.bars < 60 or self.values is None:
+            return None
+        return signal_from_indicators(symbol, self.values, self.close, selected_indicators, self.params)
@@ -0,0 +1,232 @@
+# sweep.py - Parallel parameter sweep (grid search) over backtest_strategy
+import os
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from screener import calculate_indicator_series
+from backtester import backtest_strategy
+from indicators import INDICATOR_NAMES, required_series
+from instrumentation import info, debug
+
+
+SWEEP_PARAMS = ['stop_loss', 'take_profit', 'risk_per_trade', 'slippage']
+MAX_SWEEP_RUNS = 20000
+SWEEP_WORKERS = int(os.environ.get('SWEEP_WORKERS', os.cpu_count() or 1))   # Most processes one request may start
+
+# Metrics copied into each row of the ranked table
+SWEEP_METRICS = [
+    'final_capital', 'total_return', 'total_trades', 'winning_trades', 'losing_trades',
+    'win_rate', 'avg_profit_per_trade', 'avg_win', 'avg_loss', 'max_drawdown',
+    'max_drawdown_duration', 'sharpe_ratio', 'sortino_ratio', 'calmar_ratio',
+    'profit_factor', 'exposure', 'sl_exits', 'tp_exits', 'signal_exits'
+]
+
+# Metrics where smaller is better
+ASCENDING_METRICS = {'max_drawdown', 'max_drawdown_duration', 'losing_trades', 'sl_exits'}
+
+# Worker state, set once per process by _init_worker
+_worker_data = None
+_worker_series = None
+_worker_indicator_params = None
+
+
+def expand_range(spec):
+    """
+    Expand one parameter range
+
+    Args:
+        spec: List of values, a single value, or {'start', 'stop', 'step'} (stop inclusive)
+
+    Returns:
+        List of values
+    """
+    if isinstance(spec, dict):
+        start, stop, step = float(spec['start']), float(spec['stop']), float(spec.get('step', 1))
+        if step <= 0:
+            raise ValueError("step must be positive")
+        count = int(np.floor((stop - start) / step + 1e-9)) + 1
+        return [round(start + i * step, 10) for i in range(max(count, 0))]
+    if isinstance(spec, (list, tuple)):
+        return list(spec)
+    return [spec]
+
+
+def expand_param_grid(ranges):
+    """
+    Cartesian product of parameter ranges
+
+    Args:
+        ranges: Dict {param: range spec} for any of SWEEP_PARAMS
+
+    Returns:
+        List of param dicts
+    """
+    unknown = [name for name in ranges if name not in SWEEP_PARAMS]
+    if unknown:
+        raise ValueError(f"Unknown sweep parameters: {', '.join(unknown)}. Allowed: {', '.join(SWEEP_PARAMS)}")
+
+    names = list(ranges)
+    values = [expand_range(ranges[name]) for name in names]
+    return [dict(zip(names, combo)) for combo in itertools.product(*values)]
+
+
+def expand_indicator_sets(indicator_sets):
+    """
+    Indicator subsets to sweep
+
+    Args:
+        indicator_sets: 'all' for every non-empty subset of the 9 indicators,
+                        or a list of selected_indicators dicts / lists of names
+
+    Returns:
+        List of selected_indicators dicts
+    """
+    if indicator_sets == 'all':
+        return [
+            {name: bool(mask >> bit & 1) for bit, name in enumerate(INDICATOR_NAMES)}
+            for mask in range(1, 2 ** len(INDICATOR_NAMES))
+        ]
+
+    expanded = []
+    for subset in indicator_sets:
+        if isinstance(subset, dict):
+            expanded.append({name: bool(subset.get(name, False)) for name in INDICATOR_NAMES})
+        else:
+            expanded.append({name: name in subset for name in INDICATOR_NAMES})
+    return expanded
+
+
+def _init_worker(data, series, indicator_params=None):
+    # With the fork start method these are inherited from the parent, not pickled
+    global _worker_data, _worker_series, _worker_indicator_params
+    _worker_data = data
+    _worker_series = series
+    _worker_indicator_params = indicator_params
+
+
+def _run_one(task):
+    run_id, selected_indicators, params = task
+    result = backtest_strategy(_worker_data, selected_indicators, params, series=_worker_series,
+                               indicator_params=_worker_indicator_params, log=debug)
+    # Only metrics go back to the parent, not the trade/equity arrays
+    if not result.get('success'):
+        return run_id, result
+    return run_id, {key: result[key] for key in ['success'] + SWEEP_METRICS}
+
+
+def _pool_context():
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return multiprocessing.get_context()
+
+
+def resolve_workers(workers, tasks):
+    """
+    Process count for a request: at most SWEEP_WORKERS and one per task
+
+    Raises:
+        ValueError: workers is not a whole number
+    """
+    if workers is None:
+        workers = SWEEP_WORKERS
+    try:
+        workers = int(workers)
+    except (TypeError, ValueError):
+        raise ValueError(f"workers must be a whole number, got {workers!r}")
+    return max(1, min(workers, SWEEP_WORKERS, tasks))
+
+
+def run_parameter_sweep(data, ranges, indicator_sets, base_params=None,
+                        rank_by='total_return', top=None, workers=None, indicator_params=None):
+    """
+    Backtest every combination of parameters and indicator subsets
+
+    Series for every indicator used by any subset are computed once and
+    shared by all runs.
+
+    Args:
+        data: OHLCV DataFrame
+        ranges: Dict {param: range spec}, see expand_param_grid
+        indicator_sets: See expand_indicator_sets
+        base_params: Params shared by every run (capital, tick size, commission, ...)
+        rank_by: Metric to sort by (max_drawdown sorts ascending, others descending)
+        top: Only return the best N rows (positive int)
+        workers: Process count (defaults to and capped at SWEEP_WORKERS, 1 runs in-process)
+        indicator_params: Merged indicator periods/thresholds (defaults when None)
+
+    Returns:
+        Dict with success flag, run count and the ranked table
+
+    Raises:
+        ValueError: workers or top is not a valid number
+    """
+    if top is not None:
+        try:
+            top = int(top)
+        except (TypeError, ValueError):
+            raise ValueError(f"top must be a positive whole number, got {top!r}")
+        if top < 1:
+            raise ValueError(f"top must be a positive whole number, got {top}")
+
+    base_params = dict(base_params or {})
+    grid = expand_param_grid(ranges) or [{}]
+    subsets = expand_indicator_sets(indicator_sets)
+
+    total_runs = len(grid) * len(subsets)
+    if total_runs == 0:
+        return {'success': False, 'error': 'Nothing to sweep'}
+    if total_runs > MAX_SWEEP_RUNS:
+        return {'success': False, 'error': f'Sweep has {total_runs} runs, maximum is {MAX_SWEEP_RUNS}'}
+    if rank_by not in SWEEP_METRICS:
+        return {'success': False, 'error': f"rank_by must be one of: {', '.join(SWEEP_METRICS)}"}
+    if len(data) < 60:
+        return {'success': False, 'error': 'Need at least 60 candles'}
+
+    used = {name: any(subset[name] for subset in subsets) for name in INDICATOR_NAMES}
+    series = calculate_indicator_series(data, required_series(used, indicator_params), indicator_params)
+    if series is None:
+        return {'success': False, 'error': 'Could not calculate indicators'}
+
+    tasks = []
+    for selected_indicators in subsets:
+        for overrides in grid:
+            tasks.append((len(tasks), selected_indicators, dict(base_params, **overrides)))
+
+    workers = resolve_workers(workers, total_runs)
+    info(f"\nSweeping {total_runs} backtests on {workers} worker(s)")
+
+    if workers == 1:
+        _init_worker(data, series, indicator_params)
+        results = [_run_one(task) for task in tasks]
+    else:
+        chunksize = max(1, total_runs // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context(),
+                                 initializer=_init_worker, initargs=(data, series, indicator_params)) as executor:
+            results = list(executor.map(_run_one, tasks, chunksize=chunksize))
+
+    table = []
+    for run_id, result in results:
+        _, selected_indicators, params = tasks[run_id]
+        if not result.get('success'):
+            continue
+        row = {name: params[name] for name in ranges}
+        row['indicators'] = [name for name in INDICATOR_NAMES if selected_indicators[name]]
+        row.update({metric: result[metric] for metric in SWEEP_METRICS})
+        table.append(row)
+
+    # Undefined ratios (None) always rank last
+    ranked = [row for row in table if row[rank_by] is not None]
+    ranked.sort(key=lambda row: row[rank_by], reverse=rank_by not in ASCENDING_METRICS)
+    table = ranked + [row for row in table if row[rank_by] is None]
+    for rank, row in enumerate(table, 1):
+        row['rank'] = rank
+
+    info(f"Sweep complete: {len(table)} runs ranked by {rank_by}")
+
+    return {
+        'success': True,
+        'total_runs': total_runs,
+        'rank_by': rank_by,
+        'results': table[:top] if top is not None else table
+    }
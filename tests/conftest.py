@@ -0,0 +1,33 @@
+# conftest.py - Shared fixtures; the app modules live in the repo root
+import os
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep the module-level shared store out of the working tree
+os.environ.setdefault('SHARED_STORE_PATH', os.path.join(tempfile.mkdtemp(prefix='screener-tests-'), 'shared.sqlite'))
+
+
+def synthetic_ohlcv(bars, seed=0, freq='h', start='2024-01-01 09:15', volume=True):
+    """Deterministic random-walk OHLCV frame"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, bars)))
+    spread = np.abs(rng.normal(0, 0.006, bars)) * close
+    high = close + spread * rng.random(bars)
+    low = close - spread * rng.random(bars)
+    return pd.DataFrame({
+        'Open': low + (high - low) * rng.random(bars),
+        'High': high,
+        'Low': low,
+        'Close': close,
+        'Volume': rng.integers(1000, 100000, bars).astype(float) if volume else np.zeros(bars)
+    }, index=pd.date_range(start, periods=bars, freq=freq))
+
+
+@pytest.fixture
+def ohlcv():
+    return synthetic_ohlcv
@@ -0,0 +1,50 @@
+# test_cross_section.py - Cross-sectional screen against the per-symbol screen
+import numpy as np
+import pytest
+from indicators import INDICATOR_NAMES, merge_indicator_params
+from screener import generate_advanced_signal, screen_cross_section, sort_screen_results, SCREEN_COLUMNS
+
+
+def universe(ohlcv, count=30, seed=0):
+    """Frames of different lengths (some too short to screen), a few without volume"""
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(40, 400, count)
+    return {f'S{i}': ohlcv(int(bars), seed * 100 + i, volume=i % 7 != 3) for i, bars in enumerate(lengths)}
+
+
+def per_symbol(frames, selected, params):
+    results = [generate_advanced_signal(symbol, selected, data, params) for symbol, data in frames.items()]
+    return sort_screen_results([result for result in results if result is not None])
+
+
+@pytest.mark.parametrize('subset, overrides', [
+    (INDICATOR_NAMES, None),
+    (['rsi', 'macd', 'bollinger'], None),
+    (['adx', 'volume', 'mfi'], None),
+    (INDICATOR_NAMES, {'rsi': {'timeperiod': 9}, 'macd': {'fastperiod': 8, 'slowperiod': 21},
+                       'adx': {'sma_period': 30}, 'volume': {'window': 10}}),
+])
+def test_cross_section_matches_per_symbol_screen(ohlcv, subset, overrides):
+    frames = universe(ohlcv)
+    assert len({len(data) for data in frames.values()}) > 10 and min(len(data) for data in frames.values()) < 60
+    selected = {name: name in subset for name in INDICATOR_NAMES}
+    params = merge_indicator_params(overrides)
+
+    expected = per_symbol(frames, selected, params)
+    results = screen_cross_section(frames, selected, params).to_dict('records')
+
+    # Same symbols (the short ones left out), in the same order
+    assert [row['symbol'] for row in results] == [row['symbol'] for row in expected]
+    for row, reference in zip(results, expected):
+        for column in SCREEN_COLUMNS:
+            value, wanted = row[column], reference[column]
+            if wanted is None or (isinstance(wanted, float) and np.isnan(wanted)):
+                assert value is None or np.isnan(value), (row['symbol'], column)
+            else:
+                assert value == wanted, (row['symbol'], column)
+
+
+def test_nothing_to_screen(ohlcv):
+    selected = dict.fromkeys(INDICATOR_NAMES, True)
+    assert screen_cross_section({'A': ohlcv(30), 'B': None}, selected).empty
+    assert screen_cross_section({'A': ohlcv(100)}, dict.fromkeys(INDICATOR_NAMES, False)).empty
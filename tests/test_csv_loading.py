@@ -0,0 +1,71 @@
+# test_csv_loading.py - Chunked CSV ingest against the whole-file loader
+import io
+import numpy as np
+import pandas as pd
+import pytest
+from backtester import load_csv_chunked, load_csv_data
+
+
+def csv_text(ohlcv, bars=1000, volume=True, tz=None):
+    data = ohlcv(bars, 3, freq='min')
+    if tz:
+        data.index = data.index.tz_localize(tz)
+    if not volume:
+        data = data.drop(columns='Volume')
+    return data.rename_axis('Date').reset_index().to_csv(index=False)
+
+
+@pytest.mark.parametrize('chunk_rows', [37, 250, 1000, 5000])
+def test_chunks_give_the_whole_file_frame(ohlcv, chunk_rows):
+    text = csv_text(ohlcv)
+    expected, error = load_csv_data(text)
+    assert error is None
+
+    data, error = load_csv_chunked(io.StringIO(text), chunk_rows)
+    assert error is None
+    pd.testing.assert_frame_equal(data, expected, check_index_type=False, check_freq=False)
+    assert data.attrs['ingest']['rows'] == 1000
+    assert data.attrs['ingest']['chunks'] == -(-1000 // chunk_rows)
+
+
+def test_prices_parse_straight_to_float64(ohlcv):
+    data, _ = load_csv_chunked(io.BytesIO(csv_text(ohlcv, 50).encode()), 20)
+    assert all(dtype == np.float64 for dtype in data.dtypes)
+    assert isinstance(data.index, pd.DatetimeIndex) and data.index.name == 'Date'
+
+
+def test_bad_rows_dropped_and_counted():
+    text = ("Date,Open,High,Low,Close,Volume\n"
+            "2024-01-01 09:17,3,3,3,3,30\n"
+            "2024-01-01 09:15,1,1,1,1,10\n"
+            "2024-01-01 09:16,-,2,2,2,20\n"       # Missing price
+            ",4,4,4,4,40\n"                       # Missing date
+            "2024-01-01 09:18,5,5,5,5,null\n"      # Missing volume
+            "2024-01-01 09:19,6,6,6,6,60\n")
+    data, error = load_csv_chunked(io.StringIO(text), 2)
+    assert error is None
+    # Sorted across chunks
+    assert list(data['Close']) == [1.0, 3.0, 6.0]
+    assert data.attrs['ingest']['dropped_rows'] == 3
+
+
+def test_without_volume_column(ohlcv):
+    data, error = load_csv_chunked(io.StringIO(csv_text(ohlcv, 100, volume=False)), 30)
+    assert error is None
+    assert (data['Volume'] == 0).all() and data['Volume'].dtype == np.float64
+
+
+def test_offsets_keep_timezone(ohlcv):
+    data, _ = load_csv_chunked(io.StringIO(csv_text(ohlcv, 100, tz='Asia/Kolkata')), 30)
+    assert data.index[0] == pd.Timestamp('2024-01-01 09:15', tz='Asia/Kolkata')
+    assert data.index.tz is not None
+
+
+@pytest.mark.parametrize('text, message', [
+    ("Date,Open,High,Close\n2024-01-01,1,1,1\n", 'Missing: Low'),
+    ("Date,Open,High,Low,Close\n", 'no valid data'),
+    ("Date,Open,High,Low,Close\n2024-01-01,x,1,1,1\n", 'Error'),
+])
+def test_errors(text, message):
+    data, error = load_csv_chunked(io.StringIO(text))
+    assert data is None and message in error
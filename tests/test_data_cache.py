@@ -0,0 +1,79 @@
+# test_data_cache.py - OHLCV cache trimming on calendar periods
+import pandas as pd
+import pytest
+from data_cache import OHLCVCache, period_start
+from shared_store import SharedStore
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return OHLCVCache(store=SharedStore(str(tmp_path / 'shared.sqlite')))
+
+
+def daily(ohlcv, end='2024-08-30'):
+    data = ohlcv(300, 1, freq='B')
+    data.index = pd.bdate_range(end=end, periods=300, tz='Asia/Kolkata')
+    return data
+
+
+@pytest.mark.parametrize('period, end, start', [
+    ('6mo', '2024-08-31', '2024-02-29'),    # Calendar months, clipped to the month end
+    ('1mo', '2024-03-31', '2024-02-29'),
+    ('1y', '2024-02-29', '2023-02-28'),
+    ('60d', '2024-03-01 15:30', '2024-01-01 15:30'),
+    ('2wk', '2024-03-15', '2024-03-01'),
+])
+def test_period_start_is_calendar_arithmetic(period, end, start):
+    assert period_start(period, pd.Timestamp(end)) == pd.Timestamp(start)
+
+
+def test_period_start_without_limit():
+    assert period_start('max', pd.Timestamp('2024-01-01')) is None
+
+
+def test_miss_and_hit_are_trimmed_the_same(cache, ohlcv):
+    data = daily(ohlcv)
+    fetch = lambda symbol, period=None, interval=None, start=None: data
+
+    missed = cache.get('A.NS', '6mo', '1d', fetch)
+    hit = cache.get('A.NS', '6mo', '1d', lambda *args, **kwargs: pytest.fail('fetched on a hit'))
+
+    assert missed.index[0] >= data.index[-1] - pd.DateOffset(months=6)
+    assert missed.index[-1] == data.index[-1]
+    pd.testing.assert_frame_equal(missed, hit, check_freq=False)
+
+
+def test_shorter_period_is_served_from_a_longer_one(cache, ohlcv):
+    data = daily(ohlcv)
+    cache.get('A.NS', '1y', '1d', lambda symbol, period=None, interval=None, start=None: data)
+    served = cache.get('A.NS', '3mo', '1d', lambda *args, **kwargs: pytest.fail('fetched a covered period'))
+    assert served.index[0] == data.index[data.index >= data.index[-1] - pd.DateOffset(months=3)][0]
+
+
+def test_batch_miss_is_trimmed(cache, ohlcv):
+    data = daily(ohlcv)
+    fetch_many = lambda symbols, period=None, interval=None, start=None: {symbol: data for symbol in symbols}
+    frames = cache.get_many(['A.NS', 'B.NS'], '6mo', '1d', fetch_many)
+    single = cache.get('A.NS', '6mo', '1d', lambda *args, **kwargs: pytest.fail('fetched on a hit'))
+    for frame in frames.values():
+        pd.testing.assert_frame_equal(frame, single, check_freq=False)
+
+
+def test_top_up_is_trimmed_like_a_hit(tmp_path, ohlcv):
+    cache = OHLCVCache(store=SharedStore(str(tmp_path / 'shared.sqlite')), ttl={'1d': 0})
+    data = daily(ohlcv)
+    old, new = data.iloc[:-5], data.iloc[-6:]
+    cache.get('A.NS', '6mo', '1d', lambda symbol, period=None, interval=None, start=None: old)
+
+    starts = []
+    def fetch(symbol, period=None, interval=None, start=None):
+        starts.append(start)
+        return new
+    topped = cache.get('A.NS', '6mo', '1d', fetch)
+
+    assert starts == [old.index[-1]]
+    assert topped.index[-1] == data.index[-1]
+    assert topped.index[0] == data.index[data.index >= data.index[-1] - pd.DateOffset(months=6)][0]
+    cache.ttl['1d'] = 3600
+    hit = cache.get('A.NS', '6mo', '1d', lambda *args, **kwargs: pytest.fail('fetched on a hit'))
+    pd.testing.assert_frame_equal(topped, hit, check_freq=False)
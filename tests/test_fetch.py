@@ -0,0 +1,168 @@
+# test_fetch.py - Watchlist downloads and concurrent fetches against stub data sources
+import threading
+import time
+import numpy as np
+import pandas as pd
+import pytest
+from screener import fetch_stocks_concurrently, download_stocks_batch, get_stocks_data
+
+
+def collect(stream):
+    """{index: (symbol, data)} from fetch_stocks_concurrently, checking each index comes once"""
+    results = {}
+    for index, symbol, data in stream:
+        assert index not in results
+        results[index] = (symbol, data)
+    return results
+
+
+def test_per_symbol_fetch_yields_every_index(ohlcv):
+    stocks = ['A', 'B', 'C', 'D', 'E']
+    frames = {symbol: ohlcv(80, i) for i, symbol in enumerate(stocks)}
+    results = collect(fetch_stocks_concurrently(stocks, '6mo', '1d', fetch=lambda s, period, interval: frames[s],
+                                                max_workers=3))
+    assert sorted(results) == list(range(len(stocks)))
+    assert all(results[i][1] is frames[symbol] for i, symbol in enumerate(stocks))
+
+
+def test_batches_are_chunked_and_bounded():
+    stocks = [f'S{i}' for i in range(23)]
+    calls = []
+    lock = threading.Lock()
+    in_flight = [0, 0]   # current, peak
+
+    def fetch_batch(symbols, period, interval):
+        with lock:
+            calls.append(list(symbols))
+            in_flight[0] += 1
+            in_flight[1] = max(in_flight[1], in_flight[0])
+        time.sleep(0.02)
+        with lock:
+            in_flight[0] -= 1
+        return {symbol: symbol.lower() for symbol in symbols}
+
+    results = collect(fetch_stocks_concurrently(stocks, '6mo', '1d', fetch_batch=fetch_batch, batch_size=5,
+                                                max_workers=2))
+    assert sorted(len(chunk) for chunk in calls) == [3, 5, 5, 5, 5]
+    assert in_flight[1] <= 2
+    assert {index: data for index, (_, data) in results.items()} == {i: s.lower() for i, s in enumerate(stocks)}
+
+
+def test_failed_chunk_yields_none():
+    def fetch_batch(symbols, period, interval):
+        if 'BAD' in symbols:
+            raise ConnectionError('reset by peer')
+        return {symbol: symbol for symbol in symbols}
+
+    results = collect(fetch_stocks_concurrently(['A', 'BAD', 'C', 'D'], '6mo', '1d', fetch_batch=fetch_batch,
+                                                batch_size=2))
+    assert [results[i][1] for i in range(4)] == [None, None, 'C', 'D']
+
+
+def test_timed_out_chunk_is_skipped_without_waiting():
+    release = threading.Event()
+
+    def fetch_batch(symbols, period, interval):
+        if 'SLOW' in symbols:
+            release.wait(30)
+        return {symbol: symbol for symbol in symbols}
+
+    started = time.monotonic()
+    try:
+        results = collect(fetch_stocks_concurrently(['A', 'SLOW', 'C', 'D'], '6mo', '1d', fetch_batch=fetch_batch,
+                                                    batch_size=2, max_workers=2, timeout=0.2))
+    finally:
+        release.set()
+    assert time.monotonic() - started < 5
+    assert [results[i][1] for i in range(4)] == [None, None, 'C', 'D']
+
+
+def yf_download(frames, calls=None):
+    """
+    yf.download stand-in returning what group_by='ticker' returns
+
+    Columns are (Ticker, Price), rows are the union of every ticker's bars.
+    Tickers mapped to None are left out, like a symbol yfinance could not find.
+    """
+    def download(tickers, **kwargs):
+        if calls is not None:
+            calls.append((list(tickers), kwargs))
+        found = {ticker: frames[ticker] for ticker in tickers if frames.get(ticker) is not None}
+        if not found:
+            return pd.DataFrame()
+        data = pd.concat(found, axis=1)
+        data.columns.names = ['Ticker', 'Price']
+        return data
+    return download
+
+
+def test_batch_unpacks_ticker_level(ohlcv):
+    a = ohlcv(120, 0, freq='D')
+    b = ohlcv(120, 1, freq='D').iloc[::2]   # Trades every other day: NaN rows once aligned with a
+    calls = []
+    results = download_stocks_batch(['A.NS', 'B.NS'], '6mo', '1d', download=yf_download({'A.NS': a, 'B.NS': b}, calls))
+
+    pd.testing.assert_frame_equal(results['A.NS'], a, check_freq=False)
+    pd.testing.assert_frame_equal(results['B.NS'], b, check_freq=False)
+    assert results['B.NS'].columns.name is None
+    (tickers, kwargs), = calls
+    assert tickers == ['A.NS', 'B.NS']
+    assert kwargs['group_by'] == 'ticker' and kwargs['period'] == '6mo' and 'start' not in kwargs
+
+
+def test_batch_top_up_passes_start(ohlcv):
+    calls = []
+    start = pd.Timestamp('2024-03-01')
+    download_stocks_batch(['A.NS'], '6mo', '1d', start=start, download=yf_download({'A.NS': ohlcv(5)}, calls))
+    (_, kwargs), = calls
+    assert kwargs['start'] == start and 'period' not in kwargs
+
+
+def test_single_symbol_batch(ohlcv):
+    a = ohlcv(50, 2, freq='D')
+    results = download_stocks_batch(['A.NS'], '6mo', '1d', download=yf_download({'A.NS': a}))
+    pd.testing.assert_frame_equal(results['A.NS'], a, check_freq=False)
+
+
+def test_single_symbol_flat_columns(ohlcv):
+    # yfinance versions that drop the ticker level for a single ticker
+    a = ohlcv(50, 3, freq='D')
+    results = download_stocks_batch(['A.NS'], '6mo', '1d', download=lambda tickers, **kwargs: a.copy())
+    pd.testing.assert_frame_equal(results['A.NS'], a, check_freq=False)
+
+
+def test_flat_columns_with_several_symbols_are_not_guessed(ohlcv):
+    a = ohlcv(50, 3, freq='D')
+    results = download_stocks_batch(['A.NS', 'B.NS'], '6mo', '1d', download=lambda tickers, **kwargs: a.copy())
+    assert results == {'A.NS': None, 'B.NS': None}
+
+
+def test_missing_ticker_is_none(ohlcv):
+    a = ohlcv(60, 4, freq='D')
+    nan = pd.DataFrame(np.nan, index=a.index, columns=a.columns)   # Listed but no bars
+    frames = {'A.NS': a, 'GONE.NS': None, 'HALTED.NS': nan}
+    results = download_stocks_batch(['A.NS', 'GONE.NS', 'HALTED.NS'], '6mo', '1d', download=yf_download(frames))
+    assert results['GONE.NS'] is None
+    assert results['HALTED.NS'] is None
+    pd.testing.assert_frame_equal(results['A.NS'], a, check_freq=False)
+
+
+@pytest.mark.parametrize('download', [
+    lambda tickers, **kwargs: pd.DataFrame(),
+    lambda tickers, **kwargs: None,
+    lambda tickers, **kwargs: (_ for _ in ()).throw(ConnectionError('timed out')),
+])
+def test_failed_batch_is_all_none(download):
+    assert download_stocks_batch(['A.NS', 'B.NS'], '6mo', '1d', download=download) == {'A.NS': None, 'B.NS': None}
+
+
+def test_watchlist_maps_back_to_symbols_as_given(ohlcv):
+    a = ohlcv(40, 5, freq='D')
+    calls = []
+    results = get_stocks_data(['RELIANCE', 'TCS.NS', '', 'RELIANCE', 'MISSING'], '6mo', '1d', use_cache=False,
+                              download=yf_download({'RELIANCE.NS': a, 'TCS.NS': a}, calls))
+
+    (tickers, _), = calls
+    assert tickers == ['RELIANCE.NS', 'TCS.NS', 'MISSING.NS']
+    assert results['RELIANCE'] is not None and results['TCS.NS'] is not None
+    assert results[''] is None and results['MISSING'] is None
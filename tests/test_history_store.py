@@ -0,0 +1,115 @@
+# test_history_store.py - Memory-mapped history: round trip, slicing and the directory swap
+import os
+import io
+import mmap
+import numpy as np
+import pandas as pd
+import pytest
+from history_store import HistoryStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return HistoryStore(str(tmp_path / 'history'))
+
+
+def minutes(ohlcv, bars=500, seed=0, tz='Asia/Kolkata'):
+    data = ohlcv(bars, seed, freq='min')
+    index = data.index.as_unit('ns')   # The store keeps nanoseconds
+    data.index = index.tz_localize(tz) if tz else index
+    return data
+
+
+def file_backed(values):
+    # Some array in the chain of bases is a view of a file mapping
+    while values is not None and not isinstance(values, mmap.mmap):
+        values = getattr(values, 'base', None)
+    return values is not None
+
+
+@pytest.mark.parametrize('tz', ['Asia/Kolkata', None])
+def test_round_trip_is_memory_mapped(store, ohlcv, tz):
+    data = minutes(ohlcv, tz=tz)
+    assert store.write('reliance', '1m', data) == len(data)
+
+    loaded = store.load('RELIANCE', '1m')
+    pd.testing.assert_frame_equal(loaded, data, check_freq=False, check_names=False)
+    assert str(loaded.index.tz) == str(tz) if tz else loaded.index.tz is None
+    for column in loaded.columns:
+        values = loaded[column].to_numpy()
+        assert file_backed(values), column
+        assert not values.flags.writeable
+
+
+def test_write_sorts_and_keeps_last_duplicate(store, ohlcv):
+    data = minutes(ohlcv, 50)
+    repeated = data.iloc[[10]].copy()
+    repeated['Close'] = -1.0
+    store.write('A', '1m', pd.concat([data.iloc[::-1], repeated]))
+
+    loaded = store.load('A', '1m')
+    assert loaded.index.is_monotonic_increasing and len(loaded) == 50
+    assert loaded['Close'].iloc[10] == -1.0
+
+
+def test_slices_are_inclusive_in_stored_timezone(store, ohlcv):
+    data = minutes(ohlcv)
+    store.write('A', '1m', data)
+
+    # Naive bounds are read in IST, aware ones converted
+    sliced = store.load('A', '1m', start='2024-01-01 10:00', end='2024-01-01 10:30')
+    assert sliced.index[0] == pd.Timestamp('2024-01-01 10:00', tz='Asia/Kolkata')
+    assert sliced.index[-1] == pd.Timestamp('2024-01-01 10:30', tz='Asia/Kolkata')
+    assert len(sliced) == 31
+    utc = store.load('A', '1m', start=pd.Timestamp('2024-01-01 04:30', tz='UTC'), end='2024-01-01 10:30')
+    pd.testing.assert_frame_equal(utc, sliced)
+
+    pd.testing.assert_frame_equal(store.load('A', '1m', end='2024-01-01 09:20'), data.iloc[:6], check_freq=False,
+                                  check_names=False)
+    assert store.load('A', '1m', start='2030-01-01').empty
+
+
+def test_rewrite_swaps_whole_directory(store, ohlcv):
+    old = minutes(ohlcv, 100, seed=1)
+    store.write('A', '1m', old)
+    reader = store.load('A', '1m')
+
+    new = minutes(ohlcv, 200, seed=2)
+    store.write('A', '1m', new)
+
+    # A reader holding the old memmaps still sees the old history, whole
+    pd.testing.assert_frame_equal(reader, old, check_freq=False, check_names=False)
+    pd.testing.assert_frame_equal(store.load('A', '1m'), new, check_freq=False, check_names=False)
+    # No temporary or replaced directories left next to it
+    assert os.listdir(os.path.join(store.root, 'A')) == ['1m']
+
+
+def test_import_csv_appends_with_new_values_winning(store, ohlcv):
+    data = minutes(ohlcv, 120)
+    first, second = data.iloc[:80], data.iloc[60:].copy()
+    second['Close'] += 1.0
+
+    def csv(frame):
+        return io.StringIO(frame.rename_axis('Date').reset_index().to_csv(index=False))
+
+    store.write('A', '1m', first)
+    assert store.import_csv(csv(second), 'A', '1m', append=True, chunk_rows=25) == 120
+
+    loaded = store.load('A', '1m')
+    # Through CSV text, so equal to the last digit or so
+    np.testing.assert_allclose(loaded['Close'].values[:60], data['Close'].values[:60], rtol=1e-12)
+    np.testing.assert_allclose(loaded['Close'].values[60:], data['Close'].values[60:] + 1.0, rtol=1e-12)
+    np.testing.assert_array_equal(loaded.index.asi8, data.index.asi8)
+    # CSV offsets parse as a fixed UTC+05:30 zone, the stored zone is kept
+    assert str(loaded.index.tz) == 'Asia/Kolkata'
+
+
+def test_missing_and_listing(store, ohlcv):
+    assert store.load('A', '1m') is None
+    assert store.available() == []
+    store.write('B', '5m', minutes(ohlcv, 10))
+    store.write('A', '1m', minutes(ohlcv, 20))
+    assert [(meta['symbol'], meta['interval'], meta['rows']) for meta in store.available()] == [
+        ('A', '1m', 20), ('B', '5m', 10)]
+    with pytest.raises(ValueError):
+        store.import_csv(io.StringIO('Date,Open\n2024-01-01,1\n'), 'C', '1m')
@@ -0,0 +1,45 @@
+# test_metrics.py - Annualization table and exposure
+import math
+import numpy as np
+import pytest
+import metrics
+from backtester import backtest_strategy, backtest_result_to_json
+from indicators import INDICATOR_NAMES
+from resampling import INTERVAL_MINUTES
+from screener import SCREEN_PERIODS
+
+
+@pytest.mark.parametrize('interval', sorted(set(INTERVAL_MINUTES) | set(SCREEN_PERIODS)))
+def test_every_screenable_interval_is_annualized(interval):
+    minutes = INTERVAL_MINUTES.get(interval)
+    expected = 252 if minutes is None else 252 * math.ceil(375 / minutes)   # Bars per 09:15-15:30 session
+    assert metrics.periods_per_year(interval) == expected
+
+
+def test_unknown_interval_raises():
+    with pytest.raises(ValueError, match='4h'):
+        metrics.periods_per_year('4h')
+    with pytest.raises(ValueError):
+        metrics.performance_summary([100.0, 101.0], [], [], [], [], 10, interval='4h')
+
+
+def test_exposure_counts_open_positions_to_the_end():
+    assert metrics.exposure([0, 10], [5, 12], 20) == pytest.approx(35.0)
+    assert metrics.exposure([0, 10], [5, 12], 20, [15], [19]) == pytest.approx(55.0)
+    assert metrics.exposure([], [], 0, [1], [5]) == 0.0
+
+
+def test_backtest_exposure_includes_position_open_at_the_end(ohlcv):
+    data = ohlcv(300, 0)
+    # Stops too wide to hit: the only trade never closes
+    result = backtest_strategy(data, dict.fromkeys(INDICATOR_NAMES, True), {'stop_loss': 2000, 'take_profit': 4000})
+    assert result['total_trades'] == 0
+    assert result['open_entry_index'] is not None
+    held = len(data) - 1 - result['open_entry_index']
+    assert result['exposure'] == round(held / (len(data) - 60) * 100, 2)
+    assert 'open_entry_index' not in backtest_result_to_json(result)
+
+
+def test_backtest_rejects_unknown_interval(ohlcv):
+    with pytest.raises(ValueError):
+        backtest_strategy(ohlcv(100), {'rsi': True}, {'interval': '4h'})
@@ -0,0 +1,145 @@
+# test_prescreen.py - Candle schedule and snapshot of the pre-screener, on a fake clock and data source
+import pandas as pd
+import pytest
+from prescreen import PreScreener, last_candle_close
+from indicators import merge_indicator_params
+from results_store import load_screen_results
+from screener import screen_multiple_stocks
+from shared_store import SharedStore
+
+INDICATORS = {'rsi': True, 'macd': True, 'volume': True}
+
+
+def ist(value):
+    return pd.Timestamp(value, tz='Asia/Kolkata')
+
+
+@pytest.mark.parametrize('now, interval, close', [
+    # Before the open: the previous session's last candle
+    ('2026-10-16 09:00', '5m', '2026-10-15 15:30'),
+    ('2026-10-16 09:17', '5m', '2026-10-15 15:30'),
+    ('2026-10-16 09:20', '5m', '2026-10-16 09:20'),
+    # Mid-session, on the 09:15 grid
+    ('2026-10-16 10:03', '5m', '2026-10-16 10:00'),
+    ('2026-10-16 12:44', '15m', '2026-10-16 12:30'),
+    ('2026-10-16 11:20', '1h', '2026-10-16 11:15'),
+    ('2026-10-16 15:29', '1h', '2026-10-16 15:15'),
+    # The 15:30 close ends every interval's last candle
+    ('2026-10-16 15:30', '5m', '2026-10-16 15:30'),
+    ('2026-10-16 15:30', '1h', '2026-10-16 15:30'),
+    ('2026-10-16 18:00', '15m', '2026-10-16 15:30'),
+    ('2026-10-16 12:00', '1d', '2026-10-15 15:30'),
+    ('2026-10-16 15:30', '1d', '2026-10-16 15:30'),
+    # Weekends and Monday morning fall back to Friday
+    ('2026-10-17 12:00', '5m', '2026-10-16 15:30'),
+    ('2026-10-18 12:00', '1d', '2026-10-16 15:30'),
+    ('2026-10-19 09:10', '5m', '2026-10-16 15:30'),
+    ('2026-10-19 12:00', '1d', '2026-10-16 15:30'),
+])
+def test_last_candle_close(now, interval, close):
+    assert last_candle_close(ist(now), interval) == ist(close)
+
+
+def test_last_candle_close_converts_to_ist():
+    assert last_candle_close(pd.Timestamp('2026-10-16 04:35', tz='UTC'), '5m') == ist('2026-10-16 10:05')
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = ist(now)
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, **kwargs):
+        self.now += pd.Timedelta(**kwargs)
+
+
+@pytest.fixture
+def universe(ohlcv):
+    return {f'S{i}': ohlcv(300, i, freq='5min') for i in range(6)}
+
+
+@pytest.fixture
+def fetch(universe):
+    def fetch(symbol, period=None, interval=None):
+        fetch.calls += 1
+        return universe.get(symbol)
+    fetch.calls = 0
+    return fetch
+
+
+@pytest.fixture
+def prescreener(tmp_path, universe, fetch):
+    screener = PreScreener(clock=FakeClock('2026-10-16 10:00:15'), fetch=fetch,
+                           store=SharedStore(str(tmp_path / 'shared.sqlite')), delay_seconds=10)
+    screener.configure([{'stocks': list(universe), 'timeframes': ['5m', '15m'], 'indicators': INDICATORS}])
+    return screener
+
+
+def test_run_due_runs_each_closed_candle_once(prescreener, fetch, universe):
+    names = [screen['name'] for screen in prescreener.screens]
+    assert prescreener.run_due() == names
+    calls = fetch.calls
+    assert calls == 2 * len(universe)
+
+    # Same candle: nothing runs, nothing is fetched
+    assert prescreener.run_due() == []
+    assert fetch.calls == calls
+
+    # 10:05:05 is inside the publish delay of the 10:05 candle
+    prescreener.clock.advance(minutes=4, seconds=50)
+    assert prescreener.run_due() == []
+
+    # 10:05:15: only the 5m screen has a new candle
+    prescreener.clock.advance(seconds=10)
+    assert prescreener.run_due() == [names[0]]
+    assert fetch.calls == calls + len(universe)
+
+
+def test_run_due_force_reruns_unchanged_candle(prescreener):
+    prescreener.run_due()
+    assert len(prescreener.run_due(force=True)) == 2
+
+
+def test_lookup_filters_a_subset(prescreener, fetch):
+    prescreener.run_due()
+    params = merge_indicator_params()
+    snapshot = prescreener.lookup(['S3', 'S1'], '5m', INDICATORS, params)
+
+    expected = screen_multiple_stocks(['S3', 'S1'], INDICATORS, '5m', fetch=fetch,
+                                      use_signal_cache=False, indicator_params=params)
+    assert [result['symbol'] for result in snapshot['results']] == [result['symbol'] for result in expected]
+    assert snapshot['candle'] == str(ist('2026-10-16 10:00'))
+    assert snapshot['age_seconds'] == 0
+    assert [result['symbol'] for result in load_screen_results(snapshot['result_id'])] == \
+        [result['symbol'] for result in snapshot['results']]
+
+
+def test_lookup_misses(prescreener):
+    params = merge_indicator_params()
+    assert prescreener.lookup(['S1'], '5m', INDICATORS, params) is None         # Not run yet
+    prescreener.run_due()
+    assert prescreener.lookup(['S1', 'XX'], '5m', INDICATORS, params) is None   # Outside the watchlist
+    assert prescreener.lookup(['S1'], '1h', INDICATORS, params) is None         # Not a configured timeframe
+    assert prescreener.lookup(['S1'], '5m', {'rsi': True}, params) is None      # Other indicators
+    assert prescreener.lookup(['S1'], '5m', INDICATORS,
+                              merge_indicator_params({'rsi': {'timeperiod': 7}})) is None
+
+
+def test_lookup_ignores_disabled_indicators(prescreener):
+    prescreener.run_due()
+    snapshot = prescreener.lookup(['S2'], '15m', dict(INDICATORS, cci=False), merge_indicator_params())
+    assert [result['symbol'] for result in snapshot['results']] == ['S2']
+
+
+def test_other_process_serves_published_snapshot(prescreener, fetch):
+    prescreener.run_due()
+    follower = PreScreener(clock=prescreener.clock, fetch=fetch, store=prescreener.store)
+    follower.configure([{'stocks': prescreener.screens[0]['stocks'], 'timeframes': ['5m'], 'indicators': INDICATORS}])
+    calls = fetch.calls
+
+    snapshot = follower.lookup(['S1'], '5m', INDICATORS, merge_indicator_params())
+    assert [result['symbol'] for result in snapshot['results']] == ['S1']
+    assert follower.run_due() == []     # Candle already screened by the runner
+    assert fetch.calls == calls
@@ -0,0 +1,128 @@
+# test_resampling.py - Session-anchored OHLCV resampling against pandas' own resample
+import numpy as np
+import pandas as pd
+import pytest
+from resampling import resample_ohlcv, finest_interval, SESSION_TZ
+
+AGGREGATES = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}
+
+
+def session_bars(days=('2024-01-01', '2024-01-02'), freq='min', seed=0):
+    """Naive IST bars covering 09:15-15:29 on each day, with random prices and volumes"""
+    index = pd.DatetimeIndex(np.concatenate([
+        pd.date_range(f'{day} 09:15', f'{day} 15:29', freq=freq).values for day in days
+    ]))
+    rng = np.random.default_rng(seed)
+    close = 100 + rng.normal(0, 0.5, len(index)).cumsum()
+    open_ = close + rng.normal(0, 0.2, len(index))
+    return pd.DataFrame({
+        'Open': open_,
+        'High': np.maximum(open_, close) + rng.uniform(0, 0.5, len(index)),
+        'Low': np.minimum(open_, close) - rng.uniform(0, 0.5, len(index)),
+        'Close': close,
+        'Volume': rng.integers(100, 10_000, len(index)).astype(float),
+    }, index=index)
+
+
+def reference(data, interval):
+    """pandas resample anchored at 09:15 (every intraday step divides a day), dropping empty buckets"""
+    if interval == '1d':
+        result = data.resample('1D').agg(AGGREGATES)
+    else:
+        result = data.resample(f'{int(interval[:-1])}min', origin='start_day', offset='9h15min').agg(AGGREGATES)
+    result = result.dropna(subset=['Open'])
+    result.index = result.index.as_unit('ns')
+    return result
+
+
+@pytest.mark.parametrize('interval', ['5m', '15m', '30m', '60m', '90m', '1d'])
+def test_matches_pandas_resample(interval):
+    data = session_bars()
+    pd.testing.assert_frame_equal(resample_ohlcv(data, interval), reference(data, interval), check_freq=False)
+
+
+def test_hourly_buckets_anchor_on_session_open():
+    result = resample_ohlcv(session_bars(days=('2024-01-01',)), '60m')
+    assert [t.strftime('%H:%M') for t in result.index] == ['09:15', '10:15', '11:15', '12:15', '13:15', '14:15', '15:15']
+
+
+def test_last_bucket_stops_at_session_close():
+    data = session_bars()
+    result = resample_ohlcv(data, '60m')
+    # 15:15 holds only the session's last 15 minutes, and never takes the next morning's bars
+    closing = data.loc['2024-01-01 15:15':'2024-01-01 15:29']
+    last = result.loc[pd.Timestamp('2024-01-01 15:15')]
+    assert last['Volume'] == closing['Volume'].sum()
+    assert last['Close'] == closing['Close'].iloc[-1]
+    assert result.index[7] == pd.Timestamp('2024-01-02 09:15')
+    assert result.loc[pd.Timestamp('2024-01-02 09:15'), 'Open'] == data.loc['2024-01-02 09:15', 'Open']
+
+
+def test_partial_last_bucket():
+    data = session_bars(days=('2024-01-01',)).loc[:'2024-01-01 10:37']
+    result = resample_ohlcv(data, '60m')
+    assert list(result.index) == [pd.Timestamp('2024-01-01 09:15'), pd.Timestamp('2024-01-01 10:15')]
+    tail = data.loc['2024-01-01 10:15':]
+    assert len(tail) == 23
+    assert result['Close'].iloc[-1] == tail['Close'].iloc[-1]
+    assert result['High'].iloc[-1] == tail['High'].max()
+    assert result['Volume'].iloc[-1] == tail['Volume'].sum()
+
+
+def test_gaps_leave_no_empty_bars():
+    data = session_bars()
+    missing = (data.index.strftime('%H:%M') >= '11:15') & (data.index.strftime('%H:%M') < '12:15')
+    data = data[~missing & ~((data.index.minute % 7) == 3)]   # A missing hour plus scattered missing minutes
+    result = resample_ohlcv(data, '60m')
+
+    assert pd.Timestamp('2024-01-01 11:15') not in result.index
+    assert len(result) == 12
+    assert not result.isna().any().any()
+    pd.testing.assert_frame_equal(result, reference(data, '60m'), check_freq=False)
+
+
+def test_bucket_keeps_first_bar_even_off_the_step():
+    # Bars that start mid-bucket (late listing, feed gap) still land in the 09:15-anchored bucket
+    data = session_bars(days=('2024-01-01',)).loc['2024-01-01 09:42':]
+    result = resample_ohlcv(data, '30m')
+    assert result.index[0] == pd.Timestamp('2024-01-01 09:15')
+    assert result['Open'].iloc[0] == data['Open'].iloc[0]
+
+
+def test_tz_aware_input_buckets_on_ist_session():
+    ist = session_bars()
+    utc = ist.tz_localize(SESSION_TZ).tz_convert('UTC')
+    result = resample_ohlcv(utc, '60m')
+
+    assert str(result.index.tz) == 'UTC'
+    assert result.index[0] == pd.Timestamp('2024-01-01 03:45', tz='UTC')   # 09:15 IST
+    expected = resample_ohlcv(ist, '60m')
+    expected.index = expected.index.tz_localize(SESSION_TZ).tz_convert('UTC')
+    pd.testing.assert_frame_equal(result, expected, check_freq=False, check_index_type=False)
+
+
+def test_daily_buckets_follow_ist_dates():
+    # Each session folds into its own IST day, stamped at IST midnight (the previous UTC evening)
+    ist = session_bars(days=('2024-01-01', '2024-01-02', '2024-01-03'))
+    utc = ist.tz_localize(SESSION_TZ).tz_convert('UTC')
+    result = resample_ohlcv(utc, '1d')
+    assert len(result) == 3
+    assert list(result.index.tz_convert(SESSION_TZ).strftime('%Y-%m-%d %H:%M')) == [
+        '2024-01-01 00:00', '2024-01-02 00:00', '2024-01-03 00:00'
+    ]
+    assert list(result['Volume']) == [ist.loc[day, 'Volume'].sum() for day in ('2024-01-01', '2024-01-02', '2024-01-03')]
+
+
+def test_empty_and_none_pass_through():
+    assert resample_ohlcv(None, '60m') is None
+    empty = session_bars().iloc[:0]
+    assert resample_ohlcv(empty, '60m') is empty
+
+
+def test_finest_interval():
+    assert finest_interval(['60m', '15m', '1d']) == '15m'
+    assert finest_interval(['1d']) == '1d'
+    with pytest.raises(ValueError):
+        finest_interval(['60m', '7m'])
+    with pytest.raises(ValueError):
+        finest_interval(['60m', '90m'])   # 90m isn't a whole number of hours
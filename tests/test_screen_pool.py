@@ -0,0 +1,95 @@
+# test_screen_pool.py - Process-pool screen: shared block, pool reuse and recovery
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from concurrent.futures.process import BrokenProcessPool
+import screen_pool
+from indicators import INDICATOR_NAMES
+from instrumentation import perf_metrics
+from screener import stack_frames, stack_layout, screen_cross_section
+
+SELECTED = dict.fromkeys(INDICATOR_NAMES, True)
+
+
+@pytest.fixture
+def frames(ohlcv):
+    rng = np.random.default_rng(1)
+    return {f'S{i}': ohlcv(int(bars), i) for i, bars in enumerate(rng.integers(50, 300, 24))}
+
+
+@pytest.fixture
+def pool():
+    yield
+    screen_pool.shutdown_pool()
+
+
+def test_stack_frames_fills_given_block(frames):
+    symbols, bars = stack_layout(frames)
+    expected_symbols, expected = stack_frames(frames)
+    out = np.full((4, len(symbols), bars), -1.0)
+    stacked_symbols, arrays = stack_frames(frames, out=out)
+
+    assert stacked_symbols == symbols == expected_symbols
+    for column, matrix in arrays.items():
+        assert np.shares_memory(matrix, out)
+        np.testing.assert_array_equal(matrix, expected[column])   # Padding overwritten with NaN too
+    with pytest.raises(ValueError):
+        stack_frames(frames, out=np.empty((4, len(symbols), bars + 1)))
+
+
+def test_pool_screen_matches_in_process_screen(frames, pool):
+    expected = screen_cross_section(frames, SELECTED)
+    first = screen_pool.screen_parallel(frames, SELECTED, workers=2, chunk_size=5, min_symbols=0)
+    started = screen_pool._pool
+    second = screen_pool.screen_parallel(frames, SELECTED, workers=2, min_symbols=0)
+
+    pd.testing.assert_frame_equal(first, expected)
+    pd.testing.assert_frame_equal(second, expected)
+    assert screen_pool._pool is started   # Kept for the next screen
+    assert screen_pool.get_pool(3) is not started
+
+
+def test_broken_pool_is_restarted(frames, pool):
+    # A worker dying breaks the whole executor
+    broken = screen_pool.get_pool(2)
+    with pytest.raises(BrokenProcessPool):
+        broken.submit(os._exit, 1).result()
+    restarts = perf_metrics.counters.get('pool_restarts', 0)
+
+    results = screen_pool.screen_parallel(frames, SELECTED, workers=2, min_symbols=0)
+    pd.testing.assert_frame_equal(results, screen_cross_section(frames, SELECTED))
+    assert perf_metrics.counters['pool_restarts'] == restarts + 1
+    assert screen_pool._pool is not broken
+
+
+def test_falls_back_in_process_when_pool_keeps_breaking(monkeypatch, frames):
+    calls = []
+
+    def broken(*args):
+        calls.append(args)
+        raise BrokenProcessPool('worker died')
+
+    monkeypatch.setattr(screen_pool, '_latest_on_pool', broken)
+    results = screen_pool.screen_parallel(frames, SELECTED, workers=2, min_symbols=0)
+    pd.testing.assert_frame_equal(results, screen_cross_section(frames, SELECTED))
+    assert len(calls) == 2
+    # The shared block is gone once the screen returns
+    name = calls[0][1]
+    with pytest.raises(FileNotFoundError):
+        screen_pool.shared_memory.SharedMemory(name=name)
+
+
+def test_other_errors_propagate(monkeypatch, frames):
+    def failing(*args):
+        raise ValueError('bad params')
+
+    monkeypatch.setattr(screen_pool, '_latest_on_pool', failing)
+    with pytest.raises(ValueError):
+        screen_pool.screen_parallel(frames, SELECTED, workers=2, min_symbols=0)
+
+
+def test_small_universe_stays_in_process(monkeypatch, frames):
+    monkeypatch.setattr(screen_pool, 'get_pool', lambda workers: pytest.fail('pool started'))
+    pd.testing.assert_frame_equal(screen_pool.screen_parallel(frames, SELECTED, workers=4, min_symbols=100),
+                                  screen_cross_section(frames, SELECTED))
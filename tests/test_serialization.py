@@ -0,0 +1,32 @@
+# test_serialization.py - JSON fallback matches orjson output
+import json
+import numpy as np
+import pytest
+import serialization
+
+
+PAYLOAD = {
+    'nan': float('nan'),
+    'values': [1.5, np.float64('nan'), np.inf, -np.inf],
+    'array': np.array([1.0, np.nan]),
+    'matrix': np.array([[1, 2], [3, 4]]),
+    'scalars': {'int': np.int64(3), 'float': np.float32(0.5), 'bool': np.bool_(True)},
+    'nested': {'tuple': (1, None, 'text', True)}
+}
+
+
+def test_fallback_writes_null_for_nan(monkeypatch):
+    monkeypatch.setattr(serialization, 'orjson', None)
+    encoded = serialization.dumps(PAYLOAD)
+    assert b'NaN' not in encoded and b'Infinity' not in encoded
+    decoded = json.loads(encoded)
+    assert decoded['nan'] is None
+    assert decoded['values'] == [1.5, None, None, None]
+    assert decoded['array'] == [1.0, None]
+
+
+@pytest.mark.skipif(serialization.orjson is None, reason='orjson not installed')
+def test_fallback_matches_orjson(monkeypatch):
+    expected = serialization.dumps(PAYLOAD)
+    monkeypatch.setattr(serialization, 'orjson', None)
+    assert serialization.dumps(PAYLOAD) == expected
@@ -0,0 +1,57 @@
+# test_signal_cache.py - Screen results shared between workers through the store
+import json
+import numpy as np
+import pytest
+from shared_store import SharedStore
+from signal_cache import SignalCache
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SharedStore(str(tmp_path / 'shared.sqlite'))
+
+
+def compute_once(result):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return result
+    return compute, calls
+
+
+def test_result_round_trips_through_shared_tier(store, ohlcv):
+    data = ohlcv(50)
+    result = {'symbol': 'A', 'signal': 'BUY', 'confidence': 66.7, 'price': np.float64(101.25),
+              'buy_signals': 4, 'rsi': np.float64(61.5), 'mfi': float('nan'), 'volume_ratio': None}
+    writer, reader = SignalCache(store=store), SignalCache(store=store)   # Two workers
+
+    compute, calls = compute_once(result)
+    assert writer.get_or_compute('A', '1h', {'rsi': True}, data, compute) == result
+    # Stored as plain JSON, never pickled
+    key = '|'.join(writer.key('A', '1h', {'rsi': True}, data.index[-1]))
+    assert json.loads(store.get(SignalCache.namespace, key)['value'])['signal'] == 'BUY'
+
+    compute, calls = compute_once(None)
+    shared = reader.get_or_compute('A', '1h', {'rsi': True}, data, compute)
+    assert calls == []
+    assert reader.stats()['shared_hits'] == 1
+    assert shared == dict(result, mfi=None)   # NaN comes back as null, as in the API response
+
+
+def test_none_result_is_shared(store, ohlcv):
+    data = ohlcv(50)
+    compute, _ = compute_once(None)
+    assert SignalCache(store=store).get_or_compute('A', '1h', None, data, compute) is None
+    compute, calls = compute_once({'signal': 'SELL'})
+    assert SignalCache(store=store).get_or_compute('A', '1h', None, data, compute) is None
+    assert calls == []
+
+
+def test_other_params_are_not_shared(store, ohlcv):
+    data = ohlcv(50)
+    compute, _ = compute_once({'signal': 'BUY'})
+    SignalCache(store=store).get_or_compute('A', '1h', None, data, compute)
+    compute, calls = compute_once({'signal': 'SELL'})
+    result = SignalCache(store=store).get_or_compute('A', '1h', None, data, compute, {'rsi': {'period': 7}})
+    assert result == {'signal': 'SELL'} and calls == [1]
@@ -0,0 +1,181 @@
+# test_simulator.py - simulate_trades against the original per-bar backtest loop
+import numpy as np
+import pytest
+import simulator
+from simulator import simulate_trades, TRADE_COLUMNS
+
+
+PARAMS = [
+    # initial_capital, risk_per_trade, stop_loss, take_profit, tick_size, commission, slippage
+    (100000.0, 2.0, 20.0, 40.0, 0.05, 20.0, 1.0),
+    (100000.0, 2.0, 200.0, 400.0, 0.05, 20.0, 0.0),
+    (50000.0, 1.0, 5.0, 7.0, 0.05, 0.0, 1.0),
+    (100000.0, 2.0, 0.0, 40.0, 0.05, 20.0, 1.0),     # No stop: fixed 10% sizing
+]
+
+REASONS = {'SL': 0, 'TP': 1, 'Signal': 2}
+
+
+def reference_trades(data, signals, start, trade_signals, initial_capital, risk_per_trade,
+                     stop_loss_ticks, take_profit_ticks, tick_size, commission, slippage_ticks):
+    """
+    The position loop of the original backtest_strategy, bar by bar over .iloc
+
+    Kept as it was apart from reading the signal from `signals` instead of
+    the indicator vote, and recording unrounded values and bar indexes.
+    """
+    capital = initial_capital
+    position = None
+    entry_price = entry_index = stop_loss_price = take_profit_price = position_size = 0
+    trades = []
+    equity = []
+
+    def close_trade(i, side, exit_price, reason):
+        nonlocal capital, position
+        if side == 'LONG':
+            profit_amount = (exit_price - entry_price) * position_size - (commission * 2)
+        else:
+            profit_amount = (entry_price - exit_price) * position_size - (commission * 2)
+        capital += profit_amount
+        trades.append([entry_index, i, 1 if side == 'LONG' else -1, entry_price, stop_loss_price,
+                       take_profit_price, exit_price, REASONS[reason], profit_amount, capital - initial_capital])
+        position = None
+
+    for i in range(start, len(data)):
+        current_high = data['High'].iloc[i]
+        current_low = data['Low'].iloc[i]
+        current_close = data['Close'].iloc[i]
+
+        if position == 'LONG':
+            if current_low <= stop_loss_price:
+                close_trade(i, 'LONG', stop_loss_price, 'SL')
+                continue
+            if current_high >= take_profit_price:
+                close_trade(i, 'LONG', take_profit_price, 'TP')
+                continue
+        elif position == 'SHORT':
+            if current_high >= stop_loss_price:
+                close_trade(i, 'SHORT', stop_loss_price, 'SL')
+                continue
+            if current_low <= take_profit_price:
+                close_trade(i, 'SHORT', take_profit_price, 'TP')
+                continue
+
+        if not trade_signals:
+            continue
+        signal = {1: 'BUY', -1: 'SELL'}.get(int(signals[i]), 'NEUTRAL')
+
+        if position is None:
+            if signal == 'BUY':
+                entry_price = current_close + (slippage_ticks * tick_size)
+                stop_loss_price = entry_price - (stop_loss_ticks * tick_size)
+                take_profit_price = entry_price + (take_profit_ticks * tick_size)
+                risk_amount = capital * (risk_per_trade / 100)
+                risk_per_share = entry_price - stop_loss_price
+                if risk_per_share > 0:
+                    position_size = int(risk_amount / risk_per_share)
+                else:
+                    position_size = int((capital * 0.1) / entry_price)
+                if position_size > 0:
+                    position = 'LONG'
+                    entry_index = i
+            elif signal == 'SELL':
+                entry_price = current_close - (slippage_ticks * tick_size)
+                stop_loss_price = entry_price + (stop_loss_ticks * tick_size)
+                take_profit_price = entry_price - (take_profit_ticks * tick_size)
+                risk_amount = capital * (risk_per_trade / 100)
+                risk_per_share = stop_loss_price - entry_price
+                if risk_per_share > 0:
+                    position_size = int(risk_amount / risk_per_share)
+                else:
+                    position_size = int((capital * 0.1) / entry_price)
+                if position_size > 0:
+                    position = 'SHORT'
+                    entry_index = i
+        elif position == 'LONG' and signal == 'SELL':
+            close_trade(i, 'LONG', current_close - (slippage_ticks * tick_size), 'Signal')
+        elif position == 'SHORT' and signal == 'BUY':
+            close_trade(i, 'SHORT', current_close + (slippage_ticks * tick_size), 'Signal')
+
+        current_equity = capital
+        if position == 'LONG':
+            current_equity = capital + ((current_close - entry_price) * position_size)
+        elif position == 'SHORT':
+            current_equity = capital + ((entry_price - current_close) * position_size)
+        equity.append((i, current_equity))
+
+    return np.array(trades, dtype=np.float64).reshape(-1, len(TRADE_COLUMNS)), equity, capital
+
+
+def random_signals(bars, seed):
+    # Mostly neutral, with runs of entries and exits
+    rng = np.random.default_rng(seed)
+    return rng.choice(np.array([-1, 0, 1], dtype=np.int8), size=bars, p=[0.1, 0.8, 0.1])
+
+
+def run(data, signals, params, trade_signals=True, chunk_size=simulator.SIMULATION_CHUNK):
+    return simulate_trades(data['High'].values, data['Low'].values, data['Close'].values, signals,
+                           60, trade_signals, *params, chunk_size=chunk_size)
+
+
+def assert_matches_reference(data, signals, params, trade_signals=True, chunk_size=simulator.SIMULATION_CHUNK):
+    expected, equity, capital = reference_trades(data, signals, 60, trade_signals, *params)
+    trades, equity_index, equity_values, final_capital, _ = run(data, signals, params, trade_signals, chunk_size)
+
+    assert len(expected) > 0 or not trade_signals
+    # Exactly equal, not approximately: same operations in the same order
+    np.testing.assert_array_equal(trades, expected)
+    np.testing.assert_array_equal(equity_index, [i for i, _ in equity])
+    np.testing.assert_array_equal(equity_values, [value for _, value in equity])
+    assert final_capital == capital
+
+
+@pytest.mark.parametrize('params', PARAMS)
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_python_kernel_matches_reference(monkeypatch, ohlcv, params, seed):
+    monkeypatch.setattr(simulator, 'NUMBA_AVAILABLE', False)
+    data = ohlcv(600, seed)
+    assert_matches_reference(data, random_signals(len(data), seed), params)
+
+
+@pytest.mark.skipif(not simulator.NUMBA_AVAILABLE, reason='numba not installed')
+@pytest.mark.parametrize('params', PARAMS)
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_numba_kernel_matches_reference(ohlcv, params, seed):
+    data = ohlcv(600, seed)
+    assert_matches_reference(data, random_signals(len(data), seed), params)
+
+
+@pytest.mark.parametrize('numba', [False, True])
+def test_chunked_run_matches_reference(monkeypatch, ohlcv, numba):
+    if numba and not simulator.NUMBA_AVAILABLE:
+        pytest.skip('numba not installed')
+    monkeypatch.setattr(simulator, 'NUMBA_AVAILABLE', numba)
+    data = ohlcv(1000, 7)
+    # Positions stay open across chunk boundaries
+    assert_matches_reference(data, random_signals(len(data), 7), PARAMS[1], chunk_size=37)
+
+
+@pytest.mark.parametrize('numba', [False, True])
+def test_no_trade_signals_only_marks_equity(monkeypatch, ohlcv, numba):
+    if numba and not simulator.NUMBA_AVAILABLE:
+        pytest.skip('numba not installed')
+    monkeypatch.setattr(simulator, 'NUMBA_AVAILABLE', numba)
+    data = ohlcv(200, 3)
+    trades, equity_index, _, capital, open_trade = run(data, random_signals(len(data), 3), PARAMS[0],
+                                                       trade_signals=False)
+    assert trades.shape == (0, len(TRADE_COLUMNS))
+    assert len(equity_index) == 0
+    assert capital == PARAMS[0][0]
+    assert open_trade[0] == 0
+
+
+@pytest.mark.skipif(not simulator.NUMBA_AVAILABLE, reason='numba not installed')
+def test_numba_and_python_kernels_agree(monkeypatch, ohlcv):
+    data = ohlcv(2000, 11)
+    signals = random_signals(len(data), 11)
+    compiled = run(data, signals, PARAMS[0])
+    monkeypatch.setattr(simulator, 'NUMBA_AVAILABLE', False)
+    python = run(data, signals, PARAMS[0])
+    for a, b in zip(compiled, python):
+        np.testing.assert_array_equal(a, b)
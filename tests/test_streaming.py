@@ -0,0 +1,62 @@
+# test_streaming.py - Incremental indicators against TA-Lib on the full history
+import numpy as np
+import pytest
+from indicators import merge_indicator_params
+from screener import calculate_indicator_series, generate_advanced_signal
+from streaming import StreamingIndicators
+
+
+CUSTOM_PARAMS = {
+    'rsi': {'timeperiod': 9, 'oversold': 35, 'overbought': 65},
+    'macd': {'fastperiod': 8, 'slowperiod': 21, 'signalperiod': 5},
+    'bollinger': {'timeperiod': 14, 'nbdev': 1.5},
+    'stochastic': {'fastk_period': 9, 'slowk_period': 4, 'slowd_period': 2},
+    'adx': {'timeperiod': 10, 'sma_period': 30},
+    'volume': {'window': 10, 'sma_period': 15},
+    'cci': {'timeperiod': 20},
+    'willr': {'timeperiod': 10},
+    'mfi': {'timeperiod': 10},
+    'atr': {'timeperiod': 7}
+}
+
+
+def replay(data, params):
+    """{key: array} of the streaming values after every bar"""
+    state = StreamingIndicators(params)
+    rows = [dict(state.update(*bar)) for bar in
+            zip(data['High'].values, data['Low'].values, data['Close'].values, data['Volume'].values)]
+    return {key: np.array([row[key] for row in rows]) for key in rows[0]}
+
+
+@pytest.mark.parametrize('overrides', [None, CUSTOM_PARAMS])
+@pytest.mark.parametrize('volume', [True, False])
+def test_streaming_matches_full_history_series(ohlcv, overrides, volume):
+    params = merge_indicator_params(overrides)
+    data = ohlcv(400, 5, volume=volume)
+    streamed = replay(data, params)
+    expected = calculate_indicator_series(data, list(streamed), params)
+
+    # The SMAs the ADX and Volume votes read, at their configured periods
+    assert {f"sma_{params['adx']['sma_period']}", f"sma_{params['volume']['sma_period']}"} <= set(streamed)
+    for key, values in streamed.items():
+        # Same warm-up: NaN exactly where TA-Lib has no value yet
+        np.testing.assert_array_equal(np.isnan(values), np.isnan(expected[key]), err_msg=key)
+        np.testing.assert_allclose(values, expected[key], rtol=1e-9, atol=1e-9, equal_nan=True, err_msg=key)
+
+
+@pytest.mark.parametrize('overrides', [None, CUSTOM_PARAMS])
+def test_streaming_signal_matches_screen(ohlcv, overrides):
+    params = merge_indicator_params(overrides)
+    selected = dict.fromkeys(['rsi', 'macd', 'bollinger', 'stochastic', 'adx', 'volume', 'cci', 'willr', 'mfi'],
+                             True)
+    data = ohlcv(300, 8)
+    state = StreamingIndicators.from_frame(data.iloc[:-40], params)
+    for i in range(len(data) - 40, len(data)):
+        bar = data.iloc[i]
+        state.update(bar['High'], bar['Low'], bar['Close'], bar['Volume'])
+        expected = generate_advanced_signal('A', selected, data.iloc[:i + 1], params)
+        assert state.signal('A', selected) == pytest.approx(expected)
+
+
+def test_no_signal_before_60_bars(ohlcv):
+    assert StreamingIndicators.from_frame(ohlcv(59)).signal('A', {'rsi': True}) is None
@@ -0,0 +1,23 @@
+# test_sweep.py - Parameter sweeps run in the request thread
+import sys
+import sweep
+import backtester
+import instrumentation
+
+
+def test_in_process_sweep_leaves_stdout_alone(monkeypatch, ohlcv, capsys):
+    # Other request threads keep printing while a one-worker sweep runs
+    seen = []
+
+    def backtest(*args, **kwargs):
+        seen.append(sys.stdout)
+        return backtester.backtest_strategy(*args, **kwargs)
+
+    monkeypatch.setattr(sweep, 'backtest_strategy', backtest)
+    monkeypatch.setattr(instrumentation, '_log_level', instrumentation.LOG_LEVELS['info'])
+    stdout = sys.stdout
+    result = sweep.run_parameter_sweep(ohlcv(300, 1), {'stop_loss': [10, 20]}, [['rsi', 'macd']], workers=1)
+    assert result['total_runs'] == 2
+    assert seen == [stdout, stdout]
+    # Per-run summaries are debug lines, only the sweep progress prints at info
+    assert 'Backtest Complete' not in capsys.readouterr().out
@@ -0,0 +1,148 @@
+# test_votes.py - Vectorized indicator vote against the original per-bar vote
+import numpy as np
+import pytest
+from conftest import synthetic_ohlcv
+from indicators import INDICATOR_NAMES, required_series
+from screener import (calculate_advanced_indicators, calculate_indicator_series, count_indicator_votes,
+                      generate_advanced_signal)
+
+
+SUBSETS = [
+    INDICATOR_NAMES,
+    ['rsi'],
+    ['macd', 'bollinger', 'stochastic'],
+    ['adx', 'volume'],
+    ['cci', 'willr', 'mfi'],
+    ['rsi', 'volume', 'mfi'],
+    ['bollinger', 'adx', 'willr', 'mfi'],
+]
+
+
+def reference_votes(ind, current_close, selected_indicators, has_volume):
+    """
+    The vote of the original per-bar backtest loop, on one bar's indicator dict
+
+    Kept as it was apart from returning the counts instead of acting on them.
+    """
+    buy_signals = 0
+    sell_signals = 0
+    neutral_signals = 0
+    active_count = sum(selected_indicators.values())
+
+    if selected_indicators.get('rsi', False):
+        if ind['rsi'] < 30:
+            buy_signals += 1
+        elif ind['rsi'] > 70:
+            sell_signals += 1
+        else:
+            neutral_signals += 1
+
+    if selected_indicators.get('macd', False):
+        if ind['macd'] > ind['macd_signal'] and ind['macd_histogram'] > 0:
+            buy_signals += 1
+        elif ind['macd'] < ind['macd_signal'] and ind['macd_histogram'] < 0:
+            sell_signals += 1
+        else:
+            neutral_signals += 1
+
+    if selected_indicators.get('bollinger', False):
+        if current_close < ind['bb_lower']:
+            buy_signals += 1
+        elif current_close > ind['bb_upper']:
+            sell_signals += 1
+        else:
+            neutral_signals += 1
+
+    if selected_indicators.get('stochastic', False):
+        if ind['stoch_k'] < 20 and ind['stoch_d'] < 20:
+            buy_signals += 1
+        elif ind['stoch_k'] > 80 and ind['stoch_d'] > 80:
+            sell_signals += 1
+        else:
+            neutral_signals += 1
+
+    if selected_indicators.get('adx', False):
+        if ind['adx'] > 25:
+            if current_close > ind['sma_20']:
+                buy_signals += 1
+            else:
+                sell_signals += 1
+        else:
+            neutral_signals += 1
+
+    if selected_indicators.get('volume', False) and has_volume:
+        if ind['volume_ratio'] > 1.5:
+            if current_close > ind['sma_20']:
+                buy_signals += 1
+            else:
+                sell_signals += 1
+        else:
+            neutral_signals += 1
+    elif selected_indicators.get('volume', False) and not has_volume:
+        active_count -= 1
+
+    if selected_indicators.get('cci', False):
+        if ind['cci'] < -100:
+            buy_signals += 1
+        elif ind['cci'] > 100:
+            sell_signals += 1
+        else:
+            neutral_signals += 1
+
+    if selected_indicators.get('willr', False):
+        if ind['willr'] < -80:
+            buy_signals += 1
+        elif ind['willr'] > -20:
+            sell_signals += 1
+        else:
+            neutral_signals += 1
+
+    if selected_indicators.get('mfi', False) and has_volume:
+        if ind['mfi'] < 20:
+            buy_signals += 1
+        elif ind['mfi'] > 80:
+            sell_signals += 1
+        else:
+            neutral_signals += 1
+    elif selected_indicators.get('mfi', False) and not has_volume:
+        active_count -= 1
+
+    return buy_signals, sell_signals, neutral_signals, active_count
+
+
+@pytest.fixture(scope='module', params=[True, False], ids=['volume', 'no-volume'])
+def history(request):
+    """Synthetic frame and the indicators the original loop computed on each growing slice"""
+    data = synthetic_ohlcv(260, 4, volume=request.param)
+    per_bar = [calculate_advanced_indicators(data.iloc[:i + 1]) for i in range(len(data))]
+    return data, per_bar, request.param
+
+
+@pytest.mark.parametrize('subset', SUBSETS, ids=['+'.join(subset) for subset in SUBSETS])
+def test_vectorized_votes_match_per_bar_loop(history, subset):
+    data, per_bar, has_volume = history
+    selected = {name: name in subset for name in INDICATOR_NAMES}
+    closes = data['Close'].values
+
+    series = calculate_indicator_series(data, required_series(selected))
+    buy, sell, neutral, active_count = count_indicator_votes(series, closes, selected, has_volume=has_volume)
+
+    expected = np.array([reference_votes(per_bar[i], closes[i], selected, has_volume) for i in range(len(data))])
+    np.testing.assert_array_equal(buy, expected[:, 0])
+    np.testing.assert_array_equal(sell, expected[:, 1])
+    np.testing.assert_array_equal(neutral, expected[:, 2])
+    assert (expected[:, 3] == active_count).all()
+    # Not a vacuous match: every outcome shows up for the full set
+    if subset is INDICATOR_NAMES:
+        assert buy.any() and sell.any() and neutral.any()
+
+
+@pytest.mark.parametrize('subset', SUBSETS, ids=['+'.join(subset) for subset in SUBSETS])
+def test_screen_counts_match_per_bar_loop(history, subset):
+    # The screen votes on the latest bar and never drops Volume/MFI
+    data, per_bar, _ = history
+    selected = {name: name in subset for name in INDICATOR_NAMES}
+    for i in range(len(data) - 20, len(data)):
+        result = generate_advanced_signal('A', selected, data.iloc[:i + 1])
+        buy, sell, neutral, _ = reference_votes(per_bar[i], data['Close'].iloc[i], selected, True)
+        assert (result['buy_signals'], result['sell_signals'], result['neutral_signals']) == (buy, sell, neutral)
@@ -0,0 +1,22 @@
+# test_walkforward.py - Walk-forward windows run in the request thread
+import sys
+import walkforward
+import backtester
+import instrumentation
+
+
+def test_in_process_walk_forward_leaves_stdout_alone(monkeypatch, ohlcv, capsys):
+    seen = []
+
+    def backtest(*args, **kwargs):
+        seen.append(sys.stdout)
+        return backtester.backtest_strategy(*args, **kwargs)
+
+    monkeypatch.setattr(walkforward, 'backtest_strategy', backtest)
+    monkeypatch.setattr(instrumentation, '_log_level', instrumentation.LOG_LEVELS['info'])
+    stdout = sys.stdout
+    result = walkforward.run_walk_forward(ohlcv(600, 2), {'stop_loss': [10, 20]}, [['rsi', 'macd']],
+                                          in_sample=200, out_of_sample=100, workers=1)
+    assert result['success']
+    assert seen and all(out is stdout for out in seen)
+    assert 'Backtest Complete' not in capsys.readouterr().out
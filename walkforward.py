@@ -0,0 +1,241 @@
+# walkforward.py - Walk-forward optimization over rolling in-sample / out-of-sample windows
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from screener import calculate_indicator_series
+from backtester import backtest_strategy, select_equity_points, TRADE_DTYPE
+from indicators import INDICATOR_NAMES, required_series
+from metrics import performance_summary, round_metrics
+from sweep import (expand_param_grid, expand_indicator_sets, resolve_workers, _pool_context,
+                   SWEEP_METRICS, ASCENDING_METRICS, MAX_SWEEP_RUNS)
+from instrumentation import info, debug
+
+
+# backtest_strategy trades from this bar of the frame it is given, so every
+# window slice starts this many bars early (the indicators are precomputed
+# over the whole series, the extra bars only line the start up)
+WARMUP_BARS = 60
+
+# Worker state, set once per process by _init_worker
+_worker_data = None
+_worker_series = None
+_worker_indicator_params = None
+_worker_combos = None
+
+
+def walk_forward_windows(bars, in_sample, out_of_sample, anchored=False):
+    """
+    Split bar positions into consecutive optimize / test windows
+
+    Out-of-sample windows follow each other without gaps or overlap (the
+    in-sample window rolls forward by out_of_sample bars each step), so
+    their results can be stitched into one curve.
+
+    Args:
+        bars: Length of the series
+        in_sample: Bars to optimize on
+        out_of_sample: Bars to evaluate the chosen params on
+        anchored: In-sample windows all start at the first bar and grow
+
+    Returns:
+        List of (in_sample_start, in_sample_stop, out_of_sample_stop) bar
+        positions; the test window is [in_sample_stop, out_of_sample_stop)
+    """
+    if in_sample < 1 or out_of_sample < 1:
+        raise ValueError("in_sample and out_of_sample must be at least 1 bar")
+
+    windows = []
+    start = WARMUP_BARS
+    while start + in_sample + out_of_sample <= bars:
+        windows.append((WARMUP_BARS if anchored else start, start + in_sample, start + in_sample + out_of_sample))
+        start += out_of_sample
+    return windows
+
+
+def _init_worker(data, series, indicator_params, combos):
+    # With the fork start method these are inherited from the parent, not pickled
+    global _worker_data, _worker_series, _worker_indicator_params, _worker_combos
+    _worker_data = data
+    _worker_series = series
+    _worker_indicator_params = indicator_params
+    _worker_combos = combos
+
+
+def _backtest_slice(start, stop, selected_indicators, params):
+    # Views into the precomputed series, nothing is recalculated per window
+    first = start - WARMUP_BARS
+    series = {key: values[first:stop] for key, values in _worker_series.items()}
+    return backtest_strategy(_worker_data.iloc[first:stop], selected_indicators, params,
+                             series=series, indicator_params=_worker_indicator_params, log=debug)
+
+
+def _run_window(task):
+    window_id, (in_start, in_stop, out_stop), rank_by = task
+    scores = []
+    for combo_id, (selected_indicators, params) in enumerate(_worker_combos):
+        result = _backtest_slice(in_start, in_stop, selected_indicators, params)
+        if result.get('success') and result[rank_by] is not None:
+            scores.append((combo_id, result[rank_by], {key: result[key] for key in SWEEP_METRICS}))
+    if not scores:
+        return window_id, None
+
+    # First combo wins ties, like the stable sort in run_parameter_sweep
+    pick = min if rank_by in ASCENDING_METRICS else max
+    combo_id, _, in_sample = pick(scores, key=lambda score: score[1])
+    selected_indicators, params = _worker_combos[combo_id]
+    result = _backtest_slice(in_stop, out_stop, selected_indicators, params)
+
+    # Bar positions relative to the whole series
+    offset = in_stop - WARMUP_BARS
+    records = result['trade_records'].copy()
+    records['entry_index'] += offset
+    records['exit_index'] += offset
+    return window_id, {
+        'combo': combo_id,
+        'in_sample': in_sample,
+        'out_of_sample': {key: result[key] for key in SWEEP_METRICS},
+        'trade_records': records,
+        'equity_index': result['equity_index'] + offset,
+        'equity_values': result['equity_values'],
+        'realized_pnl': result['final_capital'] - result['initial_capital'],
+        # A position still open when the window ends is held up to its last bar
+        'open_position': (None if result['open_entry_index'] is None
+                          else (result['open_entry_index'] + offset, out_stop - 1))
+    }
+
+
+def run_walk_forward(data, ranges, indicator_sets, in_sample, out_of_sample, anchored=False,
+                     base_params=None, rank_by='total_return', workers=None,
+                     indicator_params=None, curve=None):
+    """
+    Walk-forward optimization: tune on each in-sample window, test on the next
+
+    Indicator series are computed once over the whole frame and sliced per
+    window. Windows run in parallel, each one sweeping every param /
+    indicator combination on its in-sample bars and backtesting the best
+    one (by rank_by) on the out-of-sample bars that follow.
+
+    Each test window starts from initial_capital; the stitched curve adds
+    every window's realized P&L onto the previous windows' total. A
+    position still open when its window ends is dropped, not carried over.
+
+    Args:
+        data: OHLCV DataFrame
+        ranges, indicator_sets, base_params, rank_by, indicator_params:
+            Same as run_parameter_sweep
+        in_sample, out_of_sample: Window lengths in bars
+        anchored: Grow the in-sample window from the first bar instead of rolling it
+        workers: Process count (defaults to and capped at SWEEP_WORKERS, 1 runs in-process)
+        curve: Stitched equity curve selection, see select_equity_points
+
+    Returns:
+        Dict with per-window chosen params and metrics, stitched
+        out-of-sample metrics and equity curve
+    """
+    base_params = dict(base_params or {})
+    grid = expand_param_grid(ranges) or [{}]
+    subsets = expand_indicator_sets(indicator_sets)
+    combos = [(selected_indicators, dict(base_params, **overrides))
+              for selected_indicators in subsets for overrides in grid]
+    windows = walk_forward_windows(len(data), int(in_sample), int(out_of_sample), anchored)
+
+    total_runs = len(windows) * (len(combos) + 1)
+    if not combos:
+        return {'success': False, 'error': 'Nothing to optimize'}
+    if not windows:
+        return {'success': False, 'error': f'Need at least {WARMUP_BARS + int(in_sample) + int(out_of_sample)} '
+                                           f'candles for one window, got {len(data)}'}
+    if total_runs > MAX_SWEEP_RUNS:
+        return {'success': False, 'error': f'Walk-forward has {total_runs} runs, maximum is {MAX_SWEEP_RUNS}'}
+    if rank_by not in SWEEP_METRICS:
+        return {'success': False, 'error': f"rank_by must be one of: {', '.join(SWEEP_METRICS)}"}
+
+    used = {name: any(subset[name] for subset in subsets) for name in INDICATOR_NAMES}
+    series = calculate_indicator_series(data, required_series(used, indicator_params), indicator_params)
+    if series is None:
+        return {'success': False, 'error': 'Could not calculate indicators'}
+
+    tasks = [(window_id, window, rank_by) for window_id, window in enumerate(windows)]
+    workers = resolve_workers(workers, len(windows))
+    info(f"\nWalk-forward: {len(windows)} windows x {len(combos)} combinations on {workers} worker(s)")
+
+    if workers == 1:
+        _init_worker(data, series, indicator_params, combos)
+        results = dict(_run_window(task) for task in tasks)
+    else:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context(), initializer=_init_worker,
+                                 initargs=(data, series, indicator_params, combos)) as executor:
+            results = dict(executor.map(_run_window, tasks))
+
+    # Stitch the test windows in order
+    initial_capital = float(base_params.get('initial_capital', 100000))
+    table, records, equity_index, equity_values, open_positions = [], [], [], [], []
+    realized = 0.0
+    for window_id, (in_start, in_stop, out_stop) in enumerate(windows):
+        row = {
+            'window': window_id + 1,
+            'in_sample_start': str(data.index[in_start]),
+            'in_sample_end': str(data.index[in_stop - 1]),
+            'out_of_sample_start': str(data.index[in_stop]),
+            'out_of_sample_end': str(data.index[out_stop - 1]),
+            'params': None,
+            'indicators': None,
+            'in_sample': None,
+            'out_of_sample': None
+        }
+        result = results[window_id]
+        if result is not None:
+            selected_indicators, params = combos[result['combo']]
+            row['params'] = {name: params[name] for name in ranges}
+            row['indicators'] = [name for name in INDICATOR_NAMES if selected_indicators[name]]
+            row['in_sample'] = result['in_sample']
+            row['out_of_sample'] = result['out_of_sample']
+            records.append(result['trade_records'])
+            if result['open_position'] is not None:
+                open_positions.append(result['open_position'])
+            equity_index.append(result['equity_index'])
+            equity_values.append(result['equity_values'] + realized)
+            realized += result['realized_pnl']
+        table.append(row)
+
+    records = np.concatenate(records) if records else np.zeros(0, dtype=TRADE_DTYPE)
+    equity_index = np.concatenate(equity_index) if equity_index else np.empty(0, dtype=np.int64)
+    equity_values = np.concatenate(equity_values) if equity_values else np.empty(0)
+    oos_bars = windows[-1][2] - windows[0][1]
+    summary = performance_summary(
+        np.round(equity_values, 2), np.round(records['pnl'], 2), records['side'],
+        records['entry_index'], records['exit_index'], oos_bars, base_params.get('interval', '1d'),
+        [entry for entry, _ in open_positions], [end for _, end in open_positions]
+    )
+
+    selected = select_equity_points(equity_index, data.index, curve)
+    info(f"Walk-forward complete: out-of-sample P&L {realized:.2f} over {oos_bars} bars")
+
+    return {
+        'success': True,
+        'rank_by': rank_by,
+        'anchored': bool(anchored),
+        'total_runs': total_runs,
+        'windows': table,
+        'out_of_sample': {
+            'initial_capital': round(initial_capital, 2),
+            'final_capital': round(initial_capital + realized, 2),
+            'total_return': round(realized / initial_capital * 100, 2),
+            'bars': oos_bars,
+            'total_trades': summary['trades'],
+            'winning_trades': summary['winning_trades'],
+            'losing_trades': summary['losing_trades'],
+            'win_rate': round(summary['win_rate'], 2),
+            'avg_profit_per_trade': round(summary['avg_profit'], 2),
+            'max_drawdown': round(summary['max_drawdown'], 2),
+            'max_drawdown_duration': summary['max_drawdown_duration'],
+            'sharpe_ratio': round_metrics(summary['sharpe_ratio']),
+            'sortino_ratio': round_metrics(summary['sortino_ratio']),
+            'calmar_ratio': round_metrics(summary['calmar_ratio']),
+            'profit_factor': round_metrics(summary['profit_factor']),
+            'exposure': round(summary['exposure'], 2)
+        },
+        'equity_curve': [
+            {'date': str(data.index[equity_index[j]]), 'equity': round(float(equity_values[j]), 2)}
+            for j in selected
+        ]
+    }